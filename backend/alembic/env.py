@@ -13,13 +13,18 @@ from database.database import Base, DATABASE_URL
 
 # Import all models that need to be included in migrations
 from app.datamodels.user_datamodels import User, UserProfile, Session
-from app.datamodels.post_datamodels import Post, Category, Subcategory, PostType
+from app.datamodels.post_datamodels import (
+    Post, Category, Subcategory, PostType, Tag, PostAnalysis, PostEngagement
+)
 from app.datamodels.comment_datamodels import Comment  # Add this
 from app.datamodels.interaction_datamodels import (    # Add these
     InteractionType,
     PostInteraction,
     CommentInteraction
 )
+from app.datamodels.community_note_model import CommunityNote
+from app.datamodels.badge_datamodels import BadgeCategory, Badge, UserBadge
+from app.datamodels.media_datamodels import MediaBlob
 
 # Target metadata setup
 target_metadata = Base.metadata
@@ -0,0 +1,458 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+The schema as it was when migrations were introduced, frozen as explicit
+DDL so this revision never changes with the models. Databases that were
+bootstrapped by Base.metadata.create_all before then are stamped at this
+revision by `python -m app.cli migrate` instead of running it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Shared by post_interactions and comment_interactions, so created once
+INTERACTION_TARGET_TYPE = postgresql.ENUM('POST', 'COMMENT', name='interactiontargettype', create_type=False)
+
+
+def upgrade() -> None:
+    INTERACTION_TARGET_TYPE.create(op.get_bind(), checkfirst=True)
+    op.create_table('badge_categories',
+    sa.Column('badge_category_id', sa.Integer(), nullable=False),
+    sa.Column('badge_name', sa.String(), nullable=False),
+    sa.Column('badge_description', sa.Text(), nullable=True),
+    sa.Column('is_merit', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('badge_category_id')
+    )
+    op.create_table('categories',
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('cat_name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('category_id'),
+    sa.UniqueConstraint('cat_name')
+    )
+    op.create_table('interaction_types',
+    sa.Column('interaction_type_id', sa.Integer(), nullable=False),
+    sa.Column('interaction_type_name', sa.String(length=50), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('allowed_targets', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('interaction_type_id'),
+    sa.UniqueConstraint('interaction_type_name')
+    )
+    op.create_table('post_types',
+    sa.Column('post_type_id', sa.Integer(), nullable=False),
+    sa.Column('post_type_name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('post_type_id'),
+    sa.UniqueConstraint('post_type_name')
+    )
+    op.create_table('tags',
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('tag_name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('tag_id'),
+    sa.UniqueConstraint('tag_name')
+    )
+    op.create_table('users',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_index(op.f('ix_users_user_id'), 'users', ['user_id'], unique=False)
+    op.create_table('badges',
+    sa.Column('badge_id', sa.Integer(), nullable=False),
+    sa.Column('badge_category_id', sa.Integer(), nullable=True),
+    sa.Column('badge_name', sa.String(), nullable=False),
+    sa.Column('badge_description', sa.Text(), nullable=True),
+    sa.Column('badge_icon_url', sa.String(), nullable=True),
+    sa.Column('badge_threshold', sa.Integer(), nullable=False),
+    sa.Column('is_merit', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['badge_category_id'], ['badge_categories.badge_category_id'], ),
+    sa.PrimaryKeyConstraint('badge_id')
+    )
+    op.create_table('sessions',
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id'),
+    sa.UniqueConstraint('token')
+    )
+    op.create_index(op.f('ix_sessions_session_id'), 'sessions', ['session_id'], unique=False)
+    op.create_table('subcategories',
+    sa.Column('subcategory_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.category_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('subcategory_id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('user_analysis',
+    sa.Column('user_analysis_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('soundness_score', sa.Float(), nullable=True),
+    sa.Column('soundness_details', sa.JSON(), nullable=True),
+    sa.Column('fallacy_score', sa.Float(), nullable=True),
+    sa.Column('fallacy_details', sa.JSON(), nullable=True),
+    sa.Column('evidence_quality_score', sa.Float(), nullable=True),
+    sa.Column('evidence_details', sa.JSON(), nullable=True),
+    sa.Column('misinformation_score', sa.Float(), nullable=True),
+    sa.Column('misinformation_details', sa.JSON(), nullable=True),
+    sa.Column('good_faith_score', sa.Float(), nullable=True),
+    sa.Column('good_faith_details', sa.JSON(), nullable=True),
+    sa.Column('bad_faith_score', sa.Float(), nullable=True),
+    sa.Column('bad_faith_details', sa.JSON(), nullable=True),
+    sa.Column('trolling_score', sa.Float(), nullable=True),
+    sa.Column('propaganda_score', sa.Float(), nullable=True),
+    sa.Column('divisiveness_score', sa.Float(), nullable=True),
+    sa.Column('doomerism_score', sa.Float(), nullable=True),
+    sa.Column('community_impact_score', sa.Float(), nullable=True),
+    sa.Column('community_feedback', sa.JSON(), nullable=True),
+    sa.Column('practical_utility_score', sa.Float(), nullable=True),
+    sa.Column('saved_to_plans_count', sa.Integer(), nullable=True),
+    sa.Column('completed_plans_count', sa.Integer(), nullable=True),
+    sa.Column('implementation_complexity', sa.Float(), nullable=True),
+    sa.Column('merit_points', sa.Integer(), nullable=True),
+    sa.Column('demerit_points', sa.Integer(), nullable=True),
+    sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('analysis_version', sa.String(), nullable=True),
+    sa.Column('history', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_analysis_id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('user_bad_faith_counts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('behavior_type', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('severity_sum', sa.Float(), nullable=True),
+    sa.Column('last_detected', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_bad_faith_type', 'user_bad_faith_counts', ['user_id', 'behavior_type'], unique=False)
+    op.create_table('user_fallacy_type_counts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('fallacy_type', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('severity_sum', sa.Float(), nullable=True),
+    sa.Column('last_detected', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_fallacy_type', 'user_fallacy_type_counts', ['user_id', 'fallacy_type'], unique=False)
+    op.create_table('user_good_faith_counts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('behavior_type', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('quality_sum', sa.Float(), nullable=True),
+    sa.Column('last_detected', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_good_faith_type', 'user_good_faith_counts', ['user_id', 'behavior_type'], unique=False)
+    op.create_table('user_profile',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('avatar_img', sa.String(), nullable=True),
+    sa.Column('about', sa.Text(), nullable=True),
+    sa.Column('post_cnt', sa.Integer(), nullable=True),
+    sa.Column('comment_cnt', sa.Integer(), nullable=True),
+    sa.Column('upvote_cnt', sa.Integer(), nullable=True),
+    sa.Column('plan_cnt', sa.Integer(), nullable=True),
+    sa.Column('plan_comp_cnt', sa.Integer(), nullable=True),
+    sa.Column('plan_ip_cnt', sa.Integer(), nullable=True),
+    sa.Column('goals', sa.Text(), nullable=True),
+    sa.Column('is_messaging', sa.Boolean(), nullable=True),
+    sa.Column('is_networking', sa.Boolean(), nullable=True),
+    sa.Column('reputation_score', sa.Integer(), nullable=True),
+    sa.Column('reputation_cat', sa.String(length=50), nullable=True),
+    sa.Column('interests', sa.Text(), nullable=True),
+    sa.Column('credentials', sa.String(), nullable=True),
+    sa.Column('expertise_area', sa.String(), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('gender', sa.String(length=10), nullable=True),
+    sa.Column('sex', sa.String(length=1), nullable=True),
+    sa.Column('worldview_u', sa.String(), nullable=True),
+    sa.Column('worldview_ai', sa.String(), nullable=True),
+    sa.Column('date_joined', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('logon_time', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('last_active', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('is_instructor', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('user_sound_reasoning_counts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('reasoning_type', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('quality_sum', sa.Float(), nullable=True),
+    sa.Column('last_detected', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_reasoning_type', 'user_sound_reasoning_counts', ['user_id', 'reasoning_type'], unique=False)
+    op.create_table('posts',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('subtitle', sa.String(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('video_url', sa.String(), nullable=True),
+    sa.Column('video_metadata', sa.JSON(), nullable=True),
+    sa.Column('audio_url', sa.String(), nullable=True),
+    sa.Column('document_url', sa.String(), nullable=True),
+    sa.Column('embedded_content', sa.JSON(), nullable=True),
+    sa.Column('link_preview', sa.JSON(), nullable=True),
+    sa.Column('post_type_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('subcategory_id', sa.Integer(), nullable=True),
+    sa.Column('visibility', sa.String(), nullable=True),
+    sa.Column('is_pinned', sa.Boolean(), nullable=True),
+    sa.Column('is_draft', sa.Boolean(), nullable=True),
+    sa.Column('parent_post_id', sa.Integer(), nullable=True),
+    sa.Column('edit_history', sa.JSON(), nullable=True),
+    sa.Column('custom_subcategory', sa.String(), nullable=True),
+    sa.Column('like_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('dislike_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('save_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('share_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('report_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.category_id'], ),
+    sa.ForeignKeyConstraint(['parent_post_id'], ['posts.post_id'], ),
+    sa.ForeignKeyConstraint(['post_type_id'], ['post_types.post_type_id'], ),
+    sa.ForeignKeyConstraint(['subcategory_id'], ['subcategories.subcategory_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+    op.create_index('idx_post_metrics', 'posts', ['like_count', 'dislike_count', 'save_count', 'share_count', 'comment_count', 'report_count'], unique=False)
+    op.create_index(op.f('ix_posts_post_id'), 'posts', ['post_id'], unique=False)
+    op.create_table('user_badges',
+    sa.Column('user_badge_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('badge_id', sa.Integer(), nullable=False),
+    sa.Column('badge_current_points', sa.Integer(), nullable=True),
+    sa.Column('badge_earned', sa.Boolean(), nullable=True),
+    sa.Column('badge_earned_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('badge_first_progress_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('badge_last_updated', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['badge_id'], ['badges.badge_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_badge_id'),
+    sa.UniqueConstraint('user_id', 'badge_id', name='uix_user_badge')
+    )
+    op.create_table('comments',
+    sa.Column('comment_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('parent_comment_id', sa.Integer(), nullable=True),
+    sa.Column('root_comment_id', sa.Integer(), nullable=True),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=True),
+    sa.Column('like_count', sa.Integer(), nullable=True),
+    sa.Column('dislike_count', sa.Integer(), nullable=True),
+    sa.Column('reply_count', sa.Integer(), nullable=True),
+    sa.Column('report_count', sa.Integer(), nullable=True),
+    sa.Column('last_activity', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('active_viewers', sa.Integer(), nullable=True),
+    sa.Column('is_edited', sa.Boolean(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('edit_history', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['parent_comment_id'], ['comments.comment_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['root_comment_id'], ['comments.comment_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('comment_id')
+    )
+    op.create_index('ix_comments_parent_id', 'comments', ['parent_comment_id'], unique=False)
+    op.create_index('ix_comments_path', 'comments', ['path'], unique=False)
+    op.create_index('ix_comments_post_id', 'comments', ['post_id'], unique=False)
+    op.create_index('ix_comments_root_id', 'comments', ['root_comment_id'], unique=False)
+    op.create_index('ix_comments_user_id', 'comments', ['user_id'], unique=False)
+    op.create_table('community_notes',
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('note_text', sa.Text(), nullable=False),
+    sa.Column('evidence_links', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('helpfulness_score', sa.Float(), nullable=True),
+    sa.Column('helpful_count', sa.Integer(), nullable=True),
+    sa.Column('not_helpful_count', sa.Integer(), nullable=True),
+    sa.Column('impact_weight', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('is_source_citation', sa.Boolean(), nullable=True),
+    sa.Column('is_fact_check', sa.Boolean(), nullable=True),
+    sa.Column('is_context_addition', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('note_id')
+    )
+    op.create_table('post_analysis',
+    sa.Column('analysis_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('fallacy_score', sa.Float(), nullable=True),
+    sa.Column('fallacy_types', sa.JSON(), nullable=True),
+    sa.Column('soundness_score', sa.Float(), nullable=True),
+    sa.Column('soundness_types', sa.JSON(), nullable=True),
+    sa.Column('evidence_score', sa.Float(), nullable=True),
+    sa.Column('evidence_types', sa.JSON(), nullable=True),
+    sa.Column('evidence_links', sa.JSON(), nullable=True),
+    sa.Column('bad_faith_score', sa.Float(), nullable=True),
+    sa.Column('bad_faith_details', sa.JSON(), nullable=True),
+    sa.Column('good_faith_score', sa.Float(), nullable=True),
+    sa.Column('good_faith_details', sa.JSON(), nullable=True),
+    sa.Column('community_score', sa.Float(), nullable=True),
+    sa.Column('community_feedback', sa.JSON(), nullable=True),
+    sa.Column('community_note_count', sa.Integer(), nullable=True),
+    sa.Column('practical_utility_score', sa.Float(), nullable=True),
+    sa.Column('saved_to_plans_count', sa.Integer(), nullable=True),
+    sa.Column('completed_plans_count', sa.Integer(), nullable=True),
+    sa.Column('implementation_complexity', sa.Float(), nullable=True),
+    sa.Column('resource_requirements', sa.JSON(), nullable=True),
+    sa.Column('estimated_timeline', sa.JSON(), nullable=True),
+    sa.Column('merit_score', sa.Float(), nullable=True),
+    sa.Column('demerit_score', sa.Float(), nullable=True),
+    sa.Column('analysis_version', sa.String(), nullable=True),
+    sa.Column('analyzed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_updated', sa.DateTime(), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('analysis_id'),
+    sa.UniqueConstraint('post_id')
+    )
+    op.create_table('post_engagement',
+    sa.Column('engagement_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('view_time_total', sa.Integer(), nullable=True),
+    sa.Column('avg_view_duration', sa.Float(), nullable=True),
+    sa.Column('bounce_rate', sa.Float(), nullable=True),
+    sa.Column('completion_rate', sa.Float(), nullable=True),
+    sa.Column('unique_viewers', sa.Integer(), nullable=True),
+    sa.Column('return_viewers', sa.Integer(), nullable=True),
+    sa.Column('save_rate', sa.Float(), nullable=True),
+    sa.Column('share_rate', sa.Float(), nullable=True),
+    sa.Column('engagement_score', sa.Float(), nullable=True),
+    sa.Column('last_calculated', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('engagement_id')
+    )
+    op.create_table('post_interactions',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('interaction_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('target_type', INTERACTION_TARGET_TYPE, nullable=False),
+    sa.Column('interaction_type_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('interaction_metadata', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['interaction_type_id'], ['interaction_types.interaction_type_id'], ),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('interaction_id')
+    )
+    op.create_index('idx_post_type', 'post_interactions', ['post_id', 'interaction_type_id'], unique=False)
+    op.create_index('idx_post_user_type', 'post_interactions', ['post_id', 'user_id', 'interaction_type_id'], unique=True)
+    op.create_table('post_tags',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.tag_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id', 'tag_id')
+    )
+    op.create_table('saved_posts',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.post_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_table('comment_interactions',
+    sa.Column('interaction_id', sa.Integer(), nullable=False),
+    sa.Column('comment_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('target_type', INTERACTION_TARGET_TYPE, nullable=False),
+    sa.Column('interaction_type_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('interaction_metadata', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['comment_id'], ['comments.comment_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['interaction_type_id'], ['interaction_types.interaction_type_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('interaction_id')
+    )
+    op.create_index('idx_comment_type', 'comment_interactions', ['comment_id', 'interaction_type_id'], unique=False)
+    op.create_index('idx_comment_user_type', 'comment_interactions', ['comment_id', 'user_id', 'interaction_type_id'], unique=True)
+    op.create_table('community_note_ratings',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.Column('helpful', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['note_id'], ['community_notes.note_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'note_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('community_note_ratings')
+    op.drop_table('comment_interactions')
+    op.drop_table('saved_posts')
+    op.drop_table('post_tags')
+    op.drop_table('post_interactions')
+    op.drop_table('post_engagement')
+    op.drop_table('post_analysis')
+    op.drop_table('community_notes')
+    op.drop_table('comments')
+    op.drop_table('user_badges')
+    op.drop_table('posts')
+    op.drop_table('user_sound_reasoning_counts')
+    op.drop_table('user_profile')
+    op.drop_table('user_good_faith_counts')
+    op.drop_table('user_fallacy_type_counts')
+    op.drop_table('user_bad_faith_counts')
+    op.drop_table('user_analysis')
+    op.drop_table('subcategories')
+    op.drop_table('sessions')
+    op.drop_table('badges')
+    op.drop_table('users')
+    op.drop_table('tags')
+    op.drop_table('post_types')
+    op.drop_table('interaction_types')
+    op.drop_table('categories')
+    op.drop_table('badge_categories')
+    INTERACTION_TARGET_TYPE.drop(op.get_bind(), checkfirst=True)
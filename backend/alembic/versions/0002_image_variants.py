@@ -0,0 +1,29 @@
+"""image variants
+
+Revision ID: 0002_image_variants
+Revises: 0001_baseline
+Create Date: 2026-10-19 00:00:00
+
+Records the WebP/JPEG size variants rendered for post images and avatars.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_image_variants'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("image_variants", sa.JSON(), nullable=True))
+    op.add_column("user_profile", sa.Column("avatar_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("user_profile", "avatar_variants")
+    op.drop_column("posts", "image_variants")
@@ -0,0 +1,38 @@
+"""media blobs
+
+Revision ID: 0003_media_blobs
+Revises: 0002_image_variants
+Create Date: 2026-10-19 00:00:00
+
+Reference-counted index of the content-addressed media store.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_media_blobs'
+down_revision: Union[str, None] = '0002_image_variants'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("extension", sa.String(10), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_media_blobs_unreferenced", "media_blobs", ["ref_count", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_blobs_unreferenced", table_name="media_blobs")
+    op.drop_table("media_blobs")
@@ -2,6 +2,9 @@ import json
 from typing import Any, Optional
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 class RedisCache:
     def __init__(self):
@@ -16,7 +19,7 @@ class RedisCache:
             value = await self.redis.get(key)
             return json.loads(value) if value else None
         except Exception as e:
-            print(f"Cache get error: {str(e)}")
+            logger.error("Cache get error: %s", e)
             return None
 
     async def set(self, key: str, value: Any, expire: int = 300) -> bool:
@@ -29,7 +32,7 @@ class RedisCache:
             )
             return True
         except Exception as e:
-            print(f"Cache set error: {str(e)}")
+            logger.error("Cache set error: %s", e)
             return False
 
     async def delete(self, key: str) -> bool:
@@ -38,7 +41,7 @@ class RedisCache:
             await self.redis.delete(key)
             return True
         except Exception as e:
-            print(f"Cache delete error: {str(e)}")
+            logger.error("Cache delete error: %s", e)
             return False
 
     async def clear(self) -> bool:
@@ -47,7 +50,7 @@ class RedisCache:
             await self.redis.flushdb()
             return True
         except Exception as e:
-            print(f"Cache clear error: {str(e)}")
+            logger.error("Cache clear error: %s", e)
             return False
 
 # Cache dependency
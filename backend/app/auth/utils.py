@@ -1,14 +1,16 @@
 # app/auth/utils.py
 from typing import Optional
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status, Request, Header
+from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.utils.database_utils import get_db
 from app.datamodels.user_datamodels import User
 from app.core.config import settings
 from datetime import datetime, timedelta
-from app.schemas.user_schemas import UserResponse
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Constants for JWT
 SECRET_KEY = settings.JWT_SECRET_KEY
@@ -24,8 +26,6 @@ async def get_current_user(
         token: Optional[str] = Depends(oauth2_scheme),
         db: Session = Depends(get_db)
 ) -> User:
-    print(f"📢 Received token in FastAPI: {token}")
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -36,17 +36,14 @@ async def get_current_user(
         # Get token from OAuth2 scheme or Authorization header
         if not token:
             auth_header = request.headers.get("Authorization")
-            print(f"🔑 Auth header from request: {auth_header}")
             if auth_header and auth_header.startswith("Bearer "):
                 token = auth_header.split(" ")[1]
             else:
-                print("❌ No valid token found")
+                logger.debug("No bearer token on %s", request.url.path)
                 raise credentials_exception
 
-        print(f"🔄 Decoding token: {token}")
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            print(f"✅ Token payload: {payload}")
 
             # Add expiration check
             exp = payload.get('exp')
@@ -54,12 +51,12 @@ async def get_current_user(
                 raise credentials_exception
 
         except JWTError as jwt_error:
-            print(f"❌ JWT decode error: {str(jwt_error)}")
+            logger.info("JWT decode error: %s", jwt_error)
             raise credentials_exception
 
         user_id: int = payload.get("sub")
         if not user_id:
-            print("❌ No user_id in token payload")
+            logger.warning("Token payload has no subject")
             raise credentials_exception
 
         if isinstance(user_id, str):
@@ -67,35 +64,33 @@ async def get_current_user(
 
         user = db.query(User).filter(User.user_id == user_id).first()
         if not user:
-            print(f"❌ No user found for id: {user_id}")
+            logger.info("No user found for token subject %s", user_id)
             raise credentials_exception
 
-        print(f"✅ Found user: {user.user_id}")
         return user
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Unexpected error in get_current_user: {str(e)}")
+        logger.error("Unexpected error in get_current_user: %s", e)
         raise credentials_exception
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    print(f"Creating token with data: {to_encode}")
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    print(f"Token expires at: {expire}")
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    print(f"Created token: {token}")
     return token
 
 async def get_current_user_or_none(
-    authorization: Optional[str] = Header(None),
-    token: Optional[str] = None,
+    request: Request,
+    token: Optional[str] = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> Optional[UserResponse]:
+) -> Optional[User]:
     """Get current user if authenticated, or None if not"""
+    if not token:
+        return None
     try:
-        return await get_current_user(authorization, token, db)
+        return await get_current_user(request, token, db)
     except HTTPException:
-        return None
-    except Exception:
         return None
\ No newline at end of file
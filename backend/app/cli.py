@@ -0,0 +1,204 @@
+# app/cli.py
+"""
+Operational entry point, kept out of web worker startup.
+
+    python -m app.cli migrate [--revision head]
+    python -m app.cli seed
+    python -m app.cli reconcile [--saved-posts] [--counts] [--trending] [--recommendations]
+    python -m app.cli worker
+    python -m app.cli media-gc [--grace-hours N] [--dry-run]
+    python -m app.cli seed-synthetic [--users N] [--posts N] [--comments N] [--interactions N] [--seed S]
+
+Run from the backend directory (where alembic.ini lives).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def migrate(revision: str = "head") -> None:
+    """Apply Alembic migrations up to `revision`"""
+    from alembic import command
+    from alembic.config import Config
+
+    from sqlalchemy import inspect
+    from database.database import engine
+
+    config = Config(os.path.join(BACKEND_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_ROOT, "alembic"))
+
+    # Databases bootstrapped by create_all before migrations existed already
+    # have the baseline schema; record that instead of re-creating it
+    inspector = inspect(engine)
+    if inspector.has_table("users") and not inspector.has_table("alembic_version"):
+        command.stamp(config, "0001_baseline")
+        logger.info("Existing schema stamped at 0001_baseline")
+
+    command.upgrade(config, revision)
+    logger.info("Database migrated to %s", revision)
+
+
+async def seed() -> None:
+    """Upsert reference data (categories, post types, interaction types)"""
+    from database.database import SessionLocal
+    from app.core.cache import init_redis, close_redis
+    from app.utils.database_utils import init_categories, init_post_types, init_post_interaction_types
+
+    started = time.time()
+    # Reference data versions live in Redis
+    await init_redis()
+    await init_categories()
+    await init_post_types()
+
+    db = SessionLocal()
+    try:
+        await init_post_interaction_types(db)
+    finally:
+        db.close()
+        await close_redis()
+
+    logger.info("Seed data upserted in %.2fs", time.time() - started)
+
+
+async def reconcile(saved_posts: bool, counts: bool, trending: bool, recommendations: bool) -> None:
+    """Repair denormalized state and rebuild derived Redis structures"""
+    from database.database import SessionLocal
+    from app.core.cache import init_redis, close_redis
+    from app.RedisCache import get_cache
+
+    await init_redis()
+    db = SessionLocal()
+    try:
+        if saved_posts:
+            from app.utils.database_utils import sync_saved_posts
+            synced = await sync_saved_posts(db)
+            logger.info("Saved posts reconciled: %s", synced)
+
+        if counts:
+            from app.services.post_engagement_service import PostEngagementService
+            await PostEngagementService(db, get_cache()).repair_all_post_counts()
+            logger.info("Post counts reconciled")
+
+        if trending:
+            from app.services.trending_service import get_trending_service
+            scored = await get_trending_service(get_cache()).rebuild_from_db(db)
+            logger.info("Trending sets rebuilt for %s posts", scored)
+
+        if recommendations:
+            from app.services.recommendation_service import rebuild_recommendations
+            await rebuild_recommendations()
+    finally:
+        db.close()
+        await close_redis()
+
+
+async def worker() -> None:
+    """Run the periodic background jobs until interrupted"""
+    from app.core.cache import init_redis, close_redis
+    from app.utils.database_utils import periodic_sync_saved_posts
+    from app.services.recommendation_service import periodic_build_recommendations
+
+    await init_redis()
+    tasks = [
+        asyncio.create_task(periodic_sync_saved_posts()),
+        asyncio.create_task(periodic_build_recommendations()),
+    ]
+    logger.info("Background worker started")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await close_redis()
+
+
+def media_gc(grace_hours=None, dry_run: bool = False) -> None:
+    """Recount media references and delete long-unreferenced blobs"""
+    from database.database import SessionLocal
+    from app.services.media_store import collect_garbage
+
+    db = SessionLocal()
+    try:
+        collect_garbage(db, grace_hours, dry_run)
+    finally:
+        db.close()
+
+
+def seed_synthetic(users: int, posts: int, comments: int, interactions: int, seed: int) -> None:
+    """Insert the reproducible benchmark dataset (see benchmarks/README.md)"""
+    from database.database import SessionLocal
+    from app.seeders.seed_post import seed_synthetic_dataset
+
+    started = time.time()
+    db = SessionLocal()
+    try:
+        created = seed_synthetic_dataset(db, users, posts, comments, interactions, seed)
+    finally:
+        db.close()
+    logger.info("Synthetic dataset %s inserted in %.2fs", created, time.time() - started)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Pragora management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply database migrations")
+    migrate_parser.add_argument("--revision", default="head")
+
+    subparsers.add_parser("seed", help="Upsert reference data")
+
+    reconcile_parser = subparsers.add_parser(
+        "reconcile",
+        help="Repair saved posts / counts and rebuild Redis rankings (all when no flag is given)"
+    )
+    reconcile_parser.add_argument("--saved-posts", action="store_true")
+    reconcile_parser.add_argument("--counts", action="store_true")
+    reconcile_parser.add_argument("--trending", action="store_true")
+    reconcile_parser.add_argument("--recommendations", action="store_true")
+
+    subparsers.add_parser("worker", help="Run periodic background jobs")
+
+    gc_parser = subparsers.add_parser("media-gc", help="Delete unreferenced media blobs")
+    gc_parser.add_argument("--grace-hours", type=int, default=None)
+    gc_parser.add_argument("--dry-run", action="store_true")
+
+    synthetic_parser = subparsers.add_parser("seed-synthetic", help="Insert a synthetic benchmark dataset")
+    synthetic_parser.add_argument("--users", type=int, default=200)
+    synthetic_parser.add_argument("--posts", type=int, default=2000)
+    synthetic_parser.add_argument("--comments", type=int, default=10000)
+    synthetic_parser.add_argument("--interactions", type=int, default=50000)
+    synthetic_parser.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrate(args.revision)
+    elif args.command == "seed":
+        asyncio.run(seed())
+    elif args.command == "reconcile":
+        selected = [args.saved_posts, args.counts, args.trending, args.recommendations]
+        if not any(selected):
+            selected = [True] * len(selected)
+        asyncio.run(reconcile(*selected))
+    elif args.command == "worker":
+        try:
+            asyncio.run(worker())
+        except KeyboardInterrupt:
+            logger.info("Background worker stopped")
+    elif args.command == "media-gc":
+        media_gc(args.grace_hours, args.dry_run)
+    elif args.command == "seed-synthetic":
+        seed_synthetic(args.users, args.posts, args.comments, args.interactions, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,9 @@
 from redis import asyncio as aioredis
 from typing import Optional
 from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 redis_client: Optional[aioredis.Redis] = None
 
@@ -27,10 +30,10 @@ async def init_redis():
         await redis_client.ping()
         # Add keys monitoring
         await redis_client.config_set('notify-keyspace-events', 'Ex')
-        print("✅ Redis connection established and configured")
+        logger.info("Redis connection established and configured")
 
     except Exception as e:
-        print(f"❌ Failed to connect to Redis: {str(e)}")
+        logger.error("Failed to connect to Redis: %s", e)
         redis_client = None
 
 async def close_redis():
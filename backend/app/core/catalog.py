@@ -0,0 +1,184 @@
+# app/core/catalog.py
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL = "catalog:invalidate"
+VERSION_KEY = "version:catalog"
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    category_id: int
+    cat_name: str
+
+
+@dataclass(frozen=True)
+class SubcategoryEntry:
+    subcategory_id: int
+    name: str
+    category_id: int
+
+
+class Catalog:
+    """
+    Immutable snapshot of the reference tables: categories, subcategories,
+    post types and tags.
+
+    `version` is the Redis counter value the snapshot was loaded at, used to
+    notice missed invalidations; `digest` fingerprints the content and is
+    what HTTP validators are built from.
+    """
+
+    __slots__ = ("categories", "subcategories", "post_types", "tags", "version", "digest")
+
+    def __init__(
+            self,
+            categories: List[CategoryEntry],
+            subcategories: List[SubcategoryEntry],
+            post_types: Dict[int, str],
+            tags: Dict[int, str],
+            version: int
+    ):
+        self.categories: Tuple[CategoryEntry, ...] = tuple(sorted(categories, key=lambda c: c.category_id))
+        by_category: Dict[int, List[SubcategoryEntry]] = {}
+        for sub in sorted(subcategories, key=lambda s: s.subcategory_id):
+            by_category.setdefault(sub.category_id, []).append(sub)
+        self.subcategories: Mapping[int, Tuple[SubcategoryEntry, ...]] = MappingProxyType(
+            {category_id: tuple(subs) for category_id, subs in by_category.items()}
+        )
+        self.post_types: Mapping[int, str] = MappingProxyType(dict(post_types))
+        self.tags: Mapping[int, str] = MappingProxyType(dict(tags))
+        self.version = version
+        self.digest = hashlib.sha1(repr((
+            self.categories, sorted(by_category.items()), sorted(post_types.items()), sorted(tags.items())
+        )).encode()).hexdigest()[:16]
+
+    def post_type_name(self, post_type_id: Optional[int]) -> Optional[str]:
+        return self.post_types.get(post_type_id) if post_type_id is not None else None
+
+    def subcategories_for(self, category_id: int) -> Tuple[SubcategoryEntry, ...]:
+        return self.subcategories.get(category_id, ())
+
+
+_catalog: Optional[Catalog] = None
+_load_lock = threading.Lock()
+
+
+def load_catalog(db: Optional[Session] = None, version: int = 0) -> Catalog:
+    """Read the reference tables and atomically replace the process-wide catalog"""
+    global _catalog
+    owns_session = db is None
+    if owns_session:
+        from database.database import SessionLocal
+        db = SessionLocal()
+    try:
+        categories = [
+            CategoryEntry(category_id, cat_name)
+            for category_id, cat_name in db.execute(text("SELECT category_id, cat_name FROM categories"))
+        ]
+        subcategories = [
+            SubcategoryEntry(subcategory_id, name, category_id)
+            for subcategory_id, name, category_id in db.execute(text(
+                "SELECT subcategory_id, name, category_id FROM subcategories"
+            ))
+        ]
+        post_types = dict(db.execute(text("SELECT post_type_id, post_type_name FROM post_types")).fetchall())
+        tags = dict(db.execute(text("SELECT tag_id, tag_name FROM tags")).fetchall())
+    finally:
+        if owns_session:
+            db.close()
+
+    catalog = Catalog(categories, subcategories, post_types, tags, version)
+    _catalog = catalog
+    logger.info(
+        "Loaded catalog v%s (%s categories, %s subcategories, %s post types, %s tags)",
+        version, len(categories), len(subcategories), len(post_types), len(tags)
+    )
+    return catalog
+
+
+def get_catalog() -> Catalog:
+    """Current catalog, loaded on first use if startup did not load it"""
+    catalog = _catalog
+    if catalog is None:
+        with _load_lock:
+            catalog = _catalog or load_catalog()
+    return catalog
+
+
+async def _current_version() -> int:
+    try:
+        redis = await get_redis()
+        return int(await redis.get(VERSION_KEY) or 0) if redis else 0
+    except Exception as e:
+        logger.error("Error reading catalog version: %s", e)
+        return 0
+
+
+async def reload_catalog() -> Catalog:
+    """Reload from the database without blocking the event loop"""
+    version = await _current_version()
+    return await asyncio.to_thread(load_catalog, None, version)
+
+
+async def notify_catalog_changed() -> None:
+    """Bump the catalog version and tell every process to reload"""
+    try:
+        redis = await get_redis()
+        if not redis:
+            return
+        version = await redis.incr(VERSION_KEY)
+        await redis.publish(CHANNEL, version)
+    except Exception as e:
+        logger.error("Error publishing catalog change: %s", e)
+
+
+async def listen_for_catalog_changes(poll_timeout: float = 1.0) -> None:
+    """
+    Reload the catalog whenever another process publishes a change.
+
+    After every (re)subscribe the stored version is compared with the loaded
+    one, so changes published while disconnected are not lost.
+    """
+    while True:
+        pubsub = None
+        try:
+            redis = await get_redis()
+            if not redis:
+                await asyncio.sleep(5)
+                continue
+
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(CHANNEL)
+            if await _current_version() != get_catalog().version:
+                await reload_catalog()
+
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=poll_timeout)
+                if message and message.get("type") == "message":
+                    if int(message["data"]) != get_catalog().version:
+                        await reload_catalog()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Catalog listener error, resubscribing: %s", e)
+            await asyncio.sleep(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.unsubscribe(CHANNEL)
+                    await pubsub.close()
+                except Exception:
+                    pass
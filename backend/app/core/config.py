@@ -1,5 +1,6 @@
 # core/config.py
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 
 # Get the absolute path to the project root
@@ -28,8 +29,20 @@ class Settings(BaseSettings):
     MEDIA_ROOT: str = "/home/notsure/pragora/backend/media"
     STATIC_ROOT: str = "/home/notsure/pragora/backend/static"
     DEFAULT_AVATAR_URL: str = "/home/notsure/pragora/frontend/pragora-frontend/public/images/avatars/default_avatar.png"
-    POSTS_MEDIA_DIR: str = os.path.join(MEDIA_ROOT, "media", "posts")
+    # Served by the /media mount, so /media/posts/x is MEDIA_ROOT/posts/x
+    POSTS_MEDIA_DIR: str = os.path.join(MEDIA_ROOT, "posts")
     AVATAR_DIR: str = os.path.join(MEDIA_ROOT, "avatars")
+    # Content-addressed uploads (see app/services/media_store.py)
+    MEDIA_BLOB_DIR: str = os.path.join(MEDIA_ROOT, "blobs")
+    # Unreferenced blobs are kept this long before media-gc deletes them
+    MEDIA_GC_GRACE_HOURS: int = 24
+    # Cache-Control max-age for /media files without a content hash in their name
+    MEDIA_CACHE_SECONDS: int = 3600
+    # "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd) hands file
+    # delivery to the front proxy; empty streams files from the app
+    MEDIA_SENDFILE_MODE: str = ""
+    # Internal nginx location aliased to MEDIA_ROOT, for x-accel-redirect
+    MEDIA_ACCEL_PREFIX: str = "/protected-media"
     #DEFAULT_AVATAR_URL: str = "/home/notsure/pragora/frontend/pragora-frontend/src/assets/ZERO.PNG"
 
     # Make sure there's a frontend URL configured
@@ -40,6 +53,59 @@ class Settings(BaseSettings):
     METRICS_RETENTION_DAYS: int = 30 # Should this be forever?
     METRICS_AGGREGATION_WINDOW: int = 300  # 5 minutes in seconds
     CACHE_EXPIRY_SECONDS: int = 300  # 5 minutes
+    # Request latency / DB / Redis metrics at /metrics (Prometheus). When set,
+    # scrapers must send "Authorization: Bearer <METRICS_TOKEN>"
+    REQUEST_METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+    # Development: count SQL statements per request, send X-Query-Count and
+    # log requests over their @declare_query_budget (or this default)
+    QUERY_BUDGET_ENABLED: bool = False
+    QUERY_BUDGET_DEFAULT: int = 25
+    # Per-request profiling (see app/core/profiling.py). Requests are profiled
+    # at PROFILING_SAMPLE_RATE or when they carry an X-Profile header signed
+    # with PROFILING_SECRET; the newest PROFILING_MAX_FILES are kept on disk.
+    # PROFILING_ENGINE is "cprofile" or "pyinstrument" (if installed)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SECRET: str = ""
+    PROFILING_ENGINE: str = "cprofile"
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_DIR: str = os.path.join(tempfile.gettempdir(), "pragora-profiles")
+    PROFILING_MAX_FILES: int = 50
+
+    # Periodic jobs (saved posts sync, recommendations) run in `python -m app.cli worker`;
+    # set this to run them inside the web process instead (single-process dev setups)
+    RUN_BACKGROUND_JOBS: bool = False
+
+    # Like/dislike/share/report toggles for the same post arriving within this
+    # window are applied as one transaction
+    INTERACTION_BATCH_WINDOW_MS: int = 5
+    INTERACTION_BATCH_MAX_SIZE: int = 200
+
+    # Pre-serialized GET /posts/{post_id} bodies (counts and viewer state are
+    # merged per request); edits, deletes and profile changes invalidate them
+    POST_BODY_CACHE_SECONDS: int = 600
+
+    # Author cards (username, avatar, reputation...) used to hydrate listings.
+    # Redis copies are dropped on profile/avatar updates and every worker's
+    # LRU is cleared over pub/sub; the local TTL bounds any missed message
+    AUTHOR_CARD_CACHE_SECONDS: int = 3600
+    AUTHOR_CARD_LOCAL_SECONDS: int = 30
+    AUTHOR_CARD_LRU_SIZE: int = 10000
+
+    # Uploads are streamed to disk in chunks; larger files are rejected
+    # mid-stream with 413
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CONCURRENCY: int = 4
+
+    # Processes used to decode/resize uploaded images into variants
+    IMAGE_WORKERS: int = 2
+
+    # Logging: "json" (one object per line) or "text"; records are written by
+    # a background thread. Hot-path debug logs (log_sampled) keep this fraction
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATE: float = 0.01
 
     class Config:
         env_file = ".env"
@@ -50,6 +116,7 @@ class Settings(BaseSettings):
         os.makedirs(self.MEDIA_ROOT, exist_ok=True)
         os.makedirs(self.POSTS_MEDIA_DIR, exist_ok=True)
         os.makedirs(self.AVATAR_DIR, exist_ok=True)
+        os.makedirs(self.MEDIA_BLOB_DIR, exist_ok=True)
 
 
 settings = Settings()
@@ -0,0 +1,229 @@
+# app/core/instrumentation.py
+"""
+Prometheus metrics for request latency and what it is spent on.
+
+`request_metrics_middleware` times every HTTP request by route template and
+counts the SQL statements (SQLAlchemy cursor events) and Redis commands it
+issued, with their total time, so an N+1 shows up as a jump in
+`db_queries_per_request` for that route. `timed` adds a latency histogram to
+individual functions; websocket_manager keeps the connection gauges current.
+
+Served at /metrics (see routes/metrics_routes.py). With gunicorn/uvicorn
+workers set PROMETHEUS_MULTIPROC_DIR so every worker's samples are merged.
+"""
+import asyncio
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Optional
+
+from fastapi import Request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling a request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent in SQL statements while handling a request",
+    ["route"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Latency of individual SQL statements"
+)
+REDIS_COMMANDS_PER_REQUEST = Histogram(
+    "redis_commands_per_request",
+    "Redis round trips (commands or pipelines) while handling a request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS
+)
+REDIS_TIME_PER_REQUEST = Histogram(
+    "redis_time_per_request_seconds",
+    "Time spent waiting on Redis while handling a request",
+    ["route"]
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Latency of individual Redis round trips",
+    ["command"]
+)
+FUNCTION_DURATION = Histogram(
+    "function_duration_seconds",
+    "Latency of functions decorated with @timed",
+    ["function"]
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open WebSocket connections / GraphQL subscriptions",
+    ["channel"],
+    multiprocess_mode="livesum"
+)
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_time: float = 0.0
+    redis_commands: int = 0
+    redis_time: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Counters of the request being handled, None outside a request"""
+    return _request_stats.get()
+
+
+def _route_label(request: Request) -> str:
+    # Template ("/posts/{post_id}") rather than the raw path, to bound label cardinality
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def request_metrics_middleware(request: Request, call_next):
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    start = perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = perf_counter() - start
+        _request_stats.reset(token)
+        route = _route_label(request)
+        HTTP_REQUEST_DURATION.labels(request.method, route, str(status)).observe(elapsed)
+        DB_QUERIES_PER_REQUEST.labels(route).observe(stats.db_queries)
+        DB_TIME_PER_REQUEST.labels(route).observe(stats.db_time)
+        REDIS_COMMANDS_PER_REQUEST.labels(route).observe(stats.redis_commands)
+        REDIS_TIME_PER_REQUEST.labels(route).observe(stats.redis_time)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = perf_counter() - starts.pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += elapsed
+
+
+def _record_redis(command: str, elapsed: float) -> None:
+    REDIS_COMMAND_DURATION.labels(command).observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.redis_commands += 1
+        stats.redis_time += elapsed
+
+
+_installed = False
+
+
+def install_instrumentation() -> None:
+    """Hook SQLAlchemy engines and redis.asyncio clients (idempotent)"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    # Every Engine, including the one behind SessionLocal
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    from redis.asyncio.client import Pipeline, Redis
+
+    execute_command = Redis.execute_command
+
+    @wraps(execute_command)
+    async def timed_execute_command(self, *args, **options):
+        start = perf_counter()
+        try:
+            return await execute_command(self, *args, **options)
+        finally:
+            _record_redis(str(args[0]).upper() if args else "UNKNOWN", perf_counter() - start)
+
+    # A pipeline is one round trip however many commands it queued
+    execute_pipeline = Pipeline.execute
+
+    @wraps(execute_pipeline)
+    async def timed_execute_pipeline(self, *args, **kwargs):
+        start = perf_counter()
+        try:
+            return await execute_pipeline(self, *args, **kwargs)
+        finally:
+            _record_redis("PIPELINE", perf_counter() - start)
+
+    Redis.execute_command = timed_execute_command
+    Pipeline.execute = timed_execute_pipeline
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Record the latency of a sync or async function in function_duration_seconds"""
+
+    def decorator(func):
+        child = FUNCTION_DURATION.labels(name or f"{func.__module__}.{func.__qualname__}")
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(perf_counter() - start)
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(perf_counter() - start)
+
+        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+
+    return decorator
+
+
+def render_metrics() -> tuple:
+    """(body, content type) for the Prometheus text exposition"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
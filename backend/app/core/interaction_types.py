@@ -0,0 +1,145 @@
+# app/core/interaction_types.py
+import asyncio
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import InvalidInteractionTypeError
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Targets an interaction type applies to when allowed_targets is not set
+DEFAULT_TARGETS: FrozenSet[str] = frozenset({"POST", "COMMENT"})
+
+
+@dataclass(frozen=True)
+class InteractionTypeInfo:
+    interaction_type_id: int
+    name: str
+    allowed_targets: FrozenSet[str]
+    is_active: bool
+    display_order: Optional[int]
+
+
+class InteractionTypeRegistry:
+    """
+    Immutable snapshot of the interaction_types table.
+
+    A snapshot is never modified after it is built; a reload builds a new one
+    and swaps the module-level reference, so readers on any thread always see
+    a consistent mapping without locking.
+    """
+
+    __slots__ = ("by_name", "by_id", "loaded_at")
+
+    def __init__(self, types: Iterable[InteractionTypeInfo]):
+        types = list(types)
+        self.by_name: Mapping[str, InteractionTypeInfo] = MappingProxyType({t.name: t for t in types})
+        self.by_id: Mapping[int, InteractionTypeInfo] = MappingProxyType(
+            {t.interaction_type_id: t for t in types}
+        )
+        self.loaded_at = time.time()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def id(self, name: str) -> int:
+        """ID for an interaction type name; raises InvalidInteractionTypeError if unknown"""
+        info = self.by_name.get(name)
+        if info is None:
+            raise InvalidInteractionTypeError(name)
+        return info.interaction_type_id
+
+    def ids(self, names: Iterable[str]) -> List[int]:
+        return [self.id(name) for name in names]
+
+    def name(self, interaction_type_id: int) -> Optional[str]:
+        info = self.by_id.get(interaction_type_id)
+        return info.name if info else None
+
+    def allows(self, name: str, target: str) -> bool:
+        info = self.by_name.get(name)
+        return bool(info and info.is_active and target in info.allowed_targets)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                "id": info.interaction_type_id,
+                "allowed_targets": sorted(info.allowed_targets),
+                "is_active": info.is_active,
+                "display_order": info.display_order
+            }
+            for name, info in self.by_name.items()
+        }
+
+
+_registry: Optional[InteractionTypeRegistry] = None
+_load_lock = threading.Lock()
+_reload_tasks: set = set()
+
+
+def load_interaction_types(db: Optional[Session] = None) -> InteractionTypeRegistry:
+    """Read interaction_types and atomically replace the process-wide registry"""
+    global _registry
+    owns_session = db is None
+    if owns_session:
+        from database.database import SessionLocal
+        db = SessionLocal()
+    try:
+        rows = db.execute(text("""
+            SELECT interaction_type_id, interaction_type_name, allowed_targets, is_active, display_order
+            FROM interaction_types
+        """)).fetchall()
+    finally:
+        if owns_session:
+            db.close()
+
+    registry = InteractionTypeRegistry(
+        InteractionTypeInfo(
+            interaction_type_id=type_id,
+            name=name,
+            allowed_targets=frozenset(t.upper() for t in targets) if targets else DEFAULT_TARGETS,
+            is_active=is_active is not False,
+            display_order=display_order
+        )
+        for type_id, name, targets, is_active, display_order in rows
+    )
+    _registry = registry
+    logger.info("Loaded %s interaction types", len(registry.by_name))
+    return registry
+
+
+def get_interaction_types() -> InteractionTypeRegistry:
+    """Current registry, loaded on first use if startup did not load it"""
+    registry = _registry
+    if registry is None:
+        with _load_lock:
+            registry = _registry or load_interaction_types()
+    return registry
+
+
+async def reload_interaction_types() -> InteractionTypeRegistry:
+    """Reload from the database without blocking the event loop"""
+    return await asyncio.to_thread(load_interaction_types)
+
+
+def install_reload_signal(loop: asyncio.AbstractEventLoop) -> bool:
+    """Reload the registry on SIGHUP. Returns False where signals aren't supported."""
+    def _on_sighup():
+        logger.info("SIGHUP received, reloading interaction types")
+        task = loop.create_task(reload_interaction_types())
+        _reload_tasks.add(task)
+        task.add_done_callback(_reload_tasks.discard)
+
+    try:
+        loop.add_signal_handler(signal.SIGHUP, _on_sighup)
+        return True
+    except (AttributeError, NotImplementedError, RuntimeError):
+        return False
@@ -1,44 +1,116 @@
 # app/core/logger.py
+"""
+Application logging.
+
+Every logger under "app" shares one QueueHandler: the calling code only
+appends the record to an in-memory queue, and a QueueListener thread does
+the formatting and the stdout write, so log I/O never blocks the event loop.
+Output is one JSON object per line (LOG_FORMAT=text for local development).
+
+Records are enqueued unformatted, so `logger.debug("... %s", value)` costs a
+level check when DEBUG is off and the %-formatting happens on the listener
+thread. Per-request/per-row debug logs go through `log_sampled`.
+"""
 import asyncio
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
-from typing import Any
+from datetime import datetime, timezone
 from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
 from time import time
+from typing import Any, Optional
 
-# Create default logger instance
-logger = logging.getLogger("app")
-logger.setLevel(logging.INFO)
+from app.core.config import settings
 
-# Add handler if none exists
-if not logger.handlers:
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
 
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with `extra` fields at the top level"""
 
-def setup_logger(name: str) -> logging.Logger:
-    """Setup a logger instance with the given name"""
-    logger = logging.getLogger(f"app.{name}")
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue the record as-is.
+
+    QueueHandler.prepare() formats the message in the caller so records can
+    be pickled; the queue here is in-process, so formatting is left to the
+    listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
-    if not logger.handlers:  # Prevent duplicate handlers
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
 
-        formatter = logging.Formatter(
+_listener: Optional[QueueListener] = None
+
+
+def _make_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT.lower() == "text":
+        return logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+    return JsonFormatter()
+
+
+def configure_logging() -> logging.Logger:
+    """Attach the queue handler to the "app" logger and start the listener (idempotent)"""
+    global _listener
+    app_logger = logging.getLogger("app")
+    if _listener is not None:
+        return app_logger
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_make_formatter())
 
-    return logger
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.handlers = [_DeferredQueueHandler(log_queue)]
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return app_logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Create default logger instance
+logger = configure_logging()
+
+
+def setup_logger(name: str) -> logging.Logger:
+    """Logger for `name` under the "app" hierarchy; handlers live on "app" only"""
+    if name != "app" and not name.startswith("app."):
+        name = f"app.{name}"
+    return logging.getLogger(name)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -46,6 +118,28 @@ def get_logger(name: str) -> logging.Logger:
     return setup_logger(name)
 
 
+def log_sampled(
+        logger: logging.Logger,
+        msg: str,
+        *args: Any,
+        level: int = logging.DEBUG,
+        rate: Optional[float] = None
+) -> None:
+    """
+    Log roughly `rate` (default LOG_SAMPLE_RATE) of the calls that reach here.
+
+    The level check and the dice roll happen before a record is created, so a
+    disabled or unsampled call is nearly free. Records carry `sample_rate` so
+    counts can be scaled back up.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = settings.LOG_SAMPLE_RATE if rate is None else rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.log(level, msg, *args, extra={"sample_rate": rate}, stacklevel=2)
+
+
 def log_execution_time(logger: logging.Logger):
     """Decorator to log function execution time"""
 
@@ -56,11 +150,11 @@ def log_execution_time(logger: logging.Logger):
             try:
                 result = await func(*args, **kwargs)
                 execution_time = time() - start_time
-                logger.info(f"{func.__name__} executed in {execution_time:.2f}s")
+                logger.info("%s executed in %.2fs", func.__name__, execution_time)
                 return result
             except Exception as e:
                 execution_time = time() - start_time
-                logger.error(f"{func.__name__} failed after {execution_time:.2f}s: {str(e)}")
+                logger.error("%s failed after %.2fs: %s", func.__name__, execution_time, e)
                 raise
 
         @wraps(func)
@@ -69,11 +163,11 @@ def log_execution_time(logger: logging.Logger):
             try:
                 result = func(*args, **kwargs)
                 execution_time = time() - start_time
-                logger.info(f"{func.__name__} executed in {execution_time:.2f}s")
+                logger.info("%s executed in %.2fs", func.__name__, execution_time)
                 return result
             except Exception as e:
                 execution_time = time() - start_time
-                logger.error(f"{func.__name__} failed after {execution_time:.2f}s: {str(e)}")
+                logger.error("%s failed after %.2fs: %s", func.__name__, execution_time, e)
                 raise
 
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
@@ -82,4 +176,7 @@ def log_execution_time(logger: logging.Logger):
 
 
 # Export the logger instance and functions
-__all__ = ['logger', 'get_logger', 'setup_logger', 'log_execution_time']
\ No newline at end of file
+__all__ = [
+    'logger', 'get_logger', 'setup_logger', 'configure_logging', 'shutdown_logging',
+    'log_sampled', 'log_execution_time', 'JsonFormatter'
+]
@@ -3,8 +3,10 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from app.RedisCache import RedisCache
+from app.core.config import settings
 from app.core.exceptions import CacheError
 from app.core.logger import get_logger
+from app.core.rollups import get_rollups
 
 logger = get_logger(__name__)
 #logger = logging.getLogger(__name__)
@@ -14,7 +16,8 @@ class MetricsCollector:
     def __init__(self, cache: RedisCache):
         self.cache = cache
         self.metrics_prefix = "metrics:"
-        self.aggregation_window = timedelta(minutes=5)
+        self.aggregation_window = timedelta(seconds=settings.METRICS_AGGREGATION_WINDOW)
+        self.rollups = get_rollups(cache)
 
     async def record_interaction(
             self,
@@ -71,14 +74,16 @@ class MetricsCollector:
         try:
             counts_key = f"{self.metrics_prefix}counts:post:{post_id}"
 
-            if action == "add":
+            if action in ("add", "added"):
                 # Increment count
                 await self.cache.redis.hincrby(counts_key, interaction_type, 1)
-            elif action == "remove":
+                await self.rollups.record(post_id, interaction_type, 1)
+            elif action in ("remove", "removed"):
                 # Decrement count but don't go below 0
                 current = await self.cache.redis.hget(counts_key, interaction_type)
                 if current and int(current) > 0:
                     await self.cache.redis.hincrby(counts_key, interaction_type, -1)
+                await self.rollups.record(post_id, interaction_type, -1)
 
         except Exception as e:
             logger.error(f"Error updating aggregated counts: {str(e)}")
@@ -129,12 +134,18 @@ class MetricsCollector:
             Dict containing aggregated metrics
         """
         try:
-            counts_key = f"{self.metrics_prefix}counts:post:{post_id}"
-            counts = await self.cache.get(counts_key) or {}
+            if time_window is not None:
+                # Windowed counts come from the time-bucketed rollups
+                counts = await self.rollups.get_window_totals(post_id, time_window)
+            else:
+                counts_key = f"{self.metrics_prefix}counts:post:{post_id}"
+                raw = await self.cache.redis.hgetall(counts_key) or {}
+                counts = {k: int(v) for k, v in raw.items()}
 
             return {
                 "interaction_counts": counts,
                 "total_interactions": sum(counts.values()),
+                "time_window_seconds": int(time_window.total_seconds()) if time_window else None,
                 "timestamp": datetime.utcnow().isoformat()
             }
 
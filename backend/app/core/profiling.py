@@ -0,0 +1,190 @@
+# app/core/profiling.py
+"""
+Opt-in per-request profiling for diagnosing slow routes in production.
+
+With PROFILING_ENABLED, `profiling_middleware` runs a request under a
+profiler when either
+  - it is picked by PROFILING_SAMPLE_RATE, or
+  - it carries a valid `X-Profile: <expires>.<signature>` header, minted by
+    POST /admin/profiles/token (HMAC of the expiry with PROFILING_SECRET).
+
+The result is written to PROFILING_DIR under the request ID (X-Request-ID,
+or a generated one returned in X-Profile-Id) and the directory is trimmed
+to the newest PROFILING_MAX_FILES profiles. GET /admin/profiles lists them,
+GET /admin/profiles/{profile_id} downloads one.
+
+PROFILING_ENGINE "cprofile" writes pstats files (snakeviz, `python -m
+pstats`); "pyinstrument", if installed, writes an HTML flame view and
+follows the request across awaits, whereas cProfile also records whatever
+else the event loop runs meanwhile. Only one request per worker is
+profiled at a time, and only the event loop thread is seen: sync (`def`)
+endpoints run in the threadpool. When disabled the middleware is not
+installed at all.
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import time
+import uuid
+from typing import List, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # optional; cProfile is always available
+    PyinstrumentProfiler = None
+
+logger = get_logger(__name__)
+
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_EXTENSIONS = {"cprofile": ".prof", "pyinstrument": ".html"}
+
+# A second cProfile can't be enabled on the same thread, and concurrent
+# requests on the loop would pollute each other's profile anyway
+_profiling_active = False
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(settings.PROFILING_SECRET.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def sign_profile_token(ttl_seconds: int = 300) -> str:
+    """Value for the X-Profile header, valid for ttl_seconds"""
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_signature(expires)}"
+
+
+def verify_profile_token(token: str) -> bool:
+    if not settings.PROFILING_SECRET or not token:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+def _should_profile(request: Request) -> bool:
+    if verify_profile_token(request.headers.get("X-Profile", "")):
+        return True
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def _engine() -> str:
+    if settings.PROFILING_ENGINE == "pyinstrument" and PyinstrumentProfiler is not None:
+        return "pyinstrument"
+    return "cprofile"
+
+
+def _request_id(request: Request) -> str:
+    request_id = request.headers.get("X-Request-ID", "")
+    return request_id if _PROFILE_ID.match(request_id) else uuid.uuid4().hex
+
+
+def _write_profile(profiler, engine: str, profile_id: str, meta: dict) -> None:
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    stem = os.path.join(settings.PROFILING_DIR, f"{int(time.time() * 1000)}-{profile_id}")
+    if engine == "pyinstrument":
+        with open(stem + ".html", "w") as out_file:
+            out_file.write(profiler.output_html())
+    else:
+        profiler.dump_stats(stem + ".prof")
+    with open(stem + ".json", "w") as out_file:
+        json.dump(meta, out_file)
+    _trim(settings.PROFILING_MAX_FILES)
+
+
+def _trim(max_profiles: int) -> None:
+    """Ring buffer: drop the oldest profiles beyond max_profiles"""
+    for meta in list_profiles()[max_profiles:]:
+        for path in (meta["meta_path"], meta["path"]):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # another worker trimmed it first
+
+
+def list_profiles() -> List[dict]:
+    """Stored profiles, newest first"""
+    try:
+        names = os.listdir(settings.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+
+    profiles = []
+    for name in sorted((n for n in names if n.endswith(".json")), reverse=True):
+        meta_path = os.path.join(settings.PROFILING_DIR, name)
+        try:
+            with open(meta_path) as in_file:
+                meta = json.load(in_file)
+        except (OSError, ValueError):
+            continue
+        stem = meta_path[:-len(".json")]
+        meta["meta_path"] = meta_path
+        meta["path"] = stem + _EXTENSIONS.get(meta.get("engine"), ".prof")
+        profiles.append(meta)
+    return profiles
+
+
+def find_profile(profile_id: str) -> Optional[dict]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    for meta in list_profiles():
+        if meta["profile_id"] == profile_id and os.path.exists(meta["path"]):
+            return meta
+    return None
+
+
+async def profiling_middleware(request: Request, call_next):
+    global _profiling_active
+    if _profiling_active or not _should_profile(request):
+        return await call_next(request)
+
+    engine = _engine()
+    profile_id = _request_id(request)
+    if engine == "pyinstrument":
+        profiler = PyinstrumentProfiler(interval=settings.PROFILING_INTERVAL, async_mode="enabled")
+    else:
+        profiler = cProfile.Profile()
+
+    _profiling_active = True
+    start = time.perf_counter()
+    if engine == "pyinstrument":
+        profiler.start()
+    else:
+        profiler.enable()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        if engine == "pyinstrument":
+            profiler.stop()
+        else:
+            profiler.disable()
+        _profiling_active = False
+
+    meta = {
+        "profile_id": profile_id,
+        "engine": engine,
+        "method": request.method,
+        "path": request.url.path,
+        "status": status,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        "created_at": time.time(),
+    }
+    try:
+        await asyncio.to_thread(_write_profile, profiler, engine, profile_id, meta)
+        logger.info("Profiled %s %s as %s", request.method, request.url.path, profile_id)
+    except Exception as e:
+        logger.error("Error writing profile %s: %s", profile_id, e)
+
+    response.headers["X-Profile-Id"] = profile_id
+    return response
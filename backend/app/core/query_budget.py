@@ -0,0 +1,186 @@
+# app/core/query_budget.py
+"""
+SQL query budgets, to catch N+1 regressions.
+
+    with query_budget(4, "GET /posts"):
+        await get_all_posts(db, limit=20)
+
+counts every statement sent through a SQLAlchemy Engine inside the block and
+raises QueryBudgetExceeded (an AssertionError, so pytest reports it as a
+failure) when there were more than 4, logging the statements that repeated.
+Tests get the same thing as the `query_budget` fixture:
+
+    pytest_plugins = ["app.core.query_budget"]
+
+    def test_feed(client, query_budget):
+        with query_budget(4):
+            client.get("/posts")
+
+Endpoints declare their budget with @declare_query_budget(n); with
+QUERY_BUDGET_ENABLED (development) `query_budget_middleware` counts each
+request, returns the count in X-Query-Count and logs routes that go over.
+"""
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|__\[POSTCOMPILE_\w+\]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement with literals, placeholders and IN-lists normalised to '?'"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """More statements were executed than the declared budget"""
+
+
+class QueryCounter:
+    """Statements executed while the counter was active"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def fingerprints(self) -> Counter:
+        return Counter(fingerprint(statement) for statement in self.statements)
+
+    def repeated(self, min_count: int = 2) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least min_count times, most frequent first"""
+        return [(sql, n) for sql, n in self.fingerprints().most_common() if n >= min_count]
+
+    def report(self, limit: int = 5) -> str:
+        lines = [f"{self.count} queries"]
+        for sql, n in self.repeated()[:limit]:
+            lines.append(f"  {n}x {sql[:300]}")
+        return "\n".join(lines)
+
+
+_active_counters: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("query_counters", default=())
+# Counters that see every thread (TestClient runs the app in its own thread)
+_global_counters: Tuple[QueryCounter, ...] = ()
+_global_lock = threading.Lock()
+_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active_counters.get() + _global_counters:
+        counter.statements.append(statement)
+
+
+def _install() -> None:
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def count_queries(all_threads: bool = False) -> Iterator[QueryCounter]:
+    """
+    Count statements executed in this context (nests; asyncio tasks and
+    to_thread calls started inside inherit it). all_threads=True counts
+    statements from every thread instead, for code driven through a client.
+    """
+    global _global_counters
+    _install()
+    counter = QueryCounter()
+    if all_threads:
+        with _global_lock:
+            _global_counters = _global_counters + (counter,)
+        try:
+            yield counter
+        finally:
+            with _global_lock:
+                _global_counters = tuple(c for c in _global_counters if c is not counter)
+        return
+
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "", all_threads: bool = False) -> Iterator[QueryCounter]:
+    """count_queries that raises QueryBudgetExceeded if the block used more than max_queries"""
+    with count_queries(all_threads) as counter:
+        yield counter
+    if counter.count > max_queries:
+        report = counter.report()
+        logger.warning("Query budget exceeded%s (budget %d): %s", f" for {label}" if label else "",
+                       max_queries, report)
+        raise QueryBudgetExceeded(f"{label or 'block'} used {report} (budget {max_queries})")
+
+
+def declare_query_budget(max_queries: int) -> Callable:
+    """Declare how many statements an endpoint may issue; checked by query_budget_middleware"""
+
+    def decorator(func):
+        func.__query_budget__ = max_queries
+        return func
+
+    return decorator
+
+
+def _endpoint_budget(request: Request) -> Optional[int]:
+    endpoint = request.scope.get("endpoint")
+    budget = getattr(endpoint, "__query_budget__", None)
+    return budget if budget is not None else settings.QUERY_BUDGET_DEFAULT
+
+
+async def query_budget_middleware(request: Request, call_next):
+    """Development aid: count statements per request and log routes over budget"""
+    with count_queries() as counter:
+        response = await call_next(request)
+
+    response.headers["X-Query-Count"] = str(counter.count)
+    budget = _endpoint_budget(request)
+    if budget and counter.count > budget:
+        logger.warning(
+            "Query budget exceeded for %s %s (budget %d): %s",
+            request.method, request.url.path, budget, counter.report()
+        )
+    return response
+
+
+try:
+    import pytest
+except ImportError:  # pytest is only installed for tests
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture(name="query_budget")
+    def query_budget_fixture():
+        """
+        query_budget counting every thread, for `with query_budget(n): ...`
+        around TestClient calls
+        """
+        def budget(max_queries: int, label: str = ""):
+            return query_budget(max_queries, label, all_threads=True)
+        return budget
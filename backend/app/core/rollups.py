@@ -0,0 +1,256 @@
+# app/core/rollups.py
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List, Tuple
+from app.RedisCache import RedisCache
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bucket sizes in seconds, finest first. The finest bucket follows the
+# configured aggregation window so it lines up with MetricsCollector.
+GRANULARITIES: Dict[str, int] = {
+    "5m": settings.METRICS_AGGREGATION_WINDOW,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+# Upper bound on how long each granularity is kept; the effective retention
+# is the smaller of this and METRICS_RETENTION_DAYS.
+MAX_RETENTION: Dict[str, int] = {
+    "5m": 2 * 86400,
+    "1h": 14 * 86400,
+    "1d": 365 * 86400,
+}
+
+# Largest number of buckets a single range query will read
+MAX_BUCKETS_PER_QUERY = 500
+
+# Add a delta to the current bucket of every granularity without taking a
+# count below zero; removing an interaction that was counted in an older
+# bucket must not leave a negative net count in this one.
+# KEYS: one bucket per granularity, then the active index
+# ARGV: interaction type, delta, post_id, event time, then expire-at per bucket
+_RECORD_SCRIPT = """
+local field, delta = ARGV[1], tonumber(ARGV[2])
+for i = 1, #KEYS - 1 do
+    local current = tonumber(redis.call('HGET', KEYS[i], field) or '0')
+    local change = delta
+    if current + change < 0 then
+        change = -current
+    end
+    if change ~= 0 then
+        redis.call('HINCRBY', KEYS[i], field, change)
+        redis.call('EXPIREAT', KEYS[i], ARGV[4 + i])
+    end
+end
+redis.call('ZADD', KEYS[#KEYS], ARGV[4], ARGV[3])
+return 1
+"""
+
+
+def _to_ts(value: datetime) -> float:
+    """Epoch seconds for a datetime; naive values are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class InteractionRollups:
+    """Per-post, per-interaction-type counters kept in fixed time buckets"""
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.prefix = "metrics:rollup:"
+        self.active_key = f"{self.prefix}active"
+        retention_seconds = settings.METRICS_RETENTION_DAYS * 86400
+        self.retention = {
+            name: min(MAX_RETENTION[name], retention_seconds)
+            for name in GRANULARITIES
+        }
+        self._record_script = None
+
+    def _bucket_start(self, ts: float, size: int) -> int:
+        return int(ts) - (int(ts) % size)
+
+    def _bucket_key(self, granularity: str, post_id: int, bucket_start: int) -> str:
+        return f"{self.prefix}{granularity}:post:{post_id}:{bucket_start}"
+
+    async def record(
+            self,
+            post_id: int,
+            interaction_type: str,
+            delta: int = 1,
+            at: Optional[datetime] = None
+    ) -> None:
+        """
+        Add a delta to the current bucket of every granularity
+
+        Args:
+            post_id: ID of the post
+            interaction_type: Type of interaction (like, dislike, etc.)
+            delta: +1 for an added interaction, -1 for a removed one; a
+                bucket's count never goes below zero
+            at: Event time (default: now, UTC)
+        """
+        ts = _to_ts(at) if at else time.time()
+        keys, expire_at = [], []
+        for name, size in GRANULARITIES.items():
+            start = self._bucket_start(ts, size)
+            keys.append(self._bucket_key(name, post_id, start))
+            # Expire relative to the end of the bucket so a bucket is
+            # always kept for the full retention period
+            expire_at.append(start + size + self.retention[name])
+        try:
+            if self._record_script is None:
+                self._record_script = self.cache.redis.register_script(_RECORD_SCRIPT)
+            await self._record_script(
+                keys=keys + [self.active_key],
+                args=[interaction_type, delta, post_id, repr(ts)] + expire_at
+            )
+        except Exception as e:
+            logger.error("Error recording rollup for post %s: %s", post_id, e)
+
+    def _pick_granularity(self, start_ts: float, end_ts: float) -> str:
+        """Finest granularity that is still retained and fits the bucket budget"""
+        now = time.time()
+        for name, size in GRANULARITIES.items():
+            if start_ts < now - self.retention[name]:
+                continue
+            if (end_ts - start_ts) / size <= MAX_BUCKETS_PER_QUERY:
+                return name
+        return "1d"
+
+    async def get_range(
+            self,
+            post_id: int,
+            start: datetime,
+            end: Optional[datetime] = None,
+            granularity: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get bucketed counts for a post between two UTC datetimes
+
+        Args:
+            post_id: ID of the post
+            start: Start of the range (inclusive)
+            end: End of the range (default: now)
+            granularity: One of GRANULARITIES (default: picked from the range)
+
+        Returns:
+            Dict with the granularity and start actually used and a list of
+            non-empty buckets. A picked granularity that would still need more
+            than MAX_BUCKETS_PER_QUERY buckets moves start forward.
+
+        Raises:
+            ValueError: Unknown granularity, or an explicit one that needs
+                more than MAX_BUCKETS_PER_QUERY buckets for this range
+        """
+        end = end or datetime.utcnow()
+        start_ts, end_ts = _to_ts(start), _to_ts(end)
+        explicit = granularity is not None
+        if not explicit:
+            granularity = self._pick_granularity(start_ts, end_ts)
+        elif granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+
+        size = GRANULARITIES[granularity]
+        first = self._bucket_start(start_ts, size)
+        if (int(end_ts) - first) // size + 1 > MAX_BUCKETS_PER_QUERY:
+            if explicit:
+                raise ValueError(
+                    f"{granularity} buckets over this range exceed {MAX_BUCKETS_PER_QUERY}; "
+                    f"use a coarser granularity or a shorter range"
+                )
+            first = self._bucket_start(end_ts, size) - (MAX_BUCKETS_PER_QUERY - 1) * size
+            clamped = datetime.fromtimestamp(first, timezone.utc)
+            start = clamped if start.tzinfo else clamped.replace(tzinfo=None)
+        bucket_starts = range(first, int(end_ts) + 1, size)
+
+        buckets: List[Dict[str, Any]] = []
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            for bucket_start in bucket_starts:
+                pipe.hgetall(self._bucket_key(granularity, post_id, bucket_start))
+            results = await pipe.execute()
+
+            for bucket_start, raw in zip(bucket_starts, results):
+                if not raw:
+                    continue
+                buckets.append({
+                    "bucket": datetime.utcfromtimestamp(bucket_start).isoformat(),
+                    "counts": {k: int(v) for k, v in raw.items()}
+                })
+        except Exception as e:
+            logger.error("Error reading rollups for post %s: %s", post_id, e)
+
+        return {
+            "post_id": post_id,
+            "granularity": granularity,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "buckets": buckets
+        }
+
+    async def get_window_totals(
+            self,
+            post_id: int,
+            window: timedelta,
+            granularity: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Net interaction counts per type over the trailing window"""
+        end = datetime.utcnow()
+        result = await self.get_range(post_id, end - window, end, granularity)
+        totals: Dict[str, int] = {}
+        for bucket in result["buckets"]:
+            for interaction_type, count in bucket["counts"].items():
+                totals[interaction_type] = totals.get(interaction_type, 0) + count
+        return totals
+
+    async def get_velocity(
+            self,
+            post_id: int,
+            window: timedelta = timedelta(hours=1)
+    ) -> Dict[str, float]:
+        """Net interactions per hour, per type, over the trailing window"""
+        totals = await self.get_window_totals(post_id, window)
+        hours = max(window.total_seconds() / 3600, 1e-9)
+        return {k: round(v / hours, 4) for k, v in totals.items()}
+
+    async def get_active_posts(
+            self,
+            since: timedelta,
+            limit: int = 1000
+    ) -> List[Tuple[int, float]]:
+        """Posts with any interaction inside the trailing window, newest first"""
+        try:
+            min_ts = time.time() - since.total_seconds()
+            rows = await self.cache.redis.zrevrangebyscore(
+                self.active_key, "+inf", min_ts, start=0, num=limit, withscores=True
+            )
+            return [(int(post_id), score) for post_id, score in rows]
+        except Exception as e:
+            logger.error("Error reading active posts: %s", e)
+            return []
+
+    async def prune_active(self) -> int:
+        """Drop posts from the active index once their last event is out of retention"""
+        try:
+            cutoff = time.time() - max(self.retention.values())
+            return await self.cache.redis.zremrangebyscore(self.active_key, "-inf", cutoff)
+        except Exception as e:
+            logger.error("Error pruning active posts: %s", e)
+            return 0
+
+
+# Singleton instance
+_rollups: Optional[InteractionRollups] = None
+
+
+def get_rollups(cache: RedisCache) -> InteractionRollups:
+    """Get or create InteractionRollups instance"""
+    global _rollups
+    if _rollups is None:
+        _rollups = InteractionRollups(cache)
+    return _rollups
@@ -0,0 +1,27 @@
+# datamodels/media_datamodels.py
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Index
+from sqlalchemy.sql import func
+from database.database import Base
+
+
+class MediaBlob(Base):
+    """
+    One stored file in the content-addressed media store.
+
+    ref_count is the number of Post.images / Post.image_url / UserProfile.avatar_img
+    references; blobs at zero past the grace period are removed by
+    `python -m app.cli media-gc`.
+    """
+    __tablename__ = "media_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    extension = Column(String(10), nullable=False)
+    size = Column(BigInteger, nullable=False, default=0)
+    kind = Column(String(20), nullable=False)  # post / avatar
+    ref_count = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_media_blobs_unreferenced", "ref_count", "updated_at"),
+    )
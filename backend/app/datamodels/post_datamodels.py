@@ -34,6 +34,7 @@ class Post(Base):
     # Media & Content
     image_url = Column(String, nullable=True)
     images = Column(JSON, nullable=True)
+    image_variants = Column(JSON, nullable=True)  # image url -> {card, detail} WebP/JPEG variants
     video_url = Column(String, nullable=True)
     video_metadata = Column(JSON, nullable=True)  # Future enhancement
     audio_url = Column(String, nullable=True)  # Future enhancement
@@ -52,6 +52,7 @@ class UserProfile(Base):
     user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
     username = Column(String, unique=True, nullable=False)
     avatar_img = Column(String, default='default_url')
+    avatar_variants = Column(JSON, nullable=True)  # {"64", "200"} WebP/JPEG variants
     about = Column(Text)
     post_cnt = Column(Integer, default=0)
     comment_cnt = Column(Integer, default=0)
@@ -1,18 +1,24 @@
 # app/applib/graphql/context.py
-import logging
-from typing import Optional, Any, Dict
+from typing import AsyncGenerator, Optional, Any, Dict
 from sqlalchemy.orm import Session
 from strawberry.fastapi import BaseContext
 from database.database import SessionLocal
 from app.datamodels.user_datamodels import User
 from app.auth.utils import get_current_user
+from app.lib.graphql.loaders import GraphQLLoaders
 from app.utils.token_debug import verify_and_debug_token
 from fastapi import Request
+from app.core.logger import get_logger, log_sampled
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 
 class GraphQLContext(BaseContext):
+    """
+    Per-request (or per-WebSocket-connection) state. Owns the one DB session
+    every resolver uses, which get_context closes, and the request's loaders.
+    """
+
     def __init__(
             self,
             db: Session,
@@ -25,11 +31,23 @@ class GraphQLContext(BaseContext):
         self._user = user
         self.request = request
         self.connection_params = connection_params
+        self.loaders = GraphQLLoaders(db, self._viewer_id)
 
     @property
     def user(self) -> Optional[User]:
         return self._user
 
+    def _viewer_id(self) -> Optional[int]:
+        return self._user.user_id if self._user else None
+
+    def refresh_loaders(self) -> None:
+        """
+        Drop cached rows and loader results; subscriptions call this per
+        event since their context lives as long as the connection
+        """
+        self.db.expire_all()
+        self.loaders = GraphQLLoaders(self.db, self._viewer_id)
+
 
 async def extract_token(request: Any, connection_params: Optional[Dict[str, Any]] = None) -> Optional[str]:
     """Extract token from request headers or connection params"""
@@ -42,7 +60,7 @@ async def extract_token(request: Any, connection_params: Optional[Dict[str, Any]
             token = auth[7:]
         else:
             token = auth
-        logger.info(f"Found token in connection params: {token[:20]}...")
+        logger.debug("Found token in connection params")
         return token
 
     # Try request headers
@@ -53,7 +71,7 @@ async def extract_token(request: Any, connection_params: Optional[Dict[str, Any]
         else:
             token = auth_header
         if token:
-            logger.info(f"Found token in headers: {token[:20]}...")
+            logger.debug("Found token in headers")
             return token
 
     return None
@@ -68,20 +86,23 @@ async def authenticate_user(token: str, db: Session, request: Any = None) -> Opt
 
         user = await get_current_user(request, token, db)
         if user:
-            logger.info(f"Successfully authenticated user {user.user_id}")
+            log_sampled(logger, "Authenticated user %s", user.user_id)
             return user
 
         logger.warning("No user found for valid token")
         return None
 
     except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", e)
         if token:
             verify_and_debug_token(token)  # Debug the token if available
         return None
 
-async def get_context(request: Any = None, connection_params: Optional[Dict[str, Any]] = None) -> GraphQLContext:
-    logger.info(f"GraphQL context request headers: {request.headers if request else 'No request'}")
+async def get_context(
+        request: Any = None,
+        connection_params: Optional[Dict[str, Any]] = None
+) -> AsyncGenerator[GraphQLContext, None]:
+    """FastAPI dependency: the session is closed once the operation (or subscription connection) ends"""
     db = SessionLocal()
     user = None
 
@@ -96,24 +117,22 @@ async def get_context(request: Any = None, connection_params: Optional[Dict[str,
         if token:
             try:
                 user = await get_current_user(request, token, db)
-                logger.info(f"Authenticated user {user.user_id} in GraphQL context")
+                log_sampled(logger, "Authenticated user %s in GraphQL context", user.user_id)
             except Exception as e:
-                logger.error(f"Auth error in context: {e}")
+                logger.warning("Auth error in context: %s", e)
+    except Exception as e:
+        logger.error("Context error: %s", e)
+        user = None
 
-        return GraphQLContext(
+    try:
+        yield GraphQLContext(
             db=db,
             user=user,
             request=request,
             connection_params=connection_params
         )
-    except Exception as e:
-        logger.error(f"Context error: {e}")
-        return GraphQLContext(
-            db=db,
-            user=None,
-            request=request,
-            connection_params=connection_params
-        )
+    finally:
+        db.close()
 
 
 async def get_authenticated_context(info) -> Optional[User]:
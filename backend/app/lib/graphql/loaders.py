@@ -0,0 +1,66 @@
+# app/lib/graphql/loaders.py
+"""
+Request-scoped DataLoaders for the GraphQL schema.
+
+Every `load(key)` made while one level of a query is being resolved is
+collected into a single batch, so each nesting level of a comment thread
+costs one replies query, one author-card lookup and one interaction-state
+lookup, however many comments it has. Loaders cache for the lifetime of
+the context, which is why GraphQLContext creates them per request.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from strawberry.dataloader import DataLoader
+
+from app.RedisCache import get_cache
+from app.services.author_cache import AuthorCard, get_author_card_cache
+from app.services.interaction_state import get_interaction_state_store
+from app.services.listing_queries import CommentRow, comment_rows_by_ids, reply_rows
+
+
+class GraphQLLoaders:
+    """
+    comments            comment_id -> CommentRow (or None)
+    replies             parent_comment_id -> [CommentRow], oldest first
+    users               user_id -> AuthorCard (or None)
+    interaction_states  comment_id -> the viewer's {"like": ..., ...}
+    """
+
+    def __init__(self, db: Session, viewer_id: Callable[[], Optional[int]]):
+        self.db = db
+        self._viewer_id = viewer_id
+        self.comments: DataLoader[int, Optional[CommentRow]] = DataLoader(load_fn=self._load_comments)
+        self.replies: DataLoader[int, List[CommentRow]] = DataLoader(load_fn=self._load_replies)
+        self.users: DataLoader[int, Optional[AuthorCard]] = DataLoader(load_fn=self._load_users)
+        self.interaction_states: DataLoader[int, Dict[str, bool]] = DataLoader(
+            load_fn=self._load_interaction_states
+        )
+
+    def prime_comments(self, rows: List[CommentRow]) -> None:
+        """Make rows fetched outside the loaders available to `comments`"""
+        for row in rows:
+            self.comments.prime(row.comment_id, row)
+
+    async def _load_comments(self, comment_ids: List[int]) -> List[Optional[CommentRow]]:
+        rows = {row.comment_id: row for row in comment_rows_by_ids(self.db, comment_ids)}
+        return [rows.get(comment_id) for comment_id in comment_ids]
+
+    async def _load_replies(self, parent_ids: List[int]) -> List[List[CommentRow]]:
+        by_parent: Dict[int, List[CommentRow]] = defaultdict(list)
+        rows = reply_rows(self.db, parent_ids)
+        for row in rows:
+            by_parent[row.parent_comment_id].append(row)
+        self.prime_comments(rows)
+        return [by_parent.get(parent_id, []) for parent_id in parent_ids]
+
+    async def _load_users(self, user_ids: List[int]) -> List[Optional[AuthorCard]]:
+        cards = await get_author_card_cache(get_cache()).get_many(self.db, user_ids)
+        return [cards.get(user_id) for user_id in user_ids]
+
+    async def _load_interaction_states(self, comment_ids: List[int]) -> List[Dict[str, bool]]:
+        states = await get_interaction_state_store(get_cache()).get_states(
+            self.db, self._viewer_id(), comment_ids, target="comment"
+        )
+        return [states[comment_id] for comment_id in comment_ids]
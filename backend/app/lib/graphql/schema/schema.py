@@ -1,11 +1,9 @@
 # backend/app/applib/graphql/schema/schema.py
 import strawberry
-import logging
 #from dataclasses import asdict
 from typing import AsyncGenerator, List, Optional
 from strawberry.types import Info
 from datetime import datetime
-from database.database import SessionLocal
 from app.lib.graphql.subscriptions import (
     comment_added_subscription,
     comment_updated_subscription,
@@ -20,11 +18,13 @@ from app.schemas.comment_schemas import (
 )
 
 from app.services.comment_service import CommentService
+from app.services.author_cache import AuthorCard
+from app.services.listing_queries import CommentRow, comment_thread_rows, user_comment_rows
 from app.lib.graphql.context import get_authenticated_context, extract_token
 from app.utils.token_debug import verify_and_debug_token
-#from app.core.logger import get_logger
+from app.core.logger import get_logger
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Type definitions
 @strawberry.type
@@ -68,19 +68,54 @@ class Comment:
     path: str
     depth: int
     root_comment_id: Optional[int]
-    user: User
-    username: str
-    avatar_img: Optional[str]
-    reputation_score: Optional[int]
     metrics: CommentMetrics
-    interaction_state: CommentInteractionState
     is_edited: bool
     is_deleted: bool
     created_at: str
     updated_at: Optional[str]
     last_activity: str
     active_viewers: int
-    replies: Optional[List['Comment']]
+    # Set when built from a service response (mutations, subscriptions);
+    # otherwise resolved in batches through info.context.loaders
+    prefetched_user: strawberry.Private[Optional[User]] = None
+    prefetched_state: strawberry.Private[Optional[CommentInteractionState]] = None
+    prefetched_replies: strawberry.Private[Optional[List['Comment']]] = None
+
+    async def _author(self, info: Info) -> User:
+        if self.prefetched_user is None:
+            card = await info.context.loaders.users.load(self.user_id)
+            self.prefetched_user = _user_from_card(self, card)
+        return self.prefetched_user
+
+    @strawberry.field
+    async def user(self, info: Info) -> User:
+        return await self._author(info)
+
+    @strawberry.field
+    async def username(self, info: Info) -> str:
+        return (await self._author(info)).username
+
+    @strawberry.field
+    async def avatar_img(self, info: Info) -> Optional[str]:
+        return (await self._author(info)).avatar_img
+
+    @strawberry.field
+    async def reputation_score(self, info: Info) -> Optional[int]:
+        return (await self._author(info)).reputation_score
+
+    @strawberry.field
+    async def interaction_state(self, info: Info) -> CommentInteractionState:
+        if self.prefetched_state is None:
+            state = await info.context.loaders.interaction_states.load(self.comment_id)
+            self.prefetched_state = _to_interaction_state({"interaction_state": state})
+        return self.prefetched_state
+
+    @strawberry.field
+    async def replies(self, info: Info) -> Optional[List['Comment']]:
+        if self.prefetched_replies is not None:
+            return self.prefetched_replies
+        rows = await info.context.loaders.replies.load(self.comment_id)
+        return [_comment_from_row(row) for row in rows] or None
 
 # Input types
 @strawberry.input
@@ -99,8 +134,6 @@ class UpdateCommentInput:
 #
 
 def _to_user(u) -> User:
-    print(f"Converting user to GraphQL type: {u}")
-    print(f"User profile data: {u.profile if hasattr(u, 'profile') else 'No profile'}")
     if not u:
         return User(
             user_id=0,
@@ -125,6 +158,32 @@ def _to_user(u) -> User:
         updated_at=str(u.updated_at) if u.updated_at else None
     )
 
+def _user_from_card(comment: Comment, card: Optional[AuthorCard]) -> User:
+    """Author of a comment, with the same fallbacks as CommentService._build_user_data"""
+    if not card:
+        return User(
+            user_id=comment.user_id,
+            username=f"user_{comment.user_id}",
+            email="",
+            avatar_img=None,
+            reputation_score=None,
+            expertise_area=None,
+            credentials=None,
+            created_at=comment.created_at,
+            updated_at=None
+        )
+    return User(
+        user_id=card.user_id,
+        username=card.username if card.has_profile else f"user_{card.user_id}",
+        email="",
+        avatar_img=card.avatar_img,
+        reputation_score=card.reputation_score,
+        expertise_area=card.expertise_area,
+        credentials=card.credentials,
+        created_at=str(card.created_at) if card.created_at else comment.created_at,
+        updated_at=str(card.updated_at) if card.updated_at else None
+    )
+
 def _to_comment_metrics(m: CommentMetricsModel) -> CommentMetrics:
     if not m:
         return CommentMetrics(
@@ -186,19 +245,41 @@ def _to_comment(cr: Optional[CommentResponse]) -> Optional[Comment]:
         path=cr.path,
         depth=cr.depth,
         root_comment_id=cr.root_comment_id,
-        user=_to_user(cr.user),
-        username=cr.username,
-        avatar_img=cr.avatar_img,
-        reputation_score=cr.reputation_score,
         metrics=_to_comment_metrics(cr.metrics),
-        interaction_state=_to_interaction_state(cr),
         is_edited=cr.is_edited,
         is_deleted=cr.is_deleted,
         created_at=str(cr.created_at),
         updated_at=str(cr.updated_at) if cr.updated_at else None,
         last_activity=str(cr.last_activity),
         active_viewers=cr.active_viewers,
-        replies=nested_replies
+        prefetched_user=_to_user(cr.user),
+        prefetched_state=_to_interaction_state(cr),
+        prefetched_replies=nested_replies
+    )
+
+def _comment_from_row(row: CommentRow) -> Comment:
+    """Comment from a projected row; author, state and replies come from the loaders"""
+    return Comment(
+        comment_id=row.comment_id,
+        content=row.content,
+        user_id=row.user_id,
+        post_id=row.post_id,
+        parent_comment_id=row.parent_comment_id,
+        path=row.path,
+        depth=row.depth,
+        root_comment_id=row.root_comment_id,
+        metrics=CommentMetrics(
+            like_count=row.like_count or 0,
+            dislike_count=row.dislike_count or 0,
+            reply_count=row.reply_count or 0,
+            report_count=row.report_count or 0
+        ),
+        is_edited=row.is_edited,
+        is_deleted=row.is_deleted,
+        created_at=str(row.created_at),
+        updated_at=str(row.updated_at) if row.updated_at else None,
+        last_activity=str(row.last_activity),
+        active_viewers=row.active_viewers
     )
 
 #
@@ -212,25 +293,12 @@ class Query:
     async def comment(self, info: Info, comment_id: int) -> Optional[Comment]:
         """Fetch a single comment by its comment_id."""
         try:
-            db = SessionLocal()
-            # Add debug logging
-            print(f"Processing comment query for ID: {comment_id}")
-            print(f"Auth context: {info.context}")
-
-            user = await get_authenticated_context(info)
-            print(f"Authenticated user: {user.user_id if user else 'None'}")
-
-            comment_service = CommentService(db)
-            cr = await comment_service.get_comment(
-                comment_id=comment_id,
-                user_id=user.user_id if user else None
-            )
-            return _to_comment(cr)
+            await get_authenticated_context(info)  # viewer for interaction_state
+            row = await info.context.loaders.comments.load(comment_id)
+            return _comment_from_row(row) if row else None
         except Exception as e:
-            print(f"Error in comment query: {str(e)}")
+            logger.error("Error in comment query: %s", e)
             raise
-        finally:
-            db.close()
 
     @strawberry.field
     async def comments(
@@ -242,20 +310,18 @@ class Query:
         page_size: int = 20
     ) -> List[Comment]:
         """Fetch a list of comments for a given post or parent comment."""
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)  # This now returns None if not authenticated
-            comment_service = CommentService(db)
-            cr_list = await comment_service.get_comment_thread(
-                post_id=post_id,
-                parent_id=parent_comment_id,
-                page=page,
-                page_size=page_size,
-                user_id=user.user_id if user else None
-            )
-            return [_to_comment(cr) for cr in cr_list if cr is not None]
-        finally:
-            db.close()
+        await get_authenticated_context(info)  # This now returns None if not authenticated
+        loaders = info.context.loaders
+
+        parent = None
+        if parent_comment_id is not None:
+            parent = await loaders.comments.load(parent_comment_id)
+            if not parent:
+                raise Exception("Parent comment not found")
+
+        rows = comment_thread_rows(info.context.db, post_id, parent, (page - 1) * page_size, page_size)
+        loaders.prime_comments(rows)
+        return [_comment_from_row(row) for row in rows]
 
     @strawberry.field
     async def user_comments(
@@ -266,119 +332,84 @@ class Query:
             page_size: int = 20
     ) -> List[Comment]:
         """Fetch a list of comments for a specific user."""
-        db = SessionLocal()
-        try:
-            # Check for authentication
-            authenticated_user = await get_authenticated_context(info)
-
-            # Get user profile to check if the requested user_id matches the authenticated user
-            # or if the authenticated user has proper permissions to see other user's comments
-            comment_service = CommentService(db)
-
-            # Fetch the user's comments
-            comments = await comment_service.get_user_comments(
-                user_id=user_id,
-                page=page,
-                page_size=page_size,
-                viewer_id=authenticated_user.user_id if authenticated_user else None
-            )
+        # Viewer for interaction_state
+        await get_authenticated_context(info)
 
-            # Convert to GraphQL type
-            return [_to_comment(comment) for comment in comments if comment is not None]
-        finally:
-            db.close()
+        rows = user_comment_rows(info.context.db, user_id, (page - 1) * page_size, page_size)
+        info.context.loaders.prime_comments(rows)
+        return [_comment_from_row(row) for row in rows]
 
 
 @strawberry.type
 class Mutation:
     @strawberry.mutation
     async def create_comment(self, info: Info, input: CreateCommentInput) -> Comment:
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)
-            if not user:
-                raise Exception("Authentication required")
-
-            pydantic_data = CommentCreateModel(**vars(input))
-            comment_service = CommentService(db)
-            cr = await comment_service.create_comment(
-                user_id=user.user_id,
-                comment_data=pydantic_data
-            )
-            return _to_comment(cr)
-        finally:
-            db.close()
+        user = await get_authenticated_context(info)
+        if not user:
+            raise Exception("Authentication required")
+
+        pydantic_data = CommentCreateModel(**vars(input))
+        comment_service = CommentService(info.context.db)
+        cr = await comment_service.create_comment(
+            user_id=user.user_id,
+            comment_data=pydantic_data
+        )
+        return _to_comment(cr)
 
     @strawberry.mutation
     async def update_comment(self, info: Info, input: UpdateCommentInput) -> Comment:
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)
-            if not user:
-                raise Exception("Authentication required")
-
-            comment_service = CommentService(db)
-            cr = await comment_service.update_comment(
-                comment_id=input.comment_id,
-                user_id=user.user_id,
-                content=input.content
-            )
-            return _to_comment(cr)
-        finally:
-            db.close()
+        user = await get_authenticated_context(info)
+        if not user:
+            raise Exception("Authentication required")
+
+        comment_service = CommentService(info.context.db)
+        cr = await comment_service.update_comment(
+            comment_id=input.comment_id,
+            user_id=user.user_id,
+            content=input.content
+        )
+        return _to_comment(cr)
 
     @strawberry.mutation
     async def delete_comment(self, info: Info, comment_id: int) -> bool:
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)
-            if not user:
-                raise Exception("Authentication required")
-
-            comment_service = CommentService(db)
-            result = await comment_service.delete_comment(
-                comment_id=comment_id,
-                user_id=user.user_id
-            )
-            return result.get("status") == "success"
-        finally:
-            db.close()
+        user = await get_authenticated_context(info)
+        if not user:
+            raise Exception("Authentication required")
+
+        comment_service = CommentService(info.context.db)
+        result = await comment_service.delete_comment(
+            comment_id=comment_id,
+            user_id=user.user_id
+        )
+        return result.get("status") == "success"
 
     @strawberry.mutation
     async def like_comment(self, info: Info, comment_id: int) -> Comment:
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)
-            if not user:
-                raise Exception("Authentication required")
-
-            comment_service = CommentService(db)
-            cr = await comment_service.handle_interaction(
-                comment_id=comment_id,
-                user_id=user.user_id,
-                interaction_type="like"
-            )
-            return _to_comment(cr)
-        finally:
-            db.close()
+        user = await get_authenticated_context(info)
+        if not user:
+            raise Exception("Authentication required")
+
+        comment_service = CommentService(info.context.db)
+        cr = await comment_service.handle_interaction(
+            comment_id=comment_id,
+            user_id=user.user_id,
+            interaction_type="like"
+        )
+        return _to_comment(cr)
 
     @strawberry.mutation
     async def dislike_comment(self, info: Info, comment_id: int) -> Comment:
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)
-            if not user:
-                raise Exception("Authentication required")
-
-            comment_service = CommentService(db)
-            cr = await comment_service.handle_interaction(
-                comment_id=comment_id,
-                user_id=user.user_id,
-                interaction_type="dislike"
-            )
-            return _to_comment(cr)
-        finally:
-            db.close()
+        user = await get_authenticated_context(info)
+        if not user:
+            raise Exception("Authentication required")
+
+        comment_service = CommentService(info.context.db)
+        cr = await comment_service.handle_interaction(
+            comment_id=comment_id,
+            user_id=user.user_id,
+            interaction_type="dislike"
+        )
+        return _to_comment(cr)
 
     @strawberry.mutation
     async def report_comment(
@@ -387,22 +418,18 @@ class Mutation:
         comment_id: int,
         reason: str
     ) -> Comment:
-        db = SessionLocal()
-        try:
-            user = await get_authenticated_context(info)
-            if not user:
-                raise Exception("Authentication required")
-
-            comment_service = CommentService(db)
-            cr = await comment_service.handle_interaction(
-                comment_id=comment_id,
-                user_id=user.user_id,
-                interaction_type="report",
-                metadata={"reason": reason}
-            )
-            return _to_comment(cr)
-        finally:
-            db.close()
+        user = await get_authenticated_context(info)
+        if not user:
+            raise Exception("Authentication required")
+
+        comment_service = CommentService(info.context.db)
+        cr = await comment_service.handle_interaction(
+            comment_id=comment_id,
+            user_id=user.user_id,
+            interaction_type="report",
+            metadata={"reason": reason}
+        )
+        return _to_comment(cr)
 
 
 @strawberry.type
@@ -410,37 +437,33 @@ class Subscription:
     @strawberry.subscription
     async def comment_added(self, info: Info, post_id: int) -> AsyncGenerator[Comment, None]:
         """Subscribe to new comments on a post"""
-        db = SessionLocal()
         try:
             user = await get_authenticated_context(info)
             if not user:
                 logger.error("Authentication required for subscription")
                 raise Exception("Authentication required for subscription")
 
-            logger.info(f"User {user.user_id} subscribed to comments for post {post_id}")
-            comment_service = CommentService(db)
+            logger.info("User %s subscribed to comments for post %s", user.user_id, post_id)
             async for cr in comment_added_subscription(post_id):
+                # The context lives as long as the connection; start each event fresh
+                info.context.refresh_loaders()
+                comment_service = CommentService(info.context.db)
                 comment = await comment_service.get_comment(cr.comment_id, user.user_id)
-                logger.debug(f"New comment {cr.comment_id} broadcast to user {user.user_id}")
+                logger.debug("New comment %s broadcast to user %s", cr.comment_id, user.user_id)
                 yield _to_comment(comment)
         except Exception as e:
-            logger.error(f"Error in comment subscription: {str(e)}")
+            logger.error("Error in comment subscription: %s", e)
             raise
-        finally:
-            db.close()
 
     @strawberry.subscription
-    async def comment_updated(self, post_id: int) -> AsyncGenerator[Comment, None]:
+    async def comment_updated(self, info: Info, post_id: int) -> AsyncGenerator[Comment, None]:
         """Subscribe to comment updates on a post"""
-        db = SessionLocal()
-        try:
-            comment_service = CommentService(db)
-            async for cr in comment_updated_subscription(post_id):
-                yield _to_comment(
-                    await comment_service.get_comment(cr.comment_id)
-                )
-        finally:
-            db.close()
+        async for cr in comment_updated_subscription(post_id):
+            info.context.refresh_loaders()
+            comment_service = CommentService(info.context.db)
+            yield _to_comment(
+                await comment_service.get_comment(cr.comment_id)
+            )
 
     @strawberry.subscription
     async def comment_deleted(self, post_id: int) -> AsyncGenerator[str, None]:
@@ -451,17 +474,12 @@ class Subscription:
     @strawberry.subscription
     async def comment_activity(self, post_id: int) -> AsyncGenerator[CommentActivity, None]:
         """Subscribe to comment activity updates"""
-        db = SessionLocal()
-        try:
-            comment_service = CommentService(db)
-            async for activity in comment_activity_subscription(post_id):
-                yield CommentActivity(
-                    comment_id=activity["comment_id"],
-                    active_viewers=activity["active_viewers"],
-                    last_activity=activity["last_activity"]
-                )
-        finally:
-            db.close()
+        async for activity in comment_activity_subscription(post_id):
+            yield CommentActivity(
+                comment_id=activity["comment_id"],
+                active_viewers=activity["active_viewers"],
+                last_activity=activity["last_activity"]
+            )
 
 # Create the schema
 schema = strawberry.Schema(
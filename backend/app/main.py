@@ -3,7 +3,6 @@ from contextlib import asynccontextmanager
 
 import strawberry
 from fastapi import FastAPI, WebSocket
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 # Remove the direct import of CORSMiddleware if you aren't using it anymore
 # from fastapi.middleware.cors import CORSMiddleware
@@ -12,95 +11,119 @@ from strawberry.subscriptions import GRAPHQL_WS_PROTOCOL, GRAPHQL_TRANSPORT_WS_P
 
 from app.lib.graphql.context import get_context
 from app.lib.graphql.schema.schema import Query, Mutation, Subscription
-from app.services.post_engagement_service import verify_all_post_counts
-from database.database import database, Base, engine, SessionLocal
-from app.utils.database_utils import (
-    init_categories, init_post_types, init_post_interaction_types, sync_saved_posts, periodic_sync_saved_posts,
-    repair_saved_posts_database
-)
+from sqlalchemy import text
+from database.database import database, engine
+from app.utils.database_utils import periodic_sync_saved_posts
 from app.core.config import settings
 from app.core.cache import init_redis, close_redis
+from app.core.interaction_types import reload_interaction_types, install_reload_signal
+from app.core.catalog import reload_catalog, listen_for_catalog_changes
+from app.services.image_service import shutdown_image_executor
 from app.routes import (
     auth_routes, profile_routes, post_routes,
-    comment_routes, category_routes, post_engagement_routes
+    comment_routes, category_routes, post_engagement_routes,
+    health_routes, admin_routes, media_routes, metrics_routes
 )
 from app.websocket_manager import manager
 from app.middleware.auth_middleware import auth_middleware
-from app.services.post_engagement_service import PostEngagementService
+from app.services.recommendation_service import periodic_build_recommendations
+from app.services.author_cache import get_author_card_cache
 from app.RedisCache import get_cache
 
 # Import your custom cors_middleware setup function
 from app.middleware.cors_middleware import setup_cors_middleware
 
-import logging
+from app.core.logger import get_logger
+from app.core.instrumentation import install_instrumentation, request_metrics_middleware
+from app.core.query_budget import query_budget_middleware
+from app.core.profiling import profiling_middleware
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # Outputs to console
-    ]
-)
+logger = get_logger(__name__)
+
+# Schema creation, seeding and reconciliation run out of process:
+#   python -m app.cli migrate && python -m app.cli seed
+# Startup here only opens connection pools so workers boot in constant time.
 
-logger = logging.getLogger(__name__)
-logging.getLogger('app.applib.graphql').setLevel(logging.DEBUG)
-logging.getLogger('app.auth').setLevel(logging.DEBUG)
 
-Base.metadata.create_all(bind=engine)
+def _warm_db_pool():
+    """Open one pooled connection so the first request doesn't pay for it"""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
 
 
 @asynccontextmanager
 async def lifespan(app_instance: FastAPI):
-    print("Starting up...")
+    logger.info("Starting up...")
+    app_instance.state.ready = False
+    app_instance.state.warmup = {}
+    app_instance.state.background_tasks = []
+
     await database.connect()
+    app_instance.state.warmup["database"] = True
 
     try:
         await init_redis()
+        app_instance.state.warmup["redis"] = True
     except Exception as e:
-        print(f"Redis initialization error: {str(e)}")
+        logger.error("Redis initialization error: %s", e)
+        app_instance.state.warmup["redis"] = False
 
-    db = SessionLocal()
     try:
-        await init_categories()
-        await init_post_types()
-        await init_post_interaction_types(db)
-        #print("Running saved posts database repair...")
-        #await repair_saved_posts_database(db)
-        #print("Saved posts repair complete")
-        await sync_saved_posts(db)
-
-        cache = get_cache()
-        service = PostEngagementService(db, cache)
-
-        # Keep only this call
-        await service.repair_all_post_counts()
-        print("✅ Post counts verified and fixed")
+        await asyncio.to_thread(_warm_db_pool)
+        app_instance.state.warmup["db_pool"] = True
     except Exception as e:
-        print(f"❌ Error during startup: {str(e)}")
-    finally:
-        db.close()
+        logger.error("Error warming database pool: %s", e)
+        app_instance.state.warmup["db_pool"] = False
 
-    # Store the task in app_instance.state
-    app_instance.state = type('AppState', (), {})()
-    app_instance.state.sync_task = asyncio.create_task(periodic_sync_saved_posts())
+    # Hot paths resolve interaction types by id from memory; SIGHUP or
+    # POST /admin/interaction-types/reload refreshes the registry
+    try:
+        await reload_interaction_types()
+        app_instance.state.warmup["interaction_types"] = True
+    except Exception as e:
+        logger.error("Error loading interaction types: %s", e)
+        app_instance.state.warmup["interaction_types"] = False
+    install_reload_signal(asyncio.get_running_loop())
 
-    print("Startup complete")
+    # Categories, subcategories, post types and tags are served from memory;
+    # every worker reloads when a change is published on catalog:invalidate
+    try:
+        await reload_catalog()
+        app_instance.state.warmup["catalog"] = True
+    except Exception as e:
+        logger.error("Error loading catalog: %s", e)
+        app_instance.state.warmup["catalog"] = False
+    app_instance.state.background_tasks.append(asyncio.create_task(listen_for_catalog_changes()))
+    # Profile changes on any worker clear every worker's local author cards
+    app_instance.state.background_tasks.append(
+        asyncio.create_task(get_author_card_cache(get_cache()).listen_for_invalidations())
+    )
+
+    # Periodic jobs normally run in `python -m app.cli worker`
+    if settings.RUN_BACKGROUND_JOBS:
+        app_instance.state.background_tasks += [
+            asyncio.create_task(periodic_sync_saved_posts()),
+            asyncio.create_task(periodic_build_recommendations()),
+        ]
+
+    app_instance.state.ready = True
+    logger.info("Startup complete")
     yield
 
-    # Use app_instance.state to access the task
-    if hasattr(app_instance.state, 'sync_task') and app_instance.state.sync_task:
-        app_instance.state.sync_task.cancel()
+    app_instance.state.ready = False
+    for task in app_instance.state.background_tasks:
+        task.cancel()
         try:
-            await app_instance.state.sync_task
+            await task
         except asyncio.CancelledError:
-            print("Saved posts sync task cancelled")
+            logger.debug("Background task cancelled")
 
+    shutdown_image_executor()
     await database.disconnect()
     await close_redis()
 
 app = FastAPI(lifespan=lifespan)
-app.state = type('AppState', (), {})()
-app.state.sync_task = None
+app.state.ready = False
 
 # Use your custom CORS setup
 #setup_cors_middleware(app)
@@ -115,15 +138,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],  # Be explicit about OPTIONS
     allow_headers=["*"],  # Keep this broad for now for debugging
-    expose_headers=["Content-Type", "Content-Length", "Authorization"],
+    expose_headers=["Content-Type", "Content-Length", "Content-Range", "Accept-Ranges", "Authorization", "ETag", "Last-Modified", "Cache-Control"],
     max_age=3600
 )
 app.middleware("http")(auth_middleware)
+if settings.PROFILING_ENABLED:
+    app.middleware("http")(profiling_middleware)
+if settings.QUERY_BUDGET_ENABLED:
+    app.middleware("http")(query_budget_middleware)
+if settings.REQUEST_METRICS_ENABLED:
+    # Added last so it is outermost and also times the other middleware
+    install_instrumentation()
+    app.middleware("http")(request_metrics_middleware)
 
 settings.create_media_directories()
 
-app.mount("/media", StaticFiles(directory=settings.MEDIA_ROOT), name="media")
-
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
@@ -148,6 +177,11 @@ app.include_router(post_routes.router)
 app.include_router(comment_routes.router)
 app.include_router(category_routes.router)
 app.include_router(post_engagement_routes.router)
+app.include_router(health_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(media_routes.router)
+if settings.REQUEST_METRICS_ENABLED:
+    app.include_router(metrics_routes.router)
 
 @app.websocket("/ws/post/{post_id}")
 async def websocket_endpoint(websocket: WebSocket, post_id: int):
@@ -157,7 +191,7 @@ async def websocket_endpoint(websocket: WebSocket, post_id: int):
             data = await websocket.receive_json()
             await manager.broadcast_to_post(post_id, data)
     except Exception as e:
-        print(f"WebSocket error: {str(e)}")
+        logger.error("WebSocket error: %s", e)
     finally:
         await manager.disconnect(websocket, post_id)
 
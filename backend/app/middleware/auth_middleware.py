@@ -7,13 +7,13 @@ from app.core.config import settings
 from app.auth.utils import get_current_user
 from app.datamodels.user_datamodels import User, Session as UserSession
 from database.database import SessionLocal
-import logging
 import json
 import asyncio
 from datetime import datetime
 from sqlalchemy import func
+from app.core.logger import get_logger, log_sampled
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 class AuthMiddleware:
     def __init__(self):
@@ -37,7 +37,6 @@ class AuthMiddleware:
                 body = await request.body()
                 if body:
                     data = json.loads(body)
-                    print("GraphQL request body:", data)
 
                     # Check extensions first (used by Apollo Client)
                     if 'extensions' in data and 'authorization' in data['extensions']:
@@ -47,10 +46,9 @@ class AuthMiddleware:
                     # Then check payload (used by subscriptions)
                     if 'payload' in data and 'Authorization' in data['payload']:
                         auth = data['payload']['Authorization']
-                        print("Found auth in payload:", auth)
                         return auth.replace('Bearer ', '')
             except Exception as e:
-                print("Error parsing GraphQL request:", str(e))
+                logger.debug("Error parsing GraphQL request: %s", e)
 
         # Standard header check
         auth_header = request.headers.get("Authorization", "")
@@ -123,7 +121,7 @@ class AuthMiddleware:
             )
 
         request.state.user = user
-        logger.info(f"Authenticated user {user.user_id} for {request.url.path}")
+        log_sampled(logger, "Authenticated user %s for %s", user.user_id, request.url.path)
 
         return await call_next(request)
 
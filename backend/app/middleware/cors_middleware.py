@@ -2,6 +2,9 @@
 
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.websockets import WebSocketDisconnect
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 def setup_cors_middleware(app):
     app.add_middleware(
@@ -31,5 +34,5 @@ def setup_cors_middleware(app):
 
     @app.exception_handler(WebSocketDisconnect)
     async def websocket_disconnect(request, exc):
-        print(f"WebSocket disconnected: {exc.code}")
+        logger.debug("WebSocket disconnected: %s", exc.code)
         return None
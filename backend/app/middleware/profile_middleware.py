@@ -2,6 +2,9 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session, joinedload
 from app.datamodels.user_datamodels import User, UserProfile
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 async def validate_user_profile(user_id: int, db: Session) -> UserProfile:
     """Validate that a user has a complete profile before allowing certain operations"""
@@ -10,11 +13,11 @@ async def validate_user_profile(user_id: int, db: Session) -> UserProfile:
     ).filter(User.user_id == user_id).first()
 
     if not user:
-        print(f"❌ User {user_id} not found")
+        logger.info("User %s not found", user_id)
         raise HTTPException(status_code=404, detail="User not found")
 
     if not user.profile:
-        print(f"❌ User {user_id} has no profile")
+        logger.info("User %s has no profile", user_id)
         raise HTTPException(
             status_code=400,
             detail="Profile required. Please complete your profile before performing this action."
@@ -0,0 +1,75 @@
+# routes/admin_routes.py
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.auth.utils import get_current_user
+from app.core.config import settings
+from app.core.interaction_types import get_interaction_types, reload_interaction_types
+from app.core.profiling import find_profile, list_profiles, sign_profile_token
+from app.datamodels.user_datamodels import User
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Allow only users whose profile is flagged as admin"""
+    profile = getattr(current_user, "profile", None)
+    if not profile or not (profile.is_admin or profile.role == "admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
+@router.get("/interaction-types")
+async def list_interaction_types(_: User = Depends(require_admin)):
+    registry = get_interaction_types()
+    return {
+        "status": "success",
+        "data": {"interaction_types": registry.to_dict(), "loaded_at": registry.loaded_at}
+    }
+
+
+@router.post("/interaction-types/reload")
+async def reload_interaction_type_registry(_: User = Depends(require_admin)):
+    """Re-read interaction_types into this worker's registry"""
+    registry = await reload_interaction_types()
+    return {
+        "status": "success",
+        "data": {"interaction_types": registry.to_dict(), "loaded_at": registry.loaded_at}
+    }
+
+
+def _public_profile(meta: dict) -> dict:
+    return {key: value for key, value in meta.items() if key not in ("path", "meta_path")}
+
+
+@router.get("/profiles")
+async def list_request_profiles(_: User = Depends(require_admin)):
+    """Stored request profiles, newest first"""
+    return {
+        "status": "success",
+        "data": {"profiles": [_public_profile(meta) for meta in list_profiles()]}
+    }
+
+
+@router.get("/profiles/{profile_id}")
+async def download_request_profile(profile_id: str, _: User = Depends(require_admin)):
+    meta = find_profile(profile_id)
+    if not meta:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(meta["path"], filename=os.path.basename(meta["path"]))
+
+
+@router.post("/profiles/token")
+async def create_profile_token(
+    ttl_seconds: int = Query(300, ge=1, le=3600),
+    _: User = Depends(require_admin)
+):
+    """Signed value for the X-Profile request header"""
+    if not settings.PROFILING_ENABLED or not settings.PROFILING_SECRET:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profiling is not enabled")
+    return {
+        "status": "success",
+        "data": {"header": "X-Profile", "value": sign_profile_token(ttl_seconds), "expires_in": ttl_seconds}
+    }
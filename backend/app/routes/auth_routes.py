@@ -31,7 +31,7 @@ async def auth_login_options():
 @router.post("/login")
 async def login(request: Request, user: UserLogin):
     try:
-        print("Login attempt for email:", user.email)
+        logger.debug("Login attempt for %s", user.email)
         response = await login_user(user)
 
         # Ensure response has correct structure
@@ -45,7 +45,7 @@ async def login(request: Request, user: UserLogin):
             }
         }
     except Exception as e:
-        print("Login failed:", str(e))
+        logger.info("Login failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 # Add OPTIONS handler for /register
@@ -69,14 +69,9 @@ async def get_user(request: Request, current_user: UserResponse = Depends(get_cu
     """
     Retrieve the current user's details.
     """
-    auth_header = request.headers.get('Authorization')
-    print("Auth header received:", auth_header)
-
     if not current_user:
-        print("No current user found")
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    print("User details retrieved for ID:", current_user.user_id)
     return current_user
 
 @router.get("/validate")
@@ -1,28 +1,43 @@
 # routes/category_routes.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.utils.database_utils import get_db
-from app.datamodels.post_datamodels import Category, Subcategory
+from fastapi import APIRouter, Request, Response
+from app.core.catalog import get_catalog
+from app.utils.http_cache import make_etag, not_modified_response, set_validators, PUBLIC_SHORT
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
+# Served from the in-process catalog; it is reloaded when init_categories
+# publishes a change, so neither route touches Postgres.
+
 @router.get("/")
-async def get_categories(db: Session = Depends(get_db)):
-    categories = db.query(Category).all()
+async def get_categories(request: Request, response: Response):
+    catalog = get_catalog()
+    etag = make_etag("categories", catalog.digest)
+    not_modified = not_modified_response(request, etag, cache_control=PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
     serialized_categories = [{
         "category_id": c.category_id,
         "cat_name": c.cat_name
-    } for c in categories]
+    } for c in catalog.categories]
+    set_validators(response, etag, cache_control=PUBLIC_SHORT)
     return {
         "status": "success",
         "data": {"categories": serialized_categories}
     }
 @router.get("/{category_id}/subcategories")
-async def get_subcategories(category_id: int, db: Session = Depends(get_db)):
-    subcategories = db.query(Subcategory).filter(Subcategory.category_id == category_id).all()
+async def get_subcategories(category_id: int, request: Request, response: Response):
+    catalog = get_catalog()
+    etag = make_etag("categories", catalog.digest, category_id)
+    not_modified = not_modified_response(request, etag, cache_control=PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
+    subcategories = catalog.subcategories_for(category_id)
+    set_validators(response, etag, cache_control=PUBLIC_SHORT)
     return {
         "status": "success",
         "data": {
             "subcategories": [{"id": s.subcategory_id, "name": s.name} for s in subcategories]
         }
-    }
\ No newline at end of file
+    }
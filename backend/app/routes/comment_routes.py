@@ -5,8 +5,10 @@ from app.utils.database_utils import get_db
 from app.schemas.comment_schemas import CommentCreate, CommentInteractionCreate, CommentResponse
 from app.services.comment_service import CommentService
 from app.auth.utils import get_current_user
+from app.core.logger import get_logger
 
 router = APIRouter(prefix="/posts", tags=["comments"])
+logger = get_logger(__name__)
 
 
 @router.post("/{post_id}/comments", response_model=CommentResponse)
@@ -17,10 +19,6 @@ async def create_comment(
         db: Session = Depends(get_db)
 ):
     try:
-        print(f"Received comment data: {comment_data}")  # Debug line
-        print(f"Post ID: {post_id}")  # Debug line
-        print(f"Parent comment ID: {comment_data.parent_comment_id}")  # Debug line
-
         comment_service = CommentService(db)
         comment_data.post_id = post_id
         comment = await comment_service.create_comment(
@@ -29,7 +27,7 @@ async def create_comment(
         )
         return comment
     except Exception as e:
-        print(f"Error creating comment: {str(e)}")  # Debug line
+        logger.error("Error creating comment on post %s: %s", post_id, e)
         raise HTTPException(
             status_code=500,
             detail=str(e)
@@ -0,0 +1,51 @@
+# routes/health_routes.py
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.core.cache import get_redis
+from database.database import engine
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+def _ping_db():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@router.get("/live")
+async def liveness():
+    """Process is up and the event loop is responsive"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """Warmup has finished and the database/Redis answer a ping"""
+    state = request.app.state
+    checks = {"warmup": bool(getattr(state, "ready", False))}
+
+    try:
+        await asyncio.wait_for(asyncio.to_thread(_ping_db), timeout=2.0)
+        checks["database"] = True
+    except Exception:
+        checks["database"] = False
+
+    try:
+        redis = await get_redis()
+        checks["redis"] = bool(redis) and bool(await asyncio.wait_for(redis.ping(), timeout=1.0))
+    except Exception:
+        checks["redis"] = False
+
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "starting",
+            "checks": checks,
+            "warmup": getattr(state, "warmup", {})
+        }
+    )
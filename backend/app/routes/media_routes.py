@@ -0,0 +1,15 @@
+# routes/media_routes.py
+from fastapi import APIRouter, HTTPException, Request
+
+from app.utils.media_files import lookup_media, media_response
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_media(file_path: str, request: Request):
+    """Uploaded files under MEDIA_ROOT, with Range and conditional GET"""
+    media = lookup_media(file_path)
+    if media is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return await media_response(request, media)
@@ -1,21 +1,25 @@
 # routes/post_routes.py
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request, Query, status
+from fastapi.responses import FileResponse, Response
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.utils.database_utils import get_db
 from app.schemas.post_schemas import PostCreate, PostResponse, PostInteractionCreate, PostMetricsUpdate, PostEngagementUpdate
 from app.services import post_service
-from app.auth.utils import get_current_user
+from app.auth.utils import get_current_user, get_current_user_or_none
 from app.services.post_service import upload_post_image, create_post, get_post
-from app.datamodels.post_datamodels import Post
+from app.services.listing_queries import user_post_rows
+from app.services.export_service import user_posts_json_response
 from app.datamodels.interaction_datamodels import PostInteraction
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from app.datamodels.user_datamodels import User
 from pydantic import BaseModel, ValidationError
 from app.middleware.profile_middleware import validate_user_profile
+from app.utils.http_cache import not_modified_response, set_validators
+from app.utils.media_files import lookup_media, media_response
+from app.core.query_budget import declare_query_budget
 from datetime import datetime
 
 
@@ -99,9 +103,6 @@ async def create_post(
     if not current_user or not current_user.user_id:
         raise HTTPException(status_code=401, detail="User authentication required")
 
-    print(f"✅ Creating post for user: {current_user.user_id}")
-    print(f"Received tags: {tags}")  # Debug print
-
     try:
         await validate_user_profile(current_user.user_id, db)
 
@@ -130,8 +131,6 @@ async def create_post(
 
         # Create post schema object
         post_create = PostCreate(**post_data)
-        print(f"Created PostCreate object: {post_create}")  # Debug print
-
         # Create post and get response
         post_data = await post_service.create_post(db, current_user.user_id, post_create, files)
 
@@ -141,25 +140,33 @@ async def create_post(
         return post_data
 
     except ValidationError as e:
-        print(f"❌ Validation error: {str(e)}")
+        logger.info("Post validation error: %s", e)
         raise HTTPException(status_code=422, detail=str(e))
     except HTTPException as e:
-        print(f"❌ HTTP error: {str(e)}")
         raise e
     except Exception as e:
-        print(f"❌ Unexpected error: {str(e)}")
+        logger.error("Unexpected error creating post: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{post_id}", response_model=Dict)  # Change to Dict to allow flexible structure
+@declare_query_budget(10)
 async def get_post(
     post_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Get a single post with engagement data"""
     try:
         user_id = current_user.user_id if current_user else None
-        return await post_service.get_post(db, post_id, user_id=user_id)
+        content, etag = await post_service.get_post_json(db, post_id, user_id=user_id)
+        not_modified = not_modified_response(request, etag)
+        if not_modified:
+            return not_modified
+        # Body is pre-serialized; skip FastAPI's re-encoding
+        return set_validators(Response(content=content, media_type="application/json"), etag)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_post route: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -194,9 +201,17 @@ async def get_post(
 @router.get("/trending/{timeframe}", response_model=dict)
 async def get_trending_posts(
     timeframe: str,
+    limit: int = 20,
+    category_id: Optional[int] = None,
+    current_user=Depends(get_current_user_or_none),
     db: Session = Depends(get_db)
 ):
-    return {"posts": await post_service.get_trending_posts(timeframe, db)}
+    return {"posts": await post_service.get_trending_posts(
+        timeframe, db,
+        limit=min(max(limit, 1), 100),
+        category_id=category_id,
+        user_id=current_user.user_id if current_user else None
+    )}
 
 @router.get("/recommended", response_model=dict)
 async def get_recommended_posts(
@@ -235,75 +250,27 @@ async def mark_as_read(
 
 @router.get("/me/debug")  # No response_model
 async def get_my_posts_debug(
-        current_user=Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user=Depends(get_current_user)
 ):
-    """Get posts for the currently logged-in user without response validation"""
-    try:
-        # Query for posts
-        posts = db.query(Post) \
-            .filter(Post.user_id == current_user.user_id) \
-            .filter(Post.status == 'active') \
-            .order_by(Post.created_at.desc()) \
-            .all()
-
-        # Manually construct the response without relying on Pydantic models
-        serialized_posts = []
-        for post in posts:
-            # Build a dictionary with only the fields we need
-            post_dict = {
-                "post_id": post.post_id,
-                "title": post.title,
-                "content": post.content,
-                "created_at": post.created_at.isoformat() if post.created_at else None,
-                "updated_at": post.updated_at.isoformat() if post.updated_at else None,
-                "status": post.status or "active",  # Ensure status is included
-                "likes": post.like_count or 0,
-                "comments": post.comment_count or 0,
-                "shares": post.share_count or 0,
-                "views": 0
-            }
-
-            # Optionally add image_url if it exists
-            if hasattr(post, 'image_url') and post.image_url:
-                post_dict["image_url"] = post.image_url
-
-            serialized_posts.append(post_dict)
-
-        # Return a simple dictionary that will be automatically converted to JSON
-        return {
-            "success": True,
-            "count": len(serialized_posts),
-            "posts": serialized_posts
-        }
-
-    except Exception as e:
-        # Log detailed error
-        print(f"Error in get_my_posts_debug: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    """
+    Stream the current user's active posts as {"posts": [...], "count", "success"}.
 
-        # Return error response
-        return {
-            "success": False,
-            "error": str(e),
-            "posts": []
-        }
+    Same server-side cursor as GET /profiles/me/export, so memory stays flat
+    however many posts the account has.
+    """
+    return user_posts_json_response(current_user.user_id)
 
 # Also temporarily modify the original endpoint to return a minimal response
 @router.get("/me")
+@declare_query_budget(10)
 async def get_my_posts(
         current_user=Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Get posts for the currently logged-in user"""
     try:
-        # Query for posts
-        posts = db.query(Post) \
-            .filter(Post.user_id == current_user.user_id) \
-            .filter(Post.status == 'active') \
-            .order_by(Post.created_at.desc()) \
-            .all()
+        # Only the columns rendered below
+        posts = user_post_rows(db, current_user.user_id)
 
         # Manually construct the response without relying on Pydantic models
         serialized_posts = []
@@ -323,7 +290,7 @@ async def get_my_posts(
             }
 
             # Optionally add image_url if it exists
-            if hasattr(post, 'image_url') and post.image_url:
+            if post.image_url:
                 post_dict["image_url"] = post.image_url
 
             serialized_posts.append(post_dict)
@@ -336,10 +303,7 @@ async def get_my_posts(
         }
 
     except Exception as e:
-        # Log detailed error
-        print(f"Error in get_my_posts: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_my_posts: %s", e)
 
         # Return error response
         return {
@@ -351,18 +315,40 @@ async def get_my_posts(
 # List all posts
 # Public routes (no auth required)
 @router.get("/", response_model=dict)
+@declare_query_budget(12)
 async def list_posts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     category_id: Optional[int] = None,
     tab: Optional[str] = None,
+    content_length: Optional[int] = Query(None, ge=1, le=10000),
+    summary: bool = False,
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Get all posts with optional filtering and user interaction state"""
+    """
+    Get all posts with optional filtering and user interaction state.
+
+    content_length truncates each card's content to that many characters;
+    summary=true shows the post summary instead of its content where set.
+    """
     # Pass user_id if authenticated
     user_id = current_user.user_id if current_user else None
-    return await post_service.get_all_posts(db, skip, limit, category_id, tab, user_id)
+
+    # Cheap projection of the page decides whether the client's copy is current
+    etag = await post_service.get_feed_etag(
+        db, skip, limit, category_id, tab, user_id, content_length, summary
+    )
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+
+    set_validators(response, etag)
+    return await post_service.get_all_posts(
+        db, skip, limit, category_id, tab, user_id, content_length, summary
+    )
 
 # Delete a post
 @router.delete("/{post_id}", response_model=dict)
@@ -392,18 +378,20 @@ async def upload_image(
 ):
     return await upload_post_image(file, post_id, db)
 
-from fastapi.responses import FileResponse
-
-
-@router.get("/{post_id}/image")
-async def fetch_image(post_id: int, db: Session = Depends(get_db)):
-    post = await post_service.get_post(db, post_id)
-    if not post["data"]["post"]["image_url"]:
+@router.api_route("/{post_id}/image", methods=["GET", "HEAD"])
+async def fetch_image(post_id: int, request: Request, db: Session = Depends(get_db)):
+    image_url = await post_service.get_post_image_url(db, post_id)
+    if not image_url:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    image_path = post["data"]["post"]["image_url"].lstrip('/')
-    full_path = Path(image_path)
+    # /media/... URLs live under MEDIA_ROOT; older rows hold cwd-relative paths
+    if image_url.startswith("/media/"):
+        media = lookup_media(image_url[len("/media/"):])
+        if media is None:
+            raise HTTPException(status_code=404, detail="Image file not found")
+        return await media_response(request, media)
 
+    full_path = Path(image_url.lstrip('/'))
     if not full_path.exists():
         raise HTTPException(status_code=404, detail="Image file not found")
 
@@ -1,8 +1,9 @@
 # app/routes/profile_routes.py
 # should probably update to get user posts, delete posts, and edit posts. Add drafts?
+import asyncio
 import os
 from app.core.config import settings
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, UploadFile, File, Query
 from fastapi.responses import FileResponse
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm.session import Session
@@ -12,13 +13,20 @@ from app.datamodels.user_datamodels import UserProfile, User
 from app.schemas.user_schemas import ProfileCreate, ProfileUpdate, ProfileResponse
 from app.services.post_service import save_post, get_post, get_saved_posts
 from app.services.profile_service import update_avatar, update_profile
+from app.services.export_service import EXPORT_SECTIONS, export_response
+from app.services.media_store import path_for_url
 from typing import List
 from app.schemas.user_schemas import ProfileResponse
 from app.services.profile_service import (
     get_profile_from_cache, set_profile_to_cache,
-    get_or_create_profile, create_default_profile, profile_to_dict
+    get_or_create_profile, create_default_profile, profile_to_dict,
+    invalidate_profile_cache
 )
 from datetime import datetime, timedelta
+from app.utils.http_cache import bump_version, get_version, make_etag, not_modified_response, set_validators
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 router = APIRouter(
     prefix="/profiles",
     tags=["profiles"]
@@ -42,11 +50,19 @@ async def options_profile_me():
 @router.get("/me")
 async def get_my_profile(
         request: Request,
+        response: Response,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Get the profile of the currently logged-in user."""
     try:
+        version = await get_version(f"profile:{current_user.user_id}")
+        etag = make_etag("profile", current_user.user_id, version) if version is not None else None
+        not_modified = not_modified_response(request, etag)
+        if not_modified:
+            return not_modified
+        set_validators(response, etag)
+
         # Try to get from cache first
         cached_data = await get_profile_from_cache(current_user.user_id)
         if cached_data:
@@ -65,24 +81,34 @@ async def get_my_profile(
         try:
             await set_profile_to_cache(current_user.user_id, response_data)
         except Exception as cache_error:
-            print(f"Cache error: {str(cache_error)}")
+            logger.error("Cache error: %s", cache_error)
 
         return response_data
 
     except Exception as e:
-        print(f"Error in get_my_profile: {str(e)}")
+        logger.error("Error in get_my_profile: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 @router.get("/{user_id}", response_model=ProfileResponse)
-def get_profile(user_id: int, db: Session = Depends(get_db)):
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+async def get_profile(user_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    version = await get_version(f"profile:{user_id}")
+    etag = make_etag("profile", user_id, version) if version is not None else None
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+
+    # The ETag lookup needs Redis, so this stays async; keep the query off the event loop
+    profile = await asyncio.to_thread(
+        lambda: db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    )
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
+    set_validators(response, etag, last_modified=profile.last_active)
     return profile
 
 
@@ -112,6 +138,7 @@ async def create_profile(
     db.add(db_profile)
     db.commit()
     db.refresh(db_profile)
+    await bump_version(f"profile:{current_user.user_id}")
     return db_profile
 
 
@@ -139,7 +166,7 @@ async def update_my_profile(
             detail=str(ve)
         )
     except Exception as e:
-        print(f"Error updating profile: {str(e)}")
+        logger.error("Error updating profile: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -164,6 +191,7 @@ async def delete_my_profile(
 
     db.delete(db_profile)
     db.commit()
+    await invalidate_profile_cache(current_user.user_id)
     return {"message": "Profile deleted successfully"}
 
 @router.post("/me/save-post/{post_id}")
@@ -194,49 +222,53 @@ async def get_saved_posts_endpoint(
     # Default empty list if no data found
     return []
 
+@router.get("/me/export")
+async def export_my_data(
+        sections: List[str] = Query(list(EXPORT_SECTIONS)),
+        current_user: User = Depends(get_current_user),
+):
+    """Download the user's posts, comments and saved posts as NDJSON"""
+    return export_response(
+        current_user.user_id,
+        sections,
+        filename=f"pragora-export-{current_user.user_id}.ndjson"
+    )
+
 @router.get("/avatar/{user_id}")
 def get_user_avatar(user_id: int, db: Session = Depends(get_db)):
     """Get a user's avatar by user ID"""
     try:
         # Find the user profile
         user_profile = db.query(UserProfile).filter_by(user_id=user_id).first()
-        print(f"Avatar request for user_id: {user_id}, found profile: {user_profile is not None}")
 
         if not user_profile:
-            print(f"No profile found for user {user_id}, returning default")
             return FileResponse(os.path.join(settings.STATIC_ROOT, "default_avatar.png"),
                                 media_type="image/png")
 
         # Check if user has an avatar set
-        print(f"User {user_id} avatar_img: {user_profile.avatar_img}")
         if not user_profile.avatar_img or user_profile.avatar_img == 'default_url':
-            print(f"No avatar set for user {user_id}, returning default")
             return FileResponse(os.path.join(settings.STATIC_ROOT, "default_avatar.png"),
                                 media_type="image/png")
 
-        # Extract filename
-        if user_profile.avatar_img.startswith('/avatars/'):
-            filename = user_profile.avatar_img.split('/')[-1]
-        else:
-            filename = user_profile.avatar_img
-        print(f"Extracted filename: {filename}")
-
-        # Build path and check existence
-        file_path = os.path.join(settings.AVATAR_DIR, filename)
-        print(f"Looking for avatar at: {file_path}")
-        print(f"File exists: {os.path.isfile(file_path)}")
+        # Blob store URLs map straight to a path; legacy avatars live in AVATAR_DIR
+        file_path = path_for_url(user_profile.avatar_img)
+        if not file_path:
+            if user_profile.avatar_img.startswith('/avatars/'):
+                filename = user_profile.avatar_img.split('/')[-1]
+            else:
+                filename = user_profile.avatar_img
+            file_path = os.path.join(settings.AVATAR_DIR, filename)
 
         if not os.path.isfile(file_path):
-            print(f"Avatar file not found at {file_path}, returning default")
+            logger.warning("Avatar file not found at %s, returning default", file_path)
             return FileResponse(os.path.join(settings.STATIC_ROOT, "default_avatar.png"),
                                 media_type="image/png")
 
         # Return the avatar file
-        print(f"Serving avatar from {file_path}")
-        return FileResponse(file_path, media_type="image/png")
+        return FileResponse(file_path)
 
     except Exception as e:
-        print(f"Error retrieving avatar: {str(e)}")
+        logger.error("Error retrieving avatar: %s", e)
         return FileResponse(os.path.join(settings.STATIC_ROOT, "default_avatar.png"),
                             media_type="image/png")
 
@@ -256,10 +288,12 @@ async def update_profile_avatar(
                 "avatar_img": avatar_img
             }
         }
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Error updating avatar: {str(e)}")
+        logger.error("Error updating avatar: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update avatar")
 
 
@@ -267,6 +301,10 @@ async def update_profile_avatar(
 def get_avatar_by_path(full_path: str):
     """Get avatar by its path"""
     try:
+        blob_path = path_for_url(full_path)
+        if blob_path and os.path.isfile(blob_path):
+            return FileResponse(blob_path)
+
         if full_path.startswith('/avatars/'):
             filename = full_path.split('/')[-1]
             file_path = os.path.join(settings.AVATAR_DIR, filename)
@@ -278,6 +316,6 @@ def get_avatar_by_path(full_path: str):
         return FileResponse(os.path.join(settings.STATIC_ROOT, "default_avatar.png"),
                             media_type="image/png")
     except Exception as e:
-        print(f"Error retrieving avatar by path: {str(e)}")
+        logger.error("Error retrieving avatar by path: %s", e)
         return FileResponse(os.path.join(settings.STATIC_ROOT, "default_avatar.png"),
                             media_type="image/png")
\ No newline at end of file
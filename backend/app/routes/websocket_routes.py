@@ -31,9 +31,9 @@ async def websocket_endpoint(
             try:
                 user = await get_current_user(None, token, db)
                 user_id = user.user_id
-                logger.info(f"Authenticated user {user_id} connected to post {post_id}")
+                logger.debug("Authenticated user %s connected to post %s", user_id, post_id)
             except HTTPException as e:
-                logger.warning(f"Invalid token provided: {str(e)}")
+                logger.warning("Invalid token provided: %s", e)
                 await websocket.close(code=1008, reason="Invalid authentication")
                 return
 
@@ -97,7 +97,7 @@ async def websocket_endpoint(
                     })
 
         except WebSocketDisconnect:
-            logger.info(f"WebSocket disconnected for post {post_id}")
+            logger.debug("WebSocket disconnected for post %s", post_id)
             await manager.disconnect(websocket, post_id, user_id)
 
         except Exception as e:
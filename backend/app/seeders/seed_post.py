@@ -1,5 +1,15 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from app.datamodels.post_datamodels import Post
+from app.auth.auth import hash_password
+from app.datamodels.comment_datamodels import Comment
+from app.datamodels.interaction_datamodels import InteractionTargetType, InteractionType, PostInteraction
+from app.datamodels.post_datamodels import Category, Post, PostType, Tag, post_tags, saved_posts_table
+from app.datamodels.user_datamodels import User, UserProfile
 
 def seed_posts(session: Session):
     example_posts = [
@@ -32,3 +42,258 @@ def seed_posts(session: Session):
         session.add(post)
 
     session.commit()
+
+
+# Synthetic dataset for benchmarks (python -m app.cli seed-synthetic)
+
+SYNTHETIC_PASSWORD = "bench-password"
+SYNTHETIC_EMAIL = "bench_user_{}@example.test"
+INSERT_BATCH_SIZE = 1000
+
+_WORDS = (
+    "argument evidence policy science debate community energy climate health economy "
+    "education history reason model data study claim source review analysis practice "
+    "design market city housing transit water food garden culture ethics language art "
+    "network research theory result method question answer proposal trade-off impact"
+).split()
+
+# interaction type name -> share of generated interactions
+INTERACTION_MIX = {"like": 0.6, "dislike": 0.12, "save": 0.18, "share": 0.1}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+
+def _paragraphs(rng: random.Random, min_chars: int, max_chars: int) -> str:
+    target = rng.randint(min_chars, max_chars)
+    parts = []
+    while sum(len(part) for part in parts) < target:
+        parts.append(_sentence(rng, rng.randint(8, 20)) + ".")
+    return " ".join(parts)
+
+
+def _skewed_index(rng: random.Random, size: int, skew: float = 3.0) -> int:
+    """Index in [0, size) favouring low indexes (skew 3: the first 10% get ~46% of picks)"""
+    return min(int(size * rng.random() ** skew), size - 1)
+
+
+def _insert_returning(session: Session, table, rows: List[dict], column) -> List[int]:
+    ids: List[int] = []
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        ids.extend(session.execute(insert(table).values(batch).returning(column)).scalars().all())
+    return ids
+
+
+def _insert_ignore(session: Session, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        session.execute(insert(table).values(batch).on_conflict_do_nothing())
+
+
+def _seed_users(session: Session, rng: random.Random, count: int) -> List[int]:
+    # One bcrypt hash shared by every synthetic user
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+    emails = [SYNTHETIC_EMAIL.format(i) for i in range(count)]
+    _insert_ignore(session, User.__table__, [
+        {"email": email, "password_hash": password_hash} for email in emails
+    ])
+    user_ids = dict(session.query(User.email, User.user_id).filter(User.email.in_(emails)).all())
+    _insert_ignore(session, UserProfile.__table__, [
+        {
+            "user_id": user_ids[email],
+            "username": f"bench_user_{i}",
+            "reputation_score": rng.randint(0, 100),
+            "expertise_area": rng.choice(_WORDS),
+        }
+        for i, email in enumerate(emails)
+    ])
+    return [user_ids[email] for email in emails]
+
+
+def _seed_comments(
+        session: Session,
+        rng: random.Random,
+        count: int,
+        post_ids: List[int],
+        user_ids: List[int]
+) -> int:
+    """Three levels of comments: 60% top-level, 30% replies, 10% replies to replies"""
+    created = 0
+    parents: List[tuple] = []  # (comment_id, post_id, path) of the previous level
+    for level, share in enumerate((0.6, 0.3, 0.1)):
+        rows, row_parents = [], []
+        for _ in range(int(count * share)):
+            author = user_ids[_skewed_index(rng, len(user_ids))]
+            if level == 0:
+                post_id = post_ids[_skewed_index(rng, len(post_ids))]
+                path, parent_id, root_id = "0", None, None
+            else:
+                parent_id, post_id, parent_path = rng.choice(parents)
+                path = f"{parent_path}.{parent_id}"
+                root_id = int(path.split(".")[1])
+            rows.append({
+                "content": _paragraphs(rng, 40, 600),
+                "user_id": author,
+                "post_id": post_id,
+                "parent_comment_id": parent_id,
+                "root_comment_id": root_id,
+                "path": path,
+                "depth": level,
+            })
+            row_parents.append((post_id, path))
+        if not rows:
+            break
+        ids = _insert_returning(session, Comment.__table__, rows, Comment.comment_id)
+        parents = [(comment_id, post_id, path) for comment_id, (post_id, path) in zip(ids, row_parents)]
+        created += len(ids)
+    return created
+
+
+def _seed_interactions(
+        session: Session,
+        rng: random.Random,
+        count: int,
+        post_ids: List[int],
+        user_ids: List[int]
+) -> int:
+    type_ids = dict(
+        session.query(InteractionType.interaction_type_name, InteractionType.interaction_type_id)
+        .filter(InteractionType.interaction_type_name.in_(INTERACTION_MIX))
+        .all()
+    )
+    names = [name for name in INTERACTION_MIX if name in type_ids]
+    weights = [INTERACTION_MIX[name] for name in names]
+    if not names:
+        raise RuntimeError("Interaction types missing; run `python -m app.cli seed` first")
+
+    # (post_id, user_id, type) is unique; like and dislike exclude each other.
+    # A dict rather than a set keeps insertion order independent of hash seeds
+    seen: Dict[tuple, None] = {}
+    attempts = 0
+    while len(seen) < count and attempts < count * 5:
+        attempts += 1
+        post_id = post_ids[_skewed_index(rng, len(post_ids))]
+        user_id = rng.choice(user_ids)
+        name = rng.choices(names, weights)[0]
+        opposite = {"like": "dislike", "dislike": "like"}.get(name)
+        if opposite and (post_id, user_id, opposite) in seen:
+            continue
+        seen[(post_id, user_id, name)] = None
+
+    _insert_ignore(session, PostInteraction.__table__, [
+        {
+            "post_id": post_id,
+            "user_id": user_id,
+            "interaction_type_id": type_ids[name],
+            "target_type": InteractionTargetType.POST,
+        }
+        for post_id, user_id, name in seen
+    ])
+    _insert_ignore(session, saved_posts_table, [
+        {"post_id": post_id, "user_id": user_id}
+        for post_id, user_id, name in seen if name == "save"
+    ])
+    return len(seen)
+
+
+def _refresh_counts(session: Session) -> None:
+    """Recompute denormalized post/comment counters in three set-based updates"""
+    session.execute(text("""
+        UPDATE posts p SET
+            like_count = COALESCE(c.likes, 0),
+            dislike_count = COALESCE(c.dislikes, 0),
+            save_count = COALESCE(c.saves, 0),
+            share_count = COALESCE(c.shares, 0),
+            report_count = COALESCE(c.reports, 0)
+        FROM posts p2
+        LEFT JOIN (
+            SELECT pi.post_id,
+                   COUNT(*) FILTER (WHERE it.interaction_type_name = 'like') AS likes,
+                   COUNT(*) FILTER (WHERE it.interaction_type_name = 'dislike') AS dislikes,
+                   COUNT(*) FILTER (WHERE it.interaction_type_name = 'save') AS saves,
+                   COUNT(*) FILTER (WHERE it.interaction_type_name = 'share') AS shares,
+                   COUNT(*) FILTER (WHERE it.interaction_type_name = 'report') AS reports
+            FROM post_interactions pi
+            JOIN interaction_types it ON it.interaction_type_id = pi.interaction_type_id
+            GROUP BY pi.post_id
+        ) c ON c.post_id = p2.post_id
+        WHERE p.post_id = p2.post_id
+    """))
+    session.execute(text("""
+        UPDATE posts p SET comment_count = c.n
+        FROM (SELECT post_id, COUNT(*) AS n FROM comments WHERE NOT is_deleted GROUP BY post_id) c
+        WHERE c.post_id = p.post_id
+    """))
+    session.execute(text("""
+        UPDATE comments p SET reply_count = c.n
+        FROM (SELECT parent_comment_id, COUNT(*) AS n FROM comments
+              WHERE parent_comment_id IS NOT NULL GROUP BY parent_comment_id) c
+        WHERE c.parent_comment_id = p.comment_id
+    """))
+
+
+def seed_synthetic_dataset(
+        session: Session,
+        users: int = 200,
+        posts: int = 2000,
+        comments: int = 10000,
+        interactions: int = 50000,
+        seed: int = 42
+) -> Dict[str, int]:
+    """
+    Insert a reproducible synthetic dataset: the same `seed` and sizes give
+    the same users, posts, comments and interactions on an empty database.
+
+    Users are bench_user_<i>@example.test with password SYNTHETIC_PASSWORD
+    (re-running reuses them). Authors, commenters and interacted-with posts
+    follow a long-tailed distribution so a few posts are hot, as in
+    production. Requires reference data (`python -m app.cli seed`).
+    """
+    rng = random.Random(seed)
+
+    category_ids = [row[0] for row in session.query(Category.category_id).order_by(Category.category_id)]
+    post_type_ids = [row[0] for row in session.query(PostType.post_type_id).order_by(PostType.post_type_id)]
+    tag_ids = [row[0] for row in session.query(Tag.tag_id).order_by(Tag.tag_id)]
+    if not post_type_ids:
+        raise RuntimeError("Post types missing; run `python -m app.cli seed` first")
+
+    user_ids = _seed_users(session, rng, users)
+
+    now = datetime.now(timezone.utc)
+    post_rows = []
+    for _ in range(posts):
+        created_at = now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+        post_rows.append({
+            "user_id": user_ids[_skewed_index(rng, len(user_ids))],
+            "title": _sentence(rng, rng.randint(4, 10)),
+            "subtitle": _sentence(rng, rng.randint(6, 12)),
+            "content": _paragraphs(rng, 200, 6000),
+            "post_type_id": rng.choice(post_type_ids),
+            "category_id": rng.choice(category_ids) if category_ids else None,
+            "status": "active",
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    post_ids = _insert_returning(session, Post.__table__, post_rows, Post.post_id)
+
+    if tag_ids:
+        _insert_ignore(session, post_tags, [
+            {"post_id": post_id, "tag_id": tag_id}
+            for post_id in post_ids
+            for tag_id in rng.sample(tag_ids, min(len(tag_ids), rng.randint(0, 3)))
+        ])
+
+    comment_count = _seed_comments(session, rng, comments, post_ids, user_ids) if post_ids else 0
+    interaction_count = _seed_interactions(session, rng, interactions, post_ids, user_ids) if post_ids else 0
+
+    _refresh_counts(session)
+    session.commit()
+
+    return {
+        "users": len(user_ids),
+        "posts": len(post_ids),
+        "comments": comment_count,
+        "interactions": interaction_count,
+    }
@@ -11,6 +11,9 @@ from fastapi import HTTPException, status
 from typing import Dict, Any
 from app.utils.response_utils import create_response
 from app.auth.utils import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 async def register_user(user: UserCreate) -> Dict[str, Any]:
@@ -19,7 +22,7 @@ async def register_user(user: UserCreate) -> Dict[str, Any]:
     """
     # Hash the password
     hashed_password = hash_password(user.password)
-    print(f"Registering user with email: {user.email}")
+    logger.debug("Registering user %s", user.email)
 
     # Generate default username if not provided
     username = user.email.split("@")[0]
@@ -28,7 +31,6 @@ async def register_user(user: UserCreate) -> Dict[str, Any]:
     query = "SELECT EXISTS (SELECT 1 FROM users WHERE email = :email)"
     values = {"email": user.email}
     email_exists = await database.fetch_one(query=query, values=values)
-    print(f"Email exists check result: {email_exists}")
     #email_exists = db.query(User).filter(User.email == user.email).first()
 
 
@@ -57,7 +59,7 @@ async def register_user(user: UserCreate) -> Dict[str, Any]:
     }
 
     new_user = await database.fetch_one(query=insert_user_query, values=user_values)
-    print(f"New user created: {new_user}")
+    logger.info("New user created: %s", new_user["user_id"])
 
     # Create the user profile in the `user_profile` table
     insert_profile_query = """
@@ -137,7 +139,7 @@ async def login_user(user: UserLogin) -> Dict[str, Any]:
             }
         }
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         raise
 
 '''async def login_user(user: UserLogin) -> Dict[str, Any]:
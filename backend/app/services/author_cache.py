@@ -0,0 +1,275 @@
+# app/services/author_cache.py
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.RedisCache import RedisCache
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.datamodels.user_datamodels import User, UserProfile
+from app.utils.http_cache import version_key
+
+logger = get_logger(__name__)
+
+# Every process drops its local copy of a card when a user id is published here
+CHANNEL = "author_card:invalidate"
+
+# Write each card only if its author's profile version is still the one read
+# before the row was loaded. invalidate bumps the version before deleting the
+# card, so a read that raced a profile change can't put the old card back.
+# KEYS: card key, profile version key per card
+# ARGV: ttl, then the expected version and card JSON per card
+_SET_IF_CURRENT_SCRIPT = """
+local written = 0
+for i = 1, #KEYS, 2 do
+    if (redis.call('GET', KEYS[i + 1]) or '0') == ARGV[i + 1] then
+        redis.call('SET', KEYS[i], ARGV[i + 2], 'EX', ARGV[1])
+        written = written + 1
+    end
+end
+return written
+"""
+
+
+@dataclass(frozen=True)
+class AuthorCard:
+    """The public slice of users + user_profile that listings embed for an author"""
+    user_id: int
+    username: Optional[str]
+    avatar_img: Optional[str]
+    reputation_score: Optional[int]
+    reputation_cat: Optional[str]
+    expertise_area: Optional[str]
+    worldview_ai: Optional[str]
+    credentials: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    avatar_variants: Optional[dict] = None
+
+    @property
+    def has_profile(self) -> bool:
+        return self.username is not None
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for field in ("created_at", "updated_at"):
+            data[field] = data[field].isoformat() if data[field] else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "AuthorCard":
+        data = json.loads(raw)
+        # Ignore fields of older card layouts still in Redis
+        known = {field.name for field in fields(cls)}
+        data = {name: value for name, value in data.items() if name in known}
+        for field in ("created_at", "updated_at"):
+            data[field] = datetime.fromisoformat(data[field]) if data[field] else None
+        return cls(**data)
+
+
+class AuthorCardCache:
+    """
+    Author cards keyed by user_id: process LRU -> Redis MGET -> one IN query.
+
+    Listings select only ids and hydrate authors from here instead of
+    joinedload(User.profile) on every row. `invalidate` is called from
+    profile_service when a profile or avatar changes; it bumps the author's
+    profile version, deletes the Redis copy and publishes the id so every
+    worker drops its LRU entry. Cards are only written back to Redis under
+    the profile version read before their row was loaded.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.prefix = "author_card:"
+        self.expiry = settings.AUTHOR_CARD_CACHE_SECONDS
+        self.local_ttl = settings.AUTHOR_CARD_LOCAL_SECONDS
+        self.max_size = settings.AUTHOR_CARD_LRU_SIZE
+        self._local: "OrderedDict[int, Tuple[float, AuthorCard]]" = OrderedDict()
+        # Bumped on every invalidation seen by this process; cards fetched
+        # across a bump may predate it and are not cached
+        self._generation = 0
+        self._set_script = None
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}{user_id}"
+
+    def _version_key(self, user_id: int) -> str:
+        return version_key(f"profile:{user_id}")
+
+    def _local_get(self, user_id: int) -> Optional[AuthorCard]:
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        expires, card = entry
+        if expires < time.monotonic():
+            del self._local[user_id]
+            return None
+        self._local.move_to_end(user_id)
+        return card
+
+    def _local_put(self, card: AuthorCard) -> None:
+        self._local[card.user_id] = (time.monotonic() + self.local_ttl, card)
+        self._local.move_to_end(card.user_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def _load(self, db: Session, user_ids: Iterable[int]) -> Dict[int, AuthorCard]:
+        rows = (
+            db.query(
+                User.user_id, User.created_at, User.updated_at,
+                UserProfile.username, UserProfile.avatar_img, UserProfile.reputation_score,
+                UserProfile.reputation_cat, UserProfile.expertise_area, UserProfile.worldview_ai,
+                UserProfile.credentials, UserProfile.avatar_variants
+            )
+            .outerjoin(UserProfile, UserProfile.user_id == User.user_id)
+            .filter(User.user_id.in_(list(user_ids)))
+            .all()
+        )
+        return {
+            row.user_id: AuthorCard(
+                user_id=row.user_id,
+                username=row.username,
+                avatar_img=row.avatar_img,
+                reputation_score=row.reputation_score,
+                reputation_cat=row.reputation_cat,
+                expertise_area=row.expertise_area,
+                worldview_ai=row.worldview_ai,
+                credentials=row.credentials,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                avatar_variants=row.avatar_variants
+            )
+            for row in rows
+        }
+
+    async def get_many(self, db: Session, user_ids: Iterable[int]) -> Dict[int, AuthorCard]:
+        """Cards for every existing user in `user_ids`"""
+        user_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id is not None]
+        cards: Dict[int, AuthorCard] = {}
+
+        missing = []
+        for user_id in user_ids:
+            card = self._local_get(user_id)
+            if card is not None:
+                cards[user_id] = card
+            else:
+                missing.append(user_id)
+        if not missing:
+            return cards
+
+        generation = self._generation
+        versions: Dict[int, str] = {}
+        try:
+            # Profile versions are read with the cards, before any row is loaded
+            values = await self.cache.redis.mget(
+                [self._key(user_id) for user_id in missing]
+                + [self._version_key(user_id) for user_id in missing]
+            )
+            for user_id, value, version in zip(missing, values, values[len(missing):]):
+                if value is not None:
+                    cards[user_id] = AuthorCard.from_json(value)
+                versions[user_id] = version or "0"
+        except Exception as e:
+            logger.error("Error reading author cards: %s", e)
+
+        remote_missing = [user_id for user_id in missing if user_id not in cards]
+        if remote_missing:
+            loaded = self._load(db, remote_missing)
+            cards.update(loaded)
+            await self._store(loaded, versions)
+
+        if generation == self._generation:
+            for user_id in missing:
+                if user_id in cards:
+                    self._local_put(cards[user_id])
+        return cards
+
+    async def _store(self, loaded: Dict[int, AuthorCard], versions: Dict[int, str]) -> None:
+        """Write loaded cards whose profile version hasn't moved since `versions` was read"""
+        keys, args = [], [self.expiry]
+        for user_id, card in loaded.items():
+            if user_id not in versions:
+                continue
+            keys.extend((self._key(user_id), self._version_key(user_id)))
+            args.extend((versions[user_id], card.to_json()))
+        if not keys:
+            return
+        try:
+            if self._set_script is None:
+                self._set_script = self.cache.redis.register_script(_SET_IF_CURRENT_SCRIPT)
+            await self._set_script(keys=keys, args=args)
+        except Exception as e:
+            logger.error("Error caching author cards: %s", e)
+
+    async def get(self, db: Session, user_id: int) -> Optional[AuthorCard]:
+        cards = await self.get_many(db, [user_id])
+        return cards.get(user_id)
+
+    def _drop_local(self, user_id: Optional[int] = None) -> None:
+        """Forget one local card, or all of them"""
+        self._generation += 1
+        if user_id is None:
+            self._local.clear()
+        else:
+            self._local.pop(user_id, None)
+
+    async def invalidate(self, user_id: int) -> None:
+        self._drop_local(user_id)
+        try:
+            pipe = self.cache.redis.pipeline(transaction=True)
+            pipe.incr(self._version_key(user_id))
+            pipe.delete(self._key(user_id))
+            await pipe.execute()
+            await self.cache.redis.publish(CHANNEL, user_id)
+        except Exception as e:
+            logger.error("Error invalidating author card for user %s: %s", user_id, e)
+
+    async def listen_for_invalidations(self, poll_timeout: float = 1.0) -> None:
+        """
+        Drop local cards invalidated by any process.
+
+        The whole LRU is cleared after every (re)subscribe, since ids
+        published while disconnected were missed.
+        """
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.cache.redis.pubsub()
+                await pubsub.subscribe(CHANNEL)
+                self._drop_local()
+
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=poll_timeout)
+                    if message and message.get("type") == "message":
+                        self._drop_local(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Author card listener error, resubscribing: %s", e)
+                await asyncio.sleep(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe(CHANNEL)
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+
+# Singleton instance
+_author_card_cache: Optional[AuthorCardCache] = None
+
+
+def get_author_card_cache(cache: RedisCache) -> AuthorCardCache:
+    """Get or create AuthorCardCache instance"""
+    global _author_card_cache
+    if _author_card_cache is None:
+        _author_card_cache = AuthorCardCache(cache)
+    return _author_card_cache
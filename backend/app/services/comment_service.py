@@ -1,7 +1,7 @@
 # services/comment_service.py
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
 from fastapi import HTTPException
 from app.datamodels.comment_datamodels import Comment
 from app.schemas.comment_schemas import (
@@ -11,16 +11,29 @@ from app.schemas.comment_schemas import (
     UserResponse,
     CommentInteractionState
 )
-from app.datamodels.interaction_datamodels import CommentInteraction, InteractionType
-from app.datamodels.user_datamodels import User, UserProfile
+from app.datamodels.interaction_datamodels import CommentInteraction
+from app.core.interaction_types import get_interaction_types
 from app.datamodels.post_datamodels import Post
 from app.core.exceptions import DatabaseError
 from datetime import datetime
 from app.websocket_manager import manager
+from app.RedisCache import get_cache
+from app.services.trending_service import get_trending_service
+from app.services.interaction_state import get_interaction_state_store, empty_state
+from app.services.author_cache import AuthorCard, get_author_card_cache
+from app.services.listing_queries import user_comment_rows
+from app.core.logger import get_logger
+from app.core.instrumentation import timed
+
+logger = get_logger(__name__)
 
 class CommentService:
     def __init__(self, db: Session):
         self.db = db
+        self.state_store = get_interaction_state_store(get_cache())
+        self.author_cache = get_author_card_cache(get_cache())
+        # (user_id, comment_id) -> state, filled per thread with one HMGET
+        self._prefetched_states: Dict[tuple, Dict[str, bool]] = {}
 
     def _calculate_path(self, parent_id: Optional[int] = None) -> str:
         """Calculate materialized path for new comment"""
@@ -49,8 +62,7 @@ class CommentService:
     ) -> CommentResponse:
         """Create a new comment with real-time updates"""
         try:
-            print(f"Creating comment for user {user_id}")
-            print(f"Comment data: {comment_data}")
+            logger.debug("Creating comment for user %s on post %s", user_id, comment_data.post_id)
             # Calculate comment hierarchy data
             path = self._calculate_path(comment_data.parent_comment_id)
             depth = self._calculate_depth(path)
@@ -78,17 +90,22 @@ class CommentService:
 
             # Update post's comment count
             post = self.db.query(Post).get(comment_data.post_id)
+            category_id = None
             if post:
                 post.comment_count += 1
+                category_id = post.category_id
 
             self.db.commit()
             self.db.refresh(db_comment)
 
+            await get_trending_service(get_cache()).record_interaction(
+                comment_data.post_id, "comment", "added", category_id
+            )
+
             # Get complete comment data
             comment_response = await self.get_comment(db_comment.comment_id)
 
             # Broadcast new comment to all connected clients
-            print(f"Broadcasting new comment: {comment_response.dict()}")
             await manager.broadcast_to_post(
                 comment_data.post_id,
                 {
@@ -101,7 +118,7 @@ class CommentService:
 
         except Exception as e:
             self.db.rollback()
-            print(f"Error creating comment: {str(e)}")
+            logger.error("Error creating comment: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
     async def update_comment(
@@ -208,149 +225,151 @@ class CommentService:
     ) -> Optional[CommentResponse]:
         """Get a single comment with optional replies"""
         try:
-            # Get comment with user data using a single join query
-            comment = (
-                self.db.query(Comment)
-                .join(User)
-                .outerjoin(UserProfile)
-                .filter(Comment.comment_id == comment_id)
-                .first()
-            )
+            comment = self.db.query(Comment).filter(Comment.comment_id == comment_id).first()
 
             if not comment:
                 return None
 
-            # Get interaction state if user_id provided
-            interaction_state = {
-                "like": False,
-                "dislike": False,
-                "report": False
-            }
-
-            if user_id:
-                interactions = (
-                    self.db.query(CommentInteraction)
-                    .join(InteractionType)
-                    .filter(
-                        CommentInteraction.comment_id == comment_id,
-                        CommentInteraction.user_id == user_id
-                    )
-                    .all()
-                )
-
-                for interaction in interactions:
-                    interaction_state[
-                        interaction.interaction_type.interaction_type_name
-                    ] = True
-
-            # Get replies if requested
-            replies = None
+            # Replies at every depth come from one query, not one per reply
             if include_replies:
-                replies_query = (
-                    self.db.query(Comment)
-                    .filter(Comment.parent_comment_id == comment_id)
-                    .order_by(Comment.created_at.asc())
-                )
-                replies = []
-                for reply in replies_query.all():
-                    reply_response = await self.get_comment(
-                        reply.comment_id,
-                        user_id,
-                        include_replies=True
-                    )
-                    if reply_response:
-                        replies.append(reply_response)
-
-            # Create UserResponse
-            user_response = UserResponse(
-                user_id=comment.user.user_id,
-                username=comment.user.profile.username if comment.user.profile else f"user_{comment.user.user_id}",
-                email=comment.user.email,
-                avatar_img=comment.user.profile.avatar_img if comment.user.profile else None,
-                reputation_score=comment.user.profile.reputation_score if comment.user.profile else None,
-                expertise_area=comment.user.profile.expertise_area if comment.user.profile else None,
-                credentials=comment.user.profile.credentials if comment.user.profile else None,
-                created_at=comment.user.created_at,
-                updated_at=comment.user.updated_at
-            )
+                return (await self._build_trees([comment], user_id))[0]
 
-            return CommentResponse(
-                comment_id=comment.comment_id,
-                user_id=comment.user_id,
-                post_id=comment.post_id,
-                content=comment.content,
-                parent_comment_id=comment.parent_comment_id,
-                path=comment.path,
-                depth=comment.depth,
-                root_comment_id=comment.root_comment_id,
-                user=user_response,
-                username=user_response.username,
-                avatar_img=user_response.avatar_img,
-                reputation_score=user_response.reputation_score,
-                metrics=CommentMetrics(
-                    like_count=comment.like_count,
-                    dislike_count=comment.dislike_count,
-                    reply_count=comment.reply_count,
-                    report_count=comment.report_count
-                ),
-                interaction_state=interaction_state,  # Pass the dictionary directly
-                is_edited=comment.is_edited,
-                is_deleted=comment.is_deleted,
-                created_at=comment.created_at,
-                updated_at=comment.updated_at,
-                last_activity=comment.last_activity,
-                active_viewers=comment.active_viewers,
-                replies=replies
-            )
+            interaction_state = await self._get_interaction_state(comment_id, user_id)
+            author = await self.author_cache.get(self.db, comment.user_id)
+            user_response = self._build_user_data(comment, author)
+            return self._build_response(comment, user_response, interaction_state)
 
         except Exception as e:
-            print(f"Error in get_comment: {str(e)}")
+            logger.error("Error in get_comment: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _build_response(
+            self,
+            comment,
+            user_response: UserResponse,
+            interaction_state: Dict[str, bool],
+            replies: Optional[List[CommentResponse]] = None
+    ) -> CommentResponse:
+        """CommentResponse from a Comment entity or a CommentRow projection"""
+        return CommentResponse(
+            comment_id=comment.comment_id,
+            user_id=comment.user_id,
+            post_id=comment.post_id,
+            content=comment.content,
+            parent_comment_id=comment.parent_comment_id,
+            path=comment.path,
+            depth=comment.depth,
+            root_comment_id=comment.root_comment_id,
+            user=user_response,
+            username=user_response.username,
+            avatar_img=user_response.avatar_img,
+            reputation_score=user_response.reputation_score,
+            metrics=CommentMetrics(
+                like_count=comment.like_count,
+                dislike_count=comment.dislike_count,
+                reply_count=comment.reply_count,
+                report_count=comment.report_count
+            ),
+            interaction_state=interaction_state,  # Pass the dictionary directly
+            is_edited=comment.is_edited,
+            is_deleted=comment.is_deleted,
+            created_at=comment.created_at,
+            updated_at=comment.updated_at,
+            last_activity=comment.last_activity,
+            active_viewers=comment.active_viewers,
+            replies=replies
+        )
+
     async def _get_interaction_state(
             self,
             comment_id: int,
             user_id: Optional[int]
     ) -> Dict[str, bool]:
         """Get interaction state for a comment"""
-        interaction_state = {
-            "like": False,
-            "dislike": False,
-            "report": False
-        }
-
-        if user_id:
-            interactions = (
-                self.db.query(CommentInteraction)
-                .join(InteractionType)
-                .filter(
-                    CommentInteraction.comment_id == comment_id,
-                    CommentInteraction.user_id == user_id
-                )
-                .all()
-            )
-
-            for interaction in interactions:
-                interaction_state[interaction.interaction_type.interaction_type_name] = True
-
-        return interaction_state
+        if not user_id:
+            return empty_state("comment")
+
+        prefetched = self._prefetched_states.get((user_id, comment_id))
+        if prefetched is not None:
+            return prefetched
+
+        return await self.state_store.get_state(self.db, user_id, comment_id, target="comment")
+
+    def _load_replies(self, comments: List[Comment]) -> List[Comment]:
+        """Every reply below a page of comments, at any depth, oldest first"""
+        if not comments:
+            return []
+        prefixes = [f"{comment.path}.{comment.comment_id}" for comment in comments]
+        return (
+            self.db.query(Comment)
+            .filter(or_(*(
+                or_(Comment.path == prefix, Comment.path.like(f"{prefix}.%"))
+                for prefix in prefixes
+            )))
+            .order_by(Comment.created_at.asc())
+            .all()
+        )
 
-    def _build_user_data(self, comment: Comment) -> UserResponse:
+    async def _build_tree(
+            self,
+            comment: Comment,
+            children: Dict[int, List[Comment]],
+            authors: Dict[int, AuthorCard],
+            user_id: Optional[int]
+    ) -> CommentResponse:
+        """One comment and its replies from already loaded rows"""
+        replies = [
+            await self._build_tree(reply, children, authors, user_id)
+            for reply in children.get(comment.comment_id, [])
+        ]
+        interaction_state = await self._get_interaction_state(comment.comment_id, user_id)
+        user_response = self._build_user_data(comment, authors.get(comment.user_id))
+        return self._build_response(comment, user_response, interaction_state, replies)
+
+    async def _build_trees(self, comments: List[Comment], user_id: Optional[int]) -> List[CommentResponse]:
+        """Comments with their replies at every depth, from one reply query"""
+        replies = self._load_replies(comments)
+        thread = list(comments) + replies
+        # State and authors for the whole thread up front
+        await self._prefetch_interaction_states([comment.comment_id for comment in thread], user_id)
+        authors = await self._prefetch_authors([comment.user_id for comment in thread])
+
+        children: Dict[int, List[Comment]] = {}
+        for reply in replies:
+            children.setdefault(reply.parent_comment_id, []).append(reply)
+
+        return [await self._build_tree(comment, children, authors, user_id) for comment in comments]
+
+    async def _prefetch_interaction_states(self, comment_ids: List[int], user_id: Optional[int]) -> None:
+        """Load the state of these comments with one HMGET"""
+        if not user_id or not comment_ids:
+            return
+        states = await self.state_store.get_states(self.db, user_id, comment_ids, target="comment")
+        for comment_id, state in states.items():
+            self._prefetched_states[(user_id, comment_id)] = state
+
+    async def _prefetch_authors(self, user_ids: List[int]) -> Dict[int, AuthorCard]:
+        """Author cards for these commenters"""
+        if not user_ids:
+            return {}
+        return await self.author_cache.get_many(self.db, list(set(user_ids)))
+
+    def _build_user_data(self, comment: Comment, author: Optional[AuthorCard]) -> UserResponse:
         """Build user data response"""
-        if comment.user and hasattr(comment.user, 'profile') and comment.user.profile:
+        if author:
             return UserResponse(
-                user_id=comment.user.user_id,
-                username=comment.user.profile.username,
-                email=comment.user.email,
-                avatar_img=comment.user.profile.avatar_img,
-                reputation_score=comment.user.profile.reputation_score,
-                expertise_area=comment.user.profile.expertise_area,
-                credentials=comment.user.profile.credentials,
-                created_at=comment.user.created_at,
-                updated_at=comment.user.profile.updated_at if hasattr(comment.user.profile, 'updated_at') else None
+                user_id=author.user_id,
+                username=author.username if author.has_profile else f"user_{author.user_id}",
+                email="",
+                avatar_img=author.avatar_img,
+                reputation_score=author.reputation_score,
+                expertise_area=author.expertise_area,
+                credentials=author.credentials,
+                created_at=author.created_at or comment.created_at,
+                updated_at=author.updated_at
             )
 
-        # Create minimal user data if profile doesn't exist
+        # Create minimal user data if the user no longer exists
         return UserResponse(
             user_id=comment.user_id,
             username=f"user_{comment.user_id}",
@@ -358,6 +377,7 @@ class CommentService:
             created_at=comment.created_at
         )
 
+    @timed()
     async def get_comment_thread(
             self,
             post_id: int,
@@ -368,16 +388,8 @@ class CommentService:
     ) -> List[CommentResponse]:
         """Get a thread of comments with their replies"""
         try:
-            query = (
-                self.db.query(Comment)
-                .join(User)
-                .outerjoin(UserProfile)  # Ensure we're joining UserProfile
-                .options(
-                    joinedload(Comment.user).joinedload(User.profile),  # Eager load nested user data
-                    joinedload(Comment.replies).joinedload(Comment.user).joinedload(User.profile)
-                    # Load reply user data
-                )
-            )
+            # Only comment rows; authors are hydrated from the author card cache
+            query = self.db.query(Comment)
 
             if parent_id is not None:
                 parent = self.db.query(Comment).get(parent_id)
@@ -400,21 +412,11 @@ class CommentService:
             total = query.count()
             comments = query.offset((page - 1) * page_size).limit(page_size).all()
 
-            # Process comments and ensure all nested data is loaded
-            responses = []
-            for comment in comments:
-                comment_response = await self.get_comment(
-                    comment.comment_id,
-                    user_id,
-                    include_replies=True  # Always include replies for thread view
-                )
-                if comment_response:
-                    responses.append(comment_response)
-
-            return responses
+            # Always include replies for thread view
+            return await self._build_trees(comments, user_id)
 
         except Exception as e:
-            print(f"Error in get_comment_thread: {str(e)}")
+            logger.error("Error in get_comment_thread: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
     async def update_activity(
@@ -447,7 +449,7 @@ class CommentService:
 
         except Exception as e:
             self.db.rollback()
-            print(f"Error updating comment activity: {str(e)}")
+            logger.error("Error updating comment activity: %s", e)
 
     async def handle_interaction(
             self,
@@ -463,12 +465,9 @@ class CommentService:
                 raise HTTPException(status_code=404, detail="Comment not found")
 
             # Get the interaction type ID
-            interaction_type_record = (
-                self.db.query(InteractionType)
-                .filter(InteractionType.interaction_type_name == interaction_type)
-                .first()
-            )
-            if not interaction_type_record:
+            types = get_interaction_types()
+            interaction_type_record = types.by_name.get(interaction_type)
+            if not interaction_type_record or not types.allows(interaction_type, "COMMENT"):
                 raise HTTPException(status_code=400, detail="Invalid interaction type")
 
             # Check for existing interaction
@@ -505,6 +504,11 @@ class CommentService:
             self.db.commit()
             self.db.refresh(comment)
 
+            if existing_interaction:
+                await self.state_store.apply(user_id, comment_id, removed=[interaction_type], target="comment")
+            else:
+                await self.state_store.apply(user_id, comment_id, added=[interaction_type], target="comment")
+
             # Get updated comment data
             return await self.get_comment(comment_id, user_id)
 
@@ -514,6 +518,7 @@ class CommentService:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
+    @timed()
     async def get_user_comments(
             self,
             user_id: int,
@@ -523,37 +528,25 @@ class CommentService:
     ) -> List[CommentResponse]:
         """Get comments made by a specific user"""
         try:
-            # Query comments by user_id
-            query = (
-                self.db.query(Comment)
-                .join(User)
-                .outerjoin(UserProfile)
-                .filter(Comment.user_id == user_id)
-                .options(
-                    joinedload(Comment.user).joinedload(User.profile),
-                    joinedload(Comment.replies).joinedload(Comment.user).joinedload(User.profile)
-                )
-                .order_by(Comment.created_at.desc())  # Most recent first
-            )
+            # Projected rows, most recent first; no reply chains for performance
+            comments = user_comment_rows(self.db, user_id, (page - 1) * page_size, page_size)
 
-            # Apply pagination
-            total = query.count()
-            comments = query.offset((page - 1) * page_size).limit(page_size).all()
-
-            # Process comments and ensure all nested data is loaded
-            responses = []
-            for comment in comments:
-                comment_response = await self.get_comment(
-                    comment.comment_id,
-                    user_id=viewer_id,
-                    include_replies=False  # Don't include full reply chains for performance
+            states = await self.state_store.get_states(
+                self.db, viewer_id, [comment.comment_id for comment in comments], target="comment"
+            )
+            # Every comment has the same author
+            author = await self.author_cache.get(self.db, user_id)
+
+            return [
+                self._build_response(
+                    comment,
+                    self._build_user_data(comment, author),
+                    states[comment.comment_id]
                 )
-                if comment_response:
-                    responses.append(comment_response)
-
-            return responses
+                for comment in comments
+            ]
 
         except Exception as e:
-            print(f"Error in get_user_comments: {str(e)}")
+            logger.error("Error in get_user_comments: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,186 @@
+# app/services/export_service.py
+"""
+Streaming NDJSON export of a user's posts, comments and saved posts, plus the
+streamed JSON post listing behind GET /posts/me/debug.
+
+Each section is read through a server-side cursor (`yield_per`) and written
+one JSON object per line, so memory stays flat no matter how large the
+account is. The generator owns its session: the request-scoped one from
+get_db may already be closed while the response is still streaming.
+"""
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, union
+from sqlalchemy.orm import Query, Session
+
+from app.core.interaction_types import get_interaction_types
+from app.core.logger import get_logger
+from app.datamodels.comment_datamodels import Comment
+from app.datamodels.interaction_datamodels import PostInteraction
+from app.datamodels.post_datamodels import Post, saved_posts_table
+from app.services.listing_queries import COUNT_COLUMNS, comment_query
+from app.services.post_body_cache import dump_json
+from database.database import SessionLocal
+
+logger = get_logger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_BATCH_SIZE = 500
+
+POST_EXPORT_COLUMNS = (
+    Post.post_id, Post.title, Post.subtitle, Post.content, Post.summary,
+    Post.image_url, Post.images, Post.video_url,
+    Post.post_type_id, Post.category_id, Post.subcategory_id, Post.custom_subcategory,
+    Post.visibility, Post.is_draft, Post.status, Post.created_at, Post.updated_at,
+    *COUNT_COLUMNS
+)
+
+
+def _posts_query(db: Session, user_id: int) -> Query:
+    return (
+        db.query(*POST_EXPORT_COLUMNS)
+        .filter(Post.user_id == user_id, Post.status == 'active')
+        .order_by(Post.created_at.desc())
+    )
+
+
+def _comments_query(db: Session, user_id: int) -> Query:
+    return (
+        comment_query(db)
+        .filter(Comment.user_id == user_id, Comment.is_deleted.isnot(True))
+        .order_by(Comment.created_at.desc())
+    )
+
+
+def _saved_query(db: Session, user_id: int) -> Query:
+    """Posts saved through either the saved_posts table or a save interaction"""
+    saved_sources = [select(saved_posts_table.c.post_id).where(saved_posts_table.c.user_id == user_id)]
+    save_type = get_interaction_types().by_name.get("save")
+    if save_type:
+        saved_sources.append(
+            select(PostInteraction.post_id).where(
+                PostInteraction.user_id == user_id,
+                PostInteraction.interaction_type_id == save_type.interaction_type_id
+            )
+        )
+    saved_ids = union(*saved_sources).subquery()
+    return (
+        db.query(Post.post_id, Post.user_id, Post.title, Post.summary, Post.created_at)
+        .join(saved_ids, saved_ids.c.post_id == Post.post_id)
+        .filter(Post.status == 'active')
+        .order_by(Post.post_id)
+    )
+
+
+# section -> (record type, query)
+EXPORT_SECTIONS: Dict[str, tuple] = {
+    "posts": ("post", _posts_query),
+    "comments": ("comment", _comments_query),
+    "saved": ("saved_post", _saved_query),
+}
+
+
+def validate_sections(sections: Sequence[str]) -> Sequence[str]:
+    unknown = [section for section in sections if section not in EXPORT_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown export sections: {', '.join(unknown)}. "
+                   f"Valid sections: {', '.join(EXPORT_SECTIONS)}"
+        )
+    return sections
+
+
+def iter_user_export(
+        user_id: int,
+        sections: Sequence[str] = tuple(EXPORT_SECTIONS),
+        batch_size: int = EXPORT_BATCH_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """NDJSON lines ({"type": ..., <columns>}) for each requested section"""
+    db = session_factory()
+    count = 0
+    try:
+        for section in sections:
+            record_type, build_query = EXPORT_SECTIONS[section]
+            for row in build_query(db, user_id).yield_per(batch_size):
+                count += 1
+                yield dump_json({"type": record_type, **row._asdict()}) + b"\n"
+    except Exception as e:
+        # Headers are already sent; end the stream with an error record
+        logger.error("Export for user %s failed after %s records: %s", user_id, count, e)
+        yield dump_json({"type": "error", "detail": "Export interrupted"}) + b"\n"
+    finally:
+        db.close()
+    logger.debug("Exported %s records for user %s", count, user_id)
+
+
+def _legacy_post(row) -> dict:
+    """A post in the {"posts": [...]} shape of GET /posts/me/debug"""
+    post = {
+        "post_id": row.post_id,
+        "title": row.title,
+        "content": row.content,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "status": row.status or "active",
+        "likes": row.like_count or 0,
+        "comments": row.comment_count or 0,
+        "shares": row.share_count or 0,
+        "views": 0,
+    }
+    if row.image_url:
+        post["image_url"] = row.image_url
+    return post
+
+
+def iter_user_posts_json(
+        user_id: int,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """
+    A user's active posts as one JSON object, {"posts": [...], "count", "success"},
+    written incrementally from the same cursor as the NDJSON posts section
+    """
+    db = session_factory()
+    count = 0
+    yield b'{"posts":['
+    try:
+        for row in _posts_query(db, user_id).yield_per(batch_size):
+            yield (b"," if count else b"") + dump_json(_legacy_post(row))
+            count += 1
+        yield b'],' + dump_json({"count": count, "success": True})[1:]
+    except Exception as e:
+        # Headers are already sent; close the document with the failure
+        logger.error("Post listing for user %s failed after %s posts: %s", user_id, count, e)
+        yield b'],' + dump_json({"count": count, "success": False, "detail": "Listing interrupted"})[1:]
+    finally:
+        db.close()
+
+
+def user_posts_json_response(user_id: int) -> StreamingResponse:
+    """StreamingResponse over iter_user_posts_json"""
+    return StreamingResponse(
+        iter_user_posts_json(user_id),
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+def export_response(
+        user_id: int,
+        sections: Sequence[str] = tuple(EXPORT_SECTIONS),
+        filename: Optional[str] = None
+) -> StreamingResponse:
+    """StreamingResponse over iter_user_export; served as a download when filename is set"""
+    headers = {"Cache-Control": "no-store"}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        iter_user_export(user_id, validate_sections(sections)),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=headers
+    )
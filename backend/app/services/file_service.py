@@ -1,51 +1,38 @@
 # app/services/file_service.py
 # At some point movie upload_post_image / video to here?
 import os
-import uuid
+from typing import Dict, Tuple
 from fastapi import UploadFile
-from PIL import Image
-import aiofiles
 from app.core.config import settings
 from app.core.logger import get_logger, log_execution_time
+from app.services.media_store import store_media
+from app.services.upload_service import StoredUpload
 
 logger = get_logger(__name__)
 
 # Use the configured directory from settings
-UPLOAD_DIR = os.path.join(settings.MEDIA_ROOT, "avatars")
+UPLOAD_DIR = settings.AVATAR_DIR
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def save_avatar_image(file: UploadFile) -> str:
+async def save_avatar_image(file: UploadFile) -> Tuple[StoredUpload, Dict[str, dict]]:
     """
-    Save an avatar image and return the file path.
+    Save an avatar image and return (stored blob, variants).
+
+    The upload goes to the content-addressed media store; 64px and 200px
+    WebP/JPEG variants are rendered in the image process pool. Callers store
+    the 200px JPEG URL as avatar_img, matching the previous resized avatar.
     """
     try:
-        # Generate unique filename
-        file_extension = file.filename.split(".")[-1].lower() if file.filename else "jpg"
-        filename = f"{uuid.uuid4()}.{file_extension}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-
-        logger.info(f"Saving avatar to {filepath}")
-
         # Ensure the file is an image
         content_type = file.content_type or ""
         if not content_type.startswith("image/"):
             raise ValueError("File must be an image (JPEG, PNG, or GIF)")
 
-        # Save the file
-        async with aiofiles.open(filepath, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
-
-        # Process image (resize if needed)
-        with Image.open(filepath) as img:
-            # Resize image to standard size for avatars (e.g., 200x200)
-            img.thumbnail((200, 200))
-            img.save(filepath)
-
-        # Return the relative path for storage in database - this should match the router URL pattern
-        return f"/avatars/{filename}"
+        stored, variants = await store_media(file, "avatar")
+        logger.debug("Saved avatar to %s", stored.path)
+        return stored, variants
     except Exception as e:
         logger.error(f"Error saving avatar: {str(e)}")
         raise
@@ -0,0 +1,160 @@
+# app/services/image_service.py
+"""
+Responsive image variants, rendered off the event loop.
+
+Decoding and resizing run in a ProcessPoolExecutor: Pillow holds the GIL for
+most of that work, so a thread pool would still stall request handling on
+large images. Every variant is written as WebP and JPEG with metadata
+(EXIF, ICC profile, comments) stripped, next to the original upload.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.services.upload_service import StoredUpload, store_upload
+
+logger = get_logger(__name__)
+
+# kind -> variant name -> bounding box
+VARIANT_SIZES: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "post": {
+        "card": (640, 640),
+        "detail": (1600, 1600),
+    },
+    "avatar": {
+        "64": (64, 64),
+        "200": (200, 200),
+    },
+}
+
+# Pillow format name -> file extension
+VARIANT_FORMATS: Dict[str, str] = {
+    "WEBP": "webp",
+    "JPEG": "jpg",
+}
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+
+class InvalidImageError(ValueError):
+    """The upload could not be decoded as an image"""
+
+
+def _render_variants(
+        source_path: str,
+        stem: str,
+        sizes: Dict[str, Tuple[int, int]]
+) -> Dict[str, dict]:
+    """
+    Worker-process entry point: write every size/format of one image.
+
+    Returns {variant: {"width", "height", "webp", "jpg"}} with file names
+    relative to the source directory.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    directory = os.path.dirname(source_path)
+    try:
+        with Image.open(source_path) as original:
+            original.seek(0)  # first frame of animated images
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        # DecompressionBombError: more than 2x Image.MAX_IMAGE_PIXELS
+        raise InvalidImageError(f"Could not decode image: {e}")
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants: Dict[str, dict] = {}
+    for name, box in sizes.items():
+        variant = image.copy()
+        variant.thumbnail(box, Image.LANCZOS)
+        variant.info = {}  # drop EXIF, ICC profile, comments
+
+        entry = {"width": variant.width, "height": variant.height}
+        for image_format, extension in VARIANT_FORMATS.items():
+            filename = f"{stem}-{name}.{extension}"
+            final_path = os.path.join(directory, filename)
+            temp_path = f"{final_path}.part"
+
+            output = variant
+            options = {"quality": WEBP_QUALITY, "method": 4}
+            if image_format == "JPEG":
+                options = {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}
+                if has_alpha:
+                    background = Image.new("RGB", variant.size, (255, 255, 255))
+                    background.paste(variant, mask=variant.getchannel("A"))
+                    output = background
+
+            output.save(temp_path, format=image_format, **options)
+            os.replace(temp_path, final_path)
+            entry[extension] = filename
+        variants[name] = entry
+
+    return variants
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_executor() -> ProcessPoolExecutor:
+    """Process pool shared by all image jobs in this worker"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_image_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def generate_variants(source_path: str, url_prefix: str, kind: str) -> Dict[str, dict]:
+    """
+    Render the `kind` variants of an image stored at source_path.
+
+    Returns {variant: {"width", "height", "webp": url, "jpg": url}}; files are
+    named after the source (content hash) so identical uploads share them.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    loop = asyncio.get_running_loop()
+    variants = await loop.run_in_executor(
+        get_image_executor(), _render_variants, source_path, stem, VARIANT_SIZES[kind]
+    )
+
+    prefix = url_prefix.rstrip("/")
+    for entry in variants.values():
+        for extension in VARIANT_FORMATS.values():
+            entry[extension] = f"{prefix}/{entry[extension]}"
+    logger.debug("Generated %s variants for %s", kind, os.path.basename(source_path))
+    return variants
+
+
+async def store_image_with_variants(
+        file: UploadFile,
+        directory: str,
+        url_prefix: str,
+        kind: str,
+        shard: bool = False
+) -> Tuple[StoredUpload, Dict[str, dict]]:
+    """Stream an upload to disk, then render its variants; 400 if it isn't an image"""
+    stored = await store_upload(file, directory, url_prefix, shard=shard)
+    try:
+        # Variants sit next to the original
+        variants = await generate_variants(stored.path, stored.url.rsplit("/", 1)[0], kind)
+    except InvalidImageError as e:
+        logger.warning("Rejected upload %s: %s", stored.path, e)
+        if not stored.deduplicated:
+            await asyncio.to_thread(os.remove, stored.path)
+        raise HTTPException(status_code=400, detail="File must be a valid image")
+    return stored, variants
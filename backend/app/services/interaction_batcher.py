@@ -0,0 +1,308 @@
+# app/services/interaction_batcher.py
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.RedisCache import RedisCache
+from app.core.config import settings
+from app.core.exceptions import PostNotFoundError, DatabaseError, InvalidInteractionTypeError
+from app.core.interaction_types import get_interaction_types
+from app.core.logger import get_logger
+from app.core.metrics import get_metrics_collector
+from app.services.trending_service import get_trending_service
+from app.services.interaction_state import get_interaction_state_store
+from database.database import SessionLocal
+
+logger = get_logger(__name__)
+
+# Interactions that go through the batcher (save has its own path)
+BATCHED_INTERACTIONS = ("like", "dislike", "share", "report")
+# Adding one of these removes the other for the same user
+EXCLUSIVE = {"like": "dislike", "dislike": "like"}
+COUNT_COLUMNS = ("like_count", "dislike_count", "save_count", "share_count", "comment_count", "report_count")
+
+
+@dataclass
+class _Toggle:
+    user_id: int
+    interaction_type: str
+    metadata: Optional[Dict[str, Any]]
+    future: asyncio.Future
+
+
+@dataclass
+class _PostBatch:
+    toggles: List[_Toggle] = field(default_factory=list)
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+def _replay(
+        initial: Set[Tuple[int, str]],
+        toggles: List[_Toggle]
+) -> Tuple[List[Tuple[bool, str]], Set[Tuple[int, str]], Dict[Tuple[int, str], Optional[Dict[str, Any]]]]:
+    """
+    Apply toggles in arrival order to the (user_id, type) pairs that exist.
+
+    Returns (is_active, action) per toggle, the resulting pairs and the
+    metadata of the toggle that added each pair.
+    """
+    state = set(initial)
+    metadata: Dict[Tuple[int, str], Optional[Dict[str, Any]]] = {}
+    results: List[Tuple[bool, str]] = []
+    for toggle in toggles:
+        key = (toggle.user_id, toggle.interaction_type)
+        if key in state:
+            state.discard(key)
+            results.append((False, "removed"))
+        else:
+            state.add(key)
+            metadata[key] = toggle.metadata
+            opposite = EXCLUSIVE.get(toggle.interaction_type)
+            if opposite:
+                state.discard((toggle.user_id, opposite))
+            results.append((True, "added"))
+    return results, state, metadata
+
+
+class InteractionBatcher:
+    """
+    Coalesces interaction toggles per post.
+
+    Toggles that arrive for the same post within a few milliseconds are applied
+    in one transaction: the post row is locked once, the current state of the
+    affected (user, type) pairs is read once, every toggle is replayed in
+    arrival order in memory (so a double click nets out and like/dislike stay
+    exclusive), and the net difference is written with one set-based DELETE,
+    one INSERT and one counter UPDATE. Each caller still gets the result of its
+    own toggle.
+
+    Batches for the same post are flushed strictly in order.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.window = settings.INTERACTION_BATCH_WINDOW_MS / 1000.0
+        self.max_batch = settings.INTERACTION_BATCH_MAX_SIZE
+        self._batches: Dict[int, _PostBatch] = {}
+        self._post_locks: Dict[int, asyncio.Lock] = {}
+        self._pending_flushes: Dict[int, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(
+            self,
+            post_id: int,
+            user_id: int,
+            interaction_type: str,
+            metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Queue one toggle and wait for the batch it lands in to commit"""
+        if interaction_type not in BATCHED_INTERACTIONS:
+            raise InvalidInteractionTypeError(interaction_type)
+
+        loop = asyncio.get_running_loop()
+        toggle = _Toggle(user_id, interaction_type, metadata, loop.create_future())
+
+        batch = self._batches.get(post_id)
+        if batch is None:
+            batch = self._batches[post_id] = _PostBatch()
+            batch.flush_handle = loop.call_later(self.window, self._start_flush, post_id)
+        batch.toggles.append(toggle)
+
+        if len(batch.toggles) >= self.max_batch:
+            batch.flush_handle.cancel()
+            self._start_flush(post_id)
+
+        return await toggle.future
+
+    def _start_flush(self, post_id: int) -> None:
+        batch = self._batches.pop(post_id, None)
+        if batch and batch.toggles:
+            task = asyncio.ensure_future(self._flush(post_id, batch.toggles))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, post_id: int, toggles: List[_Toggle]) -> None:
+        lock = self._post_locks.setdefault(post_id, asyncio.Lock())
+        self._pending_flushes[post_id] = self._pending_flushes.get(post_id, 0) + 1
+        try:
+            async with lock:
+                results, counts, category_id, changes = await asyncio.to_thread(
+                    self._apply, post_id, toggles
+                )
+        except Exception as e:
+            if not isinstance(e, (PostNotFoundError, DatabaseError)):
+                logger.error("Error applying interaction batch for post %s: %s", post_id, e)
+                e = DatabaseError(f"Error processing interactions: {str(e)}")
+            for toggle in toggles:
+                if not toggle.future.done():
+                    toggle.future.set_exception(e)
+            return
+        finally:
+            self._pending_flushes[post_id] -= 1
+            if not self._pending_flushes[post_id]:
+                del self._pending_flushes[post_id]
+                self._post_locks.pop(post_id, None)
+
+        for toggle, (is_active, action) in zip(toggles, results):
+            if toggle.future.done():
+                continue
+            toggle.future.set_result({
+                "message": f"{toggle.interaction_type} {action} successfully",
+                f"{toggle.interaction_type}_count": counts[f"{toggle.interaction_type}_count"],
+                toggle.interaction_type: is_active,
+                "metrics": counts
+            })
+
+        await self._after_commit(post_id, counts, category_id, changes)
+
+    def _apply(
+            self,
+            post_id: int,
+            toggles: List[_Toggle]
+    ) -> Tuple[List[Tuple[bool, str]], Dict[str, int], Optional[int], List[Tuple[int, str, str]]]:
+        """Runs in a worker thread with its own session"""
+        types = get_interaction_types()
+        names = set(BATCHED_INTERACTIONS)
+        missing = names - set(types.by_name)
+        if missing:
+            raise DatabaseError(f"retrieving interaction types {sorted(missing)}")
+        type_ids = {name: types.id(name) for name in names}
+
+        db = SessionLocal()
+        try:
+            # One row lock per batch instead of one per toggle
+            post = db.execute(
+                text("SELECT category_id FROM posts WHERE post_id = :post_id FOR UPDATE"),
+                {"post_id": post_id}
+            ).first()
+            if post is None:
+                raise PostNotFoundError(post_id)
+
+            user_ids = sorted({toggle.user_id for toggle in toggles})
+            id_to_name = {type_ids[name]: name for name in names}
+            existing = db.execute(text("""
+                SELECT user_id, interaction_type_id FROM post_interactions
+                WHERE post_id = :post_id
+                  AND user_id = ANY(:user_ids)
+                  AND interaction_type_id = ANY(:type_ids)
+            """), {
+                "post_id": post_id,
+                "user_ids": user_ids,
+                "type_ids": list(id_to_name)
+            }).fetchall()
+
+            initial: Set[Tuple[int, str]] = {(user_id, id_to_name[type_id]) for user_id, type_id in existing}
+            results, state, metadata = _replay(initial, toggles)
+
+            to_insert = sorted(state - initial)
+            to_delete = sorted(initial - state)
+
+            if to_delete:
+                db.execute(text("""
+                    DELETE FROM post_interactions
+                    WHERE post_id = :post_id
+                      AND (user_id, interaction_type_id) IN (
+                          SELECT * FROM unnest(CAST(:user_ids AS integer[]), CAST(:type_ids AS integer[]))
+                      )
+                """), {
+                    "post_id": post_id,
+                    "user_ids": [user_id for user_id, _ in to_delete],
+                    "type_ids": [type_ids[name] for _, name in to_delete]
+                })
+
+            if to_insert:
+                db.execute(text("""
+                    INSERT INTO post_interactions
+                        (post_id, user_id, interaction_type_id, target_type, interaction_metadata)
+                    SELECT :post_id, u, t, 'POST', CAST(m AS JSON)
+                    FROM unnest(CAST(:user_ids AS integer[]), CAST(:type_ids AS integer[]),
+                                CAST(:metadata AS text[])) AS rows(u, t, m)
+                    ON CONFLICT (post_id, user_id, interaction_type_id) DO NOTHING
+                """), {
+                    "post_id": post_id,
+                    "user_ids": [user_id for user_id, _ in to_insert],
+                    "type_ids": [type_ids[name] for _, name in to_insert],
+                    "metadata": [
+                        json.dumps(metadata[key]) if metadata.get(key) else None
+                        for key in to_insert
+                    ]
+                })
+
+            deltas = {name: 0 for name in BATCHED_INTERACTIONS}
+            for _, name in to_insert:
+                deltas[name] += 1
+            for _, name in to_delete:
+                deltas[name] -= 1
+
+            row = db.execute(text(f"""
+                UPDATE posts SET
+                    like_count = GREATEST(0, COALESCE(like_count, 0) + :like),
+                    dislike_count = GREATEST(0, COALESCE(dislike_count, 0) + :dislike),
+                    share_count = GREATEST(0, COALESCE(share_count, 0) + :share),
+                    report_count = GREATEST(0, COALESCE(report_count, 0) + :report)
+                WHERE post_id = :post_id
+                RETURNING {", ".join(COUNT_COLUMNS)}
+            """), {"post_id": post_id, **deltas}).first()
+
+            db.commit()
+
+            counts = {column: value or 0 for column, value in zip(COUNT_COLUMNS, row)}
+            changes = (
+                [(user_id, name, "added") for user_id, name in to_insert]
+                + [(user_id, name, "removed") for user_id, name in to_delete]
+            )
+            if len(toggles) > 1:
+                logger.debug(
+                    "Applied %s toggles for post %s as %s inserts / %s deletes",
+                    len(toggles), post_id, len(to_insert), len(to_delete)
+                )
+            return results, counts, post[0], changes
+
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error("Database error applying interaction batch: %s", e)
+            raise DatabaseError(f"Error processing interactions: {str(e)}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _after_commit(
+            self,
+            post_id: int,
+            counts: Dict[str, int],
+            category_id: Optional[int],
+            changes: List[Tuple[int, str, str]]
+    ) -> None:
+        """Cache, metrics and trending updates for the net changes of a batch"""
+        try:
+            await self.cache.set(f"post:{post_id}:counts", counts, expire=settings.CACHE_EXPIRY_SECONDS)
+            metrics = get_metrics_collector(self.cache)
+            trending = get_trending_service(self.cache)
+            state_store = get_interaction_state_store(self.cache)
+            for user_id, name, action in changes:
+                if action == "added":
+                    await state_store.apply(user_id, post_id, added=[name])
+                else:
+                    await state_store.apply(user_id, post_id, removed=[name])
+                await metrics.record_interaction(post_id, user_id, name, action)
+                await trending.record_interaction(post_id, name, action, category_id)
+        except Exception as e:
+            logger.error("Error in post-commit updates for post %s: %s", post_id, e)
+
+
+# Singleton instance
+_interaction_batcher: Optional[InteractionBatcher] = None
+
+
+def get_interaction_batcher(cache: RedisCache) -> InteractionBatcher:
+    """Get or create InteractionBatcher instance"""
+    global _interaction_batcher
+    if _interaction_batcher is None:
+        _interaction_batcher = InteractionBatcher(cache)
+    return _interaction_batcher
@@ -0,0 +1,247 @@
+# app/services/interaction_state.py
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.RedisCache import RedisCache
+from app.core.interaction_types import get_interaction_types
+from app.core.logger import get_logger
+from app.datamodels.interaction_datamodels import PostInteraction, CommentInteraction
+
+logger = get_logger(__name__)
+
+# One bit per interaction type
+BITS: Dict[str, int] = {
+    "like": 1,
+    "dislike": 2,
+    "save": 4,
+    "share": 8,
+    "report": 16,
+}
+
+# Interaction names reported per target
+TARGET_INTERACTIONS: Dict[str, tuple] = {
+    "post": ("like", "dislike", "save", "share", "report"),
+    "comment": ("like", "dislike", "report"),
+}
+
+# A user's hash lives this long after its last write; misses are
+# backfilled from the database
+STATE_TTL_SECONDS = 7 * 86400
+
+# Hash field bumped by every write; a backfill only lands if it is unchanged
+# since the HMGET that found the miss
+GENERATION_FIELD = "_gen"
+
+# Set/clear bits on a field, but only if the field is already known. An
+# unknown field is left alone so the next read backfills it from the
+# (already committed) database row instead of caching a partial mask.
+# The generation is bumped either way so a backfill that read the database
+# before this write was committed is discarded.
+_APPLY_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], ARGV[5], 1)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then
+    return -1
+end
+local mask = tonumber(current)
+local set_bits = tonumber(ARGV[2])
+local clear_bits = tonumber(ARGV[3])
+-- (mask & ~clear) | set, one bit at a time so it doesn't need the bit library
+local result, place = 0, 1
+while place <= mask or place <= set_bits do
+    local has = math.floor(mask / place) % 2 == 1
+    local set = math.floor(set_bits / place) % 2 == 1
+    local clear = math.floor(clear_bits / place) % 2 == 1
+    if set or (has and not clear) then
+        result = result + place
+    end
+    place = place * 2
+end
+redis.call('HSET', KEYS[1], ARGV[1], result)
+return result
+"""
+
+# Store backfilled masks unless a write bumped the generation since they were
+# read. HSETNX keeps any field a concurrent apply already wrote.
+_BACKFILL_SCRIPT = """
+local generation = redis.call('HGET', KEYS[1], ARGV[1]) or ''
+if generation ~= ARGV[2] then
+    return 0
+end
+for i = 4, #ARGV, 2 do
+    redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def _mask_to_state(mask: int, target: str) -> Dict[str, bool]:
+    return {name: bool(mask & BITS[name]) for name in TARGET_INTERACTIONS[target]}
+
+
+def empty_state(target: str = "post") -> Dict[str, bool]:
+    return _mask_to_state(0, target)
+
+
+class InteractionStateStore:
+    """
+    Per-user interaction state as a Redis hash of target_id -> bitmask.
+
+    `istate:{target}:user:{user_id}` holds one small integer per post (or
+    comment) the user has been shown, so a page of N posts is one HMGET plus
+    at most one IN query for the ids that were not cached yet.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.prefix = "istate:"
+        self._apply_script = None
+        self._backfill_script = None
+
+    def _key(self, target: str, user_id: int) -> str:
+        return f"{self.prefix}{target}:user:{user_id}"
+
+    def _load_masks(self, db: Session, target: str, user_id: int, ids: List[int]) -> Dict[int, int]:
+        """Masks for `ids` from post_interactions / comment_interactions"""
+        if target == "post":
+            model, id_column = PostInteraction, PostInteraction.post_id
+        else:
+            model, id_column = CommentInteraction, CommentInteraction.comment_id
+
+        types = get_interaction_types()
+        rows = (
+            db.query(id_column, model.interaction_type_id)
+            .filter(model.user_id == user_id, id_column.in_(ids))
+            .all()
+        )
+        masks = {target_id: 0 for target_id in ids}
+        for target_id, type_id in rows:
+            masks[target_id] |= BITS.get(types.name(type_id), 0)
+        return masks
+
+    async def get_masks(
+            self,
+            db: Session,
+            user_id: int,
+            ids: Iterable[int],
+            target: str = "post"
+    ) -> Dict[int, int]:
+        """Bitmask per id, backfilling anything Redis doesn't know yet"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+
+        key = self._key(target, user_id)
+        masks: Dict[int, int] = {}
+        generation = None
+        cache_ok = True
+        try:
+            values = await self.cache.redis.hmget(key, [GENERATION_FIELD] + [str(i) for i in ids])
+            generation = values[0]
+            for target_id, value in zip(ids, values[1:]):
+                if value is not None:
+                    masks[target_id] = int(value)
+        except Exception as e:
+            logger.error("Error reading interaction state for user %s: %s", user_id, e)
+            cache_ok = False
+
+        missing = [target_id for target_id in ids if target_id not in masks]
+        if missing:
+            loaded = self._load_masks(db, target, user_id, missing)
+            masks.update(loaded)
+            if cache_ok:
+                await self._backfill(key, generation, loaded)
+
+        return masks
+
+    async def _backfill(self, key: str, generation: Optional[str], loaded: Dict[int, int]) -> None:
+        args = [GENERATION_FIELD, generation or "", STATE_TTL_SECONDS]
+        for target_id, mask in loaded.items():
+            args.extend((str(target_id), mask))
+        try:
+            if self._backfill_script is None:
+                self._backfill_script = self.cache.redis.register_script(_BACKFILL_SCRIPT)
+            await self._backfill_script(keys=[key], args=args)
+        except Exception as e:
+            logger.error("Error backfilling interaction state %s: %s", key, e)
+
+    async def get_states(
+            self,
+            db: Session,
+            user_id: Optional[int],
+            ids: Iterable[int],
+            target: str = "post"
+    ) -> Dict[int, Dict[str, bool]]:
+        """Interaction state dict per id; all False for anonymous users"""
+        ids = list(ids)
+        if not user_id:
+            return {target_id: empty_state(target) for target_id in ids}
+        masks = await self.get_masks(db, user_id, ids, target)
+        return {target_id: _mask_to_state(masks.get(target_id, 0), target) for target_id in ids}
+
+    async def get_state(
+            self,
+            db: Session,
+            user_id: Optional[int],
+            target_id: int,
+            target: str = "post"
+    ) -> Dict[str, bool]:
+        states = await self.get_states(db, user_id, [target_id], target)
+        return states[target_id]
+
+    async def apply(
+            self,
+            user_id: int,
+            target_id: int,
+            added: Iterable[str] = (),
+            removed: Iterable[str] = (),
+            target: str = "post"
+    ) -> None:
+        """Record committed changes for one user/target"""
+        set_bits = 0
+        for name in added:
+            set_bits |= BITS.get(name, 0)
+        clear_bits = 0
+        for name in removed:
+            clear_bits |= BITS.get(name, 0)
+        if not set_bits and not clear_bits:
+            return
+
+        try:
+            if self._apply_script is None:
+                self._apply_script = self.cache.redis.register_script(_APPLY_SCRIPT)
+            await self._apply_script(
+                keys=[self._key(target, user_id)],
+                args=[str(target_id), set_bits, clear_bits, STATE_TTL_SECONDS, GENERATION_FIELD]
+            )
+        except Exception as e:
+            logger.error("Error updating interaction state for user %s: %s", user_id, e)
+            # Drop the field so the next read goes back to the database
+            await self.invalidate(user_id, target_id, target)
+
+    async def invalidate(self, user_id: int, target_id: int, target: str = "post") -> None:
+        """Forget one cached mask after a write that didn't go through apply"""
+        key = self._key(target, user_id)
+        try:
+            pipe = self.cache.redis.pipeline(transaction=True)
+            pipe.hdel(key, str(target_id))
+            pipe.hincrby(key, GENERATION_FIELD, 1)
+            pipe.expire(key, STATE_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("Error invalidating interaction state %s/%s: %s", key, target_id, e)
+
+
+# Singleton instance
+_interaction_state_store: Optional[InteractionStateStore] = None
+
+
+def get_interaction_state_store(cache: RedisCache) -> InteractionStateStore:
+    """Get or create InteractionStateStore instance"""
+    global _interaction_state_store
+    if _interaction_state_store is None:
+        _interaction_state_store = InteractionStateStore(cache)
+    return _interaction_state_store
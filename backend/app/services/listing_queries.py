@@ -0,0 +1,187 @@
+# app/services/listing_queries.py
+"""
+Column-projected queries for listing endpoints.
+
+Listings only render a handful of columns, so these select exactly those into
+small `__slots__` DTOs instead of loading Post/Comment entities with their
+JSON columns (edit_history, embedded_content, link_preview, video_metadata)
+into the session identity map.
+"""
+from typing import Iterable, List, Optional, Type, TypeVar
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Query, Session
+
+from app.datamodels.comment_datamodels import Comment
+from app.datamodels.post_datamodels import Post
+
+T = TypeVar("T", bound="_Projection")
+
+COUNT_COLUMNS = (
+    Post.like_count, Post.dislike_count, Post.save_count,
+    Post.share_count, Post.comment_count, Post.report_count,
+)
+
+
+class _Projection:
+    """Row DTO filled by attribute name from a projected query row"""
+    __slots__ = ()
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            setattr(self, name, getattr(row, name))
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def counts(self) -> dict:
+        return {
+            f"{name}_count": getattr(self, f"{name}_count", 0) or 0
+            for name in ("like", "dislike", "save", "share", "comment", "report")
+        }
+
+
+def rows_as(dto: Type[T], rows: Iterable) -> List[T]:
+    return [dto(row) for row in rows]
+
+
+def content_columns(max_chars: Optional[int] = None, prefer_summary: bool = False) -> tuple:
+    """
+    `content` and `content_truncated` columns for a post listing.
+
+    max_chars truncates in SQL so full bodies never leave the database;
+    prefer_summary shows the post summary (when set) instead of its content.
+    """
+    source = Post.content
+    if prefer_summary:
+        source = func.coalesce(func.nullif(Post.summary, ""), Post.content)
+    if not max_chars:
+        return source.label("content"), literal(False).label("content_truncated")
+    return (
+        func.left(source, max_chars).label("content"),
+        (func.char_length(source) > max_chars).label("content_truncated"),
+    )
+
+
+class FeedCard(_Projection):
+    """A post as rendered in GET /posts"""
+    __slots__ = (
+        "post_id", "user_id", "title", "content", "content_truncated",
+        "image_url", "images", "image_variants", "video_url",
+        "post_type_id", "category_id", "subcategory_id", "custom_subcategory",
+        "status", "created_at", "updated_at",
+        "like_count", "dislike_count", "save_count", "share_count", "comment_count", "report_count",
+    )
+
+
+class UserPostRow(_Projection):
+    """A post as rendered in the author's own post lists"""
+    __slots__ = (
+        "post_id", "title", "content", "content_truncated", "image_url",
+        "status", "created_at", "updated_at",
+        "like_count", "dislike_count", "save_count", "share_count", "comment_count", "report_count",
+    )
+
+
+class CommentRow(_Projection):
+    """Everything CommentResponse needs from a comment row"""
+    __slots__ = (
+        "comment_id", "user_id", "post_id", "content",
+        "parent_comment_id", "path", "depth", "root_comment_id",
+        "like_count", "dislike_count", "reply_count", "report_count",
+        "is_edited", "is_deleted", "created_at", "updated_at",
+        "last_activity", "active_viewers",
+    )
+
+
+def feed_card_query(db: Session, max_chars: Optional[int] = None, prefer_summary: bool = False) -> Query:
+    """Unfiltered feed projection; callers add filters, ordering and paging"""
+    content, truncated = content_columns(max_chars, prefer_summary)
+    return db.query(
+        Post.post_id, Post.user_id, Post.title, content, truncated,
+        Post.image_url, Post.images, Post.image_variants, Post.video_url,
+        Post.post_type_id, Post.category_id, Post.subcategory_id, Post.custom_subcategory,
+        Post.status, Post.created_at, Post.updated_at,
+        *COUNT_COLUMNS
+    )
+
+
+def user_post_rows(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        max_chars: Optional[int] = None
+) -> List[UserPostRow]:
+    """A user's active posts, newest first"""
+    content, truncated = content_columns(max_chars)
+    query = (
+        db.query(
+            Post.post_id, Post.title, content, truncated, Post.image_url,
+            Post.status, Post.created_at, Post.updated_at,
+            *COUNT_COLUMNS
+        )
+        .filter(Post.user_id == user_id, Post.status == 'active')
+        .order_by(Post.created_at.desc())
+        .offset(skip)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return rows_as(UserPostRow, query.all())
+
+
+def comment_query(db: Session) -> Query:
+    return db.query(*(getattr(Comment, name) for name in CommentRow.__slots__))
+
+
+def user_comment_rows(db: Session, user_id: int, skip: int = 0, limit: int = 20) -> List[CommentRow]:
+    """A user's comments, newest first"""
+    rows = (
+        comment_query(db)
+        .filter(Comment.user_id == user_id)
+        .order_by(Comment.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return rows_as(CommentRow, rows)
+
+
+def comment_rows_by_ids(db: Session, comment_ids: Iterable[int]) -> List[CommentRow]:
+    return rows_as(CommentRow, comment_query(db).filter(Comment.comment_id.in_(list(comment_ids))).all())
+
+
+def reply_rows(db: Session, parent_comment_ids: Iterable[int]) -> List[CommentRow]:
+    """Direct replies to any of these comments, oldest first"""
+    rows = (
+        comment_query(db)
+        .filter(Comment.parent_comment_id.in_(list(parent_comment_ids)))
+        .order_by(Comment.created_at.asc())
+        .all()
+    )
+    return rows_as(CommentRow, rows)
+
+
+def comment_thread_rows(
+        db: Session,
+        post_id: int,
+        parent: Optional[CommentRow] = None,
+        skip: int = 0,
+        limit: int = 20
+) -> List[CommentRow]:
+    """
+    One page of a post's top-level comments (newest first), or of everything
+    below `parent` (oldest first), as CommentService.get_comment_thread pages
+    """
+    query = comment_query(db)
+    if parent is not None:
+        query = (
+            query.filter(Comment.path.like(f"{parent.path}.{parent.comment_id}%"))
+            .order_by(Comment.created_at.asc())
+        )
+    else:
+        query = (
+            query.filter(Comment.post_id == post_id, Comment.parent_comment_id.is_(None))
+            .order_by(Comment.created_at.desc())
+        )
+    return rows_as(CommentRow, query.offset(skip).limit(limit).all())
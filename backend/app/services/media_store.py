@@ -0,0 +1,247 @@
+# app/services/media_store.py
+"""
+Content-addressed media store.
+
+Uploads live at MEDIA_BLOB_DIR/ab/cd/<sha256>.<ext> (served as
+/media/blobs/ab/cd/...), with their size variants next to them as
+<sha256>-<variant>.<ext>, so re-uploading the same image stores nothing new.
+
+media_blobs keeps a reference count per blob, maintained when posts and
+avatars are written; `python -m app.cli media-gc` recounts references from
+Post.image_url / Post.images / UserProfile.avatar_img and deletes blobs that
+have stayed unreferenced past the grace period.
+
+Deleting a blob's files and starting to reference it are serialized per
+hash: the GC holds the media_blobs row lock (or, for files without a row,
+a transaction advisory lock) until the files are unlinked, and
+record_references takes the same advisory lock and then checks that the
+file is still there.
+"""
+import glob
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.datamodels.media_datamodels import MediaBlob
+from app.datamodels.post_datamodels import Post
+from app.datamodels.user_datamodels import UserProfile
+from app.services.image_service import store_image_with_variants
+from app.services.upload_service import StoredUpload
+
+logger = get_logger(__name__)
+
+BLOB_URL_PREFIX = "/media/blobs"
+# First key of the per-blob pg_advisory_xact_lock(key, hashtext(sha256))
+BLOB_LOCK_NAMESPACE = 4711
+_BLOB_URL = re.compile(r"^/media/blobs/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(?:-\w+)?\.\w+$")
+_BLOB_FILE = re.compile(r"^([0-9a-f]{64})(?:-\w+)?\.\w+$")
+
+
+def sha_from_url(url: Optional[str]) -> Optional[str]:
+    """Blob hash behind a media URL (original or variant), None for other URLs"""
+    if not url:
+        return None
+    match = _BLOB_URL.match(url)
+    return match.group(1) if match else None
+
+
+def path_for_url(url: Optional[str]) -> Optional[str]:
+    """Filesystem path of a /media/blobs URL"""
+    if not sha_from_url(url):
+        return None
+    return os.path.join(settings.MEDIA_BLOB_DIR, *url[len(BLOB_URL_PREFIX) + 1:].split("/"))
+
+
+def blob_files(sha256: str) -> List[str]:
+    """The original and every variant stored for a blob"""
+    directory = os.path.join(settings.MEDIA_BLOB_DIR, sha256[:2], sha256[2:4])
+    return glob.glob(os.path.join(directory, f"{sha256}.*")) + glob.glob(os.path.join(directory, f"{sha256}-*"))
+
+
+def post_media_urls(image_url: Optional[str], images: Optional[list]) -> List[str]:
+    urls = list(images or [])
+    if image_url and image_url not in urls:
+        urls.append(image_url)
+    return urls
+
+
+def _lock_blob(db: Session, sha256: str) -> None:
+    """Serialize with media GC for this hash until the transaction ends"""
+    db.execute(select(func.pg_advisory_xact_lock(BLOB_LOCK_NAMESPACE, func.hashtext(sha256))))
+
+
+async def store_media(file: UploadFile, kind: str) -> Tuple[StoredUpload, Dict[str, dict]]:
+    """Store an image upload (and its `kind` variants) in the blob store"""
+    return await store_image_with_variants(file, settings.MEDIA_BLOB_DIR, BLOB_URL_PREFIX, kind, shard=True)
+
+
+def record_references(
+        db: Session,
+        kind: str,
+        added: Iterable[StoredUpload] = (),
+        removed_urls: Iterable[str] = ()
+) -> None:
+    """
+    Adjust reference counts in the caller's transaction.
+
+    Call before committing the row that starts or stops referencing the
+    blobs so counts and references change atomically. Raises 409 if a blob
+    was garbage collected after the upload reused it.
+    """
+    for stored in added:
+        _lock_blob(db, stored.sha256)
+        statement = insert(MediaBlob).values(
+            sha256=stored.sha256,
+            extension=stored.extension,
+            size=stored.size,
+            kind=kind,
+            ref_count=1
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[MediaBlob.sha256],
+            set_={"ref_count": MediaBlob.ref_count + 1, "updated_at": func.now()}
+        ))
+        # The upsert waited for any GC holding this row; the files must have
+        # survived it
+        if not os.path.exists(stored.path):
+            raise HTTPException(status_code=409, detail="Uploaded file was removed, please upload it again")
+
+    removed = Counter(sha for sha in map(sha_from_url, removed_urls) if sha)
+    for sha256, count in removed.items():
+        db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).update(
+            {
+                MediaBlob.ref_count: func.greatest(MediaBlob.ref_count - count, 0),
+                MediaBlob.updated_at: func.now()
+            },
+            synchronize_session=False
+        )
+
+
+def _count_references(db: Session, batch_size: int) -> Counter:
+    counts: Counter = Counter()
+    for image_url, images in db.query(Post.image_url, Post.images).yield_per(batch_size):
+        for sha256 in {sha_from_url(url) for url in post_media_urls(image_url, images)}:
+            if sha256:
+                counts[sha256] += 1
+    for avatar_img, in db.query(UserProfile.avatar_img).yield_per(batch_size):
+        sha256 = sha_from_url(avatar_img)
+        if sha256:
+            counts[sha256] += 1
+    return counts
+
+
+def _remove_files(paths: Iterable[str], dry_run: bool) -> int:
+    removed = 0
+    for path in paths:
+        if dry_run:
+            logger.info("[dry run] would remove %s", path)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+        removed += 1
+    return removed
+
+
+def _is_stale(path: str, cutoff_ts: float) -> bool:
+    try:
+        return os.path.getmtime(path) < cutoff_ts
+    except FileNotFoundError:
+        return False
+
+
+def collect_garbage(
+        db: Session,
+        grace_hours: Optional[int] = None,
+        dry_run: bool = False,
+        batch_size: int = 1000
+) -> Dict[str, int]:
+    """
+    Recount references and delete blobs unreferenced for longer than the
+    grace period, plus files on disk that never got a media_blobs row
+    (uploads whose request failed) once they are older than the grace period.
+    """
+    grace_hours = settings.MEDIA_GC_GRACE_HOURS if grace_hours is None else grace_hours
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=grace_hours)
+    stats = {"recounted": 0, "blobs_deleted": 0, "orphans_deleted": 0, "files_deleted": 0}
+
+    # 1) Reconcile stored counts with actual references
+    counts = _count_references(db, batch_size)
+    corrections = []
+    known = set()
+    for sha256, ref_count in db.query(MediaBlob.sha256, MediaBlob.ref_count).yield_per(batch_size):
+        known.add(sha256)
+        actual = counts.get(sha256, 0)
+        if actual != ref_count:
+            corrections.append({"sha256": sha256, "ref_count": actual, "updated_at": now})
+    stats["recounted"] = len(corrections)
+    if corrections and not dry_run:
+        db.bulk_update_mappings(MediaBlob, corrections)
+        db.commit()
+
+    # 2) Blobs that have been unreferenced past the grace period
+    expired = [
+        sha256 for sha256, in db.query(MediaBlob.sha256)
+        .filter(MediaBlob.ref_count == 0, MediaBlob.updated_at < cutoff)
+        .all()
+    ]
+    for start in range(0, len(expired), batch_size):
+        batch = expired[start:start + batch_size]
+        if not dry_run:
+            # Lock the rows that are still unreferenced and keep the locks
+            # until their files are unlinked. An upload of the same content
+            # blocks on its upsert meanwhile, then finds the files gone.
+            batch = [
+                sha256 for sha256, in db.query(MediaBlob.sha256)
+                .filter(MediaBlob.sha256.in_(batch), MediaBlob.ref_count == 0, MediaBlob.updated_at < cutoff)
+                .with_for_update(skip_locked=True)
+                .all()
+            ]
+            if batch:
+                db.query(MediaBlob).filter(MediaBlob.sha256.in_(batch)).delete(synchronize_session=False)
+        for sha256 in batch:
+            stats["files_deleted"] += _remove_files(blob_files(sha256), dry_run)
+        if not dry_run:
+            db.commit()
+        stats["blobs_deleted"] += len(batch)
+
+    # 3) Files without a row (and stale temp files) older than the grace period
+    cutoff_ts = time.time() - grace_hours * 3600
+    for directory, _, filenames in os.walk(settings.MEDIA_BLOB_DIR):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            match = _BLOB_FILE.match(filename)
+            is_temp = filename.startswith(".upload-")
+            if (match and match.group(1) in known) or not (match or is_temp):
+                continue
+            if not _is_stale(path, cutoff_ts):
+                continue
+            if match and not dry_run:
+                # `known` is from the start of the run: re-check under the
+                # lock record_references takes, so an upload that reused this
+                # file either already has its row or waits and sees it gone
+                _lock_blob(db, match.group(1))
+                if db.query(MediaBlob.sha256).filter(MediaBlob.sha256 == match.group(1)).first() \
+                        or not _is_stale(path, cutoff_ts):
+                    db.rollback()
+                    continue
+            removed = _remove_files([path], dry_run)
+            if match and not dry_run:
+                db.commit()
+            if removed:
+                stats["orphans_deleted"] += 1
+
+    logger.info("Media GC %sfinished: %s", '(dry run) ' if dry_run else '', stats)
+    return stats
@@ -0,0 +1,104 @@
+# app/services/post_body_cache.py
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from app.RedisCache import RedisCache
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def dump_json(value: Any) -> bytes:
+    """orjson with the options used for every cached body (datetimes as ISO 8601)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def splice_json(body: bytes, fields: Dict[str, Any]) -> bytes:
+    """Append fields to a serialized JSON object without decoding it"""
+    if not fields:
+        return body
+    extra = dump_json(fields)
+    if body == b"{}":
+        return extra
+    return body[:-1] + b"," + extra[1:]
+
+
+def post_version(post) -> str:
+    """Content version of a post: its last edit, or creation for unedited posts"""
+    stamp = post.updated_at or post.created_at
+    return stamp.isoformat() if stamp else "0"
+
+
+class PostBodyCache:
+    """
+    Viewer-independent part of GET /posts/{post_id}, pre-serialized with orjson.
+
+    Stored as a Redis hash `post:{post_id}:body` with a version next to the
+    bytes: the post's content version plus its author's profile version, as
+    the body embeds the author card. Readers compare it with the current
+    version before using the bytes. Counts, engagement metrics and the
+    viewer's interaction state are spliced in per request. Each author has an
+    index set of cached bodies so a profile change can also drop them eagerly.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.expiry = settings.POST_BODY_CACHE_SECONDS
+
+    def _key(self, post_id: int) -> str:
+        return f"post:{post_id}:body"
+
+    def _author_key(self, user_id: int) -> str:
+        return f"post_bodies:user:{user_id}"
+
+    async def get(self, post_id: int) -> Optional[Tuple[str, bytes]]:
+        """(version, body) if cached"""
+        try:
+            version, body = await self.cache.redis.hmget(self._key(post_id), ["version", "body"])
+            if body is None:
+                return None
+            return version, body.encode()
+        except Exception as e:
+            logger.error("Error reading cached body for post %s: %s", post_id, e)
+            return None
+
+    async def set(self, post_id: int, author_id: Optional[int], version: str, body: bytes) -> None:
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            pipe.hset(self._key(post_id), mapping={"version": version, "body": body})
+            pipe.expire(self._key(post_id), self.expiry)
+            if author_id is not None:
+                pipe.sadd(self._author_key(author_id), post_id)
+                pipe.expire(self._author_key(author_id), self.expiry)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("Error caching body for post %s: %s", post_id, e)
+
+    async def invalidate(self, post_id: int) -> None:
+        try:
+            await self.cache.redis.delete(self._key(post_id))
+        except Exception as e:
+            logger.error("Error invalidating body for post %s: %s", post_id, e)
+
+    async def invalidate_author(self, user_id: int) -> None:
+        """Drop every cached body by this author (profile fields are embedded)"""
+        try:
+            post_ids = await self.cache.redis.smembers(self._author_key(user_id))
+            keys = [self._key(int(post_id)) for post_id in post_ids]
+            await self.cache.redis.delete(self._author_key(user_id), *keys)
+        except Exception as e:
+            logger.error("Error invalidating bodies for user %s: %s", user_id, e)
+
+
+# Singleton instance
+_post_body_cache: Optional[PostBodyCache] = None
+
+
+def get_post_body_cache(cache: RedisCache) -> PostBodyCache:
+    """Get or create PostBodyCache instance"""
+    global _post_body_cache
+    if _post_body_cache is None:
+        _post_body_cache = PostBodyCache(cache)
+    return _post_body_cache
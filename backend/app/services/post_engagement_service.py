@@ -1,13 +1,14 @@
 # app/services/post_engagement_service.py
 import asyncio
+import json
 
-from fastapi import BackgroundTasks, HTTPException
-from sqlalchemy import and_, update, select, func
+from fastapi import BackgroundTasks
+from sqlalchemy import and_, update, select, func, text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from typing import Dict, Any, List, Optional
 #import logging
-from app.core.logger import get_logger, log_execution_time
+from app.core.logger import get_logger, log_execution_time, log_sampled
 from app.RedisCache import RedisCache, get_cache
 from app.core.config import settings
 from app.core.exceptions import (
@@ -17,8 +18,12 @@ from app.core.exceptions import (
     CacheError
 )
 from app.core.metrics import get_metrics_collector
+from app.services.trending_service import get_trending_service
+from app.services.interaction_batcher import get_interaction_batcher
+from app.services.interaction_state import get_interaction_state_store
 from app.datamodels.post_datamodels import Post
-from app.datamodels.interaction_datamodels import PostInteraction, InteractionType
+from app.datamodels.interaction_datamodels import PostInteraction
+from app.core.interaction_types import get_interaction_types, InteractionTypeInfo
 from app.schemas.post_schemas import PostMetricsUpdate
 from database.database import SessionLocal
 from app.datamodels.user_datamodels import User
@@ -36,6 +41,8 @@ class PostEngagementService:
         self.db = db
         self.cache = cache
         self.metrics = get_metrics_collector(cache)
+        self.trending = get_trending_service(cache)
+        self.state_store = get_interaction_state_store(cache)
         self.cache_expiry = settings.CACHE_EXPIRY_SECONDS
 
     async def _get_cached_counts(self, post_id: int) -> Optional[Dict[str, int]]:
@@ -68,18 +75,14 @@ class PostEngagementService:
         """Get interaction counts with caching"""
         try:
             # Get counts from database
-            counts = {}
-            for interaction_type in self.VALID_INTERACTIONS:
-                count = (
-                    self.db.query(PostInteraction)
-                    .join(InteractionType)
-                    .filter(
-                        PostInteraction.post_id == post_id,
-                        InteractionType.interaction_type_name == interaction_type
-                    )
-                    .count()
-                )
-                counts[f"{interaction_type}_count"] = count
+            types = get_interaction_types()
+            rows = (
+                self.db.query(PostInteraction.interaction_type_id, func.count(PostInteraction.interaction_id))
+                .filter(PostInteraction.post_id == post_id)
+                .group_by(PostInteraction.interaction_type_id)
+                .all()
+            )
+            counts = {f"{types.name(type_id)}_count": count for type_id, count in rows if types.name(type_id)}
 
             # Ensure all counts are initialized
             for interaction_type in self.VALID_INTERACTIONS:
@@ -99,16 +102,12 @@ class PostEngagementService:
             raise PostNotFoundError(post_id)
         return post
 
-    async def _get_interaction_type(self, interaction_type: str) -> InteractionType:
-        """Get interaction type record"""
+    async def _get_interaction_type(self, interaction_type: str) -> InteractionTypeInfo:
+        """Get interaction type from the in-memory registry"""
         if interaction_type not in self.VALID_INTERACTIONS:
             raise InvalidInteractionTypeError(interaction_type)
 
-        interaction_type_record = (
-            self.db.query(InteractionType)
-            .filter(InteractionType.interaction_type_name == interaction_type)
-            .first()
-        )
+        interaction_type_record = get_interaction_types().by_name.get(interaction_type)
 
         if not interaction_type_record:
             raise DatabaseError("retrieving interaction type")
@@ -144,18 +143,16 @@ class PostEngagementService:
 
     async def verify_interaction_counts(self, post_id: int) -> Dict[str, int]:
         """Verify and fix interaction counts for a post"""
-        logger.info(f"Verifying counts for post {post_id}")
-
         try:
             # First get counts from cache
             cache_key = f"post:{post_id}:counts"
             cached_counts = await self.cache.get(cache_key)
 
             if cached_counts:
-                logger.info(f"Found cached counts for post {post_id}: {cached_counts}")
+                log_sampled(logger, "Cached counts for post %s: %s", post_id, cached_counts)
                 return cached_counts
 
-            logger.info(f"CACHE MISS for post {post_id}, querying database")
+            logger.debug("Count cache miss for post %s, querying database", post_id)
 
             #if cached_counts:
                 #logger.info(f"Found cached counts for post {post_id}: {cached_counts}")
@@ -170,18 +167,19 @@ class PostEngagementService:
             # If no cache, get actual counts with a read-only query first
             actual_counts = (
                 self.db.query(
-                    InteractionType.interaction_type_name,
+                    PostInteraction.interaction_type_id,
                     func.count(PostInteraction.interaction_id).label('count')
                 )
-                .join(PostInteraction, PostInteraction.interaction_type_id == InteractionType.interaction_type_id)
                 .filter(PostInteraction.post_id == post_id)
-                .group_by(InteractionType.interaction_type_name)
+                .group_by(PostInteraction.interaction_type_id)
                 .all()
             )
 
             # Convert to dictionary and ensure all counts exist
+            types = get_interaction_types()
             count_dict = {
-                f"{name}_count": count for name, count in actual_counts
+                f"{types.name(type_id)}_count": count
+                for type_id, count in actual_counts if types.name(type_id)
             }
 
             # Ensure all interaction types have counts
@@ -208,7 +206,7 @@ class PostEngagementService:
             )
 
             if needs_update:
-                logger.info(f"Updating mismatched counts for post {post_id}")
+                logger.info("Updating mismatched counts for post %s", post_id)
                 try:
                     # Check if a transaction is already in progress
                     if self.db.in_transaction():
@@ -223,7 +221,7 @@ class PostEngagementService:
 
                     # Commit changes
                     self.db.commit()
-                    logger.info(f"Updated counts in database for post {post_id}")
+                    logger.debug("Updated counts in database for post %s", post_id)
                 except SQLAlchemyError as e:
                     if self.db.in_transaction():
                         self.db.rollback()
@@ -236,7 +234,7 @@ class PostEngagementService:
                 count_dict,
                 expire=self.cache_expiry
             )
-            logger.info(f"Updated cache for post {post_id} with counts: {count_dict}")
+            logger.debug("Updated cache for post %s with counts: %s", post_id, count_dict)
 
             return count_dict
 
@@ -283,17 +281,17 @@ class PostEngagementService:
             # Get actual counts
             actual_counts = (
                 self.db.query(
-                    InteractionType.interaction_type_name,
+                    PostInteraction.interaction_type_id,
                     func.count(PostInteraction.interaction_id).label('count')
                 )
-                .join(PostInteraction)
                 .filter(PostInteraction.post_id == post_id)
-                .group_by(InteractionType.interaction_type_name)
+                .group_by(PostInteraction.interaction_type_id)
                 .all()
             )
 
             # Convert to dict and ensure all counts exist
-            count_dict = {name: count for name, count in actual_counts}
+            types = get_interaction_types()
+            count_dict = {types.name(type_id): count for type_id, count in actual_counts if types.name(type_id)}
             for interaction_type in self.VALID_INTERACTIONS:
                 if interaction_type not in count_dict:
                     count_dict[interaction_type] = 0
@@ -306,13 +304,13 @@ class PostEngagementService:
                 stored_count = getattr(post, count_field, 0) or 0
 
                 if stored_count != actual_count:
-                    logger.info(f"Fixing {count_field} for post {post_id}: {stored_count} -> {actual_count}")
+                    logger.info("Fixing %s for post %s: %s -> %s", count_field, post_id, stored_count, actual_count)
                     setattr(post, count_field, actual_count)
                     updated = True
 
             if updated:
                 self.db.commit()
-                logger.info(f"✅ Updated counts for post {post_id}")
+                logger.debug("✅ Updated counts for post %s", post_id)
 
             return {f"{k}_count": getattr(post, f"{k}_count", 0) for k in self.VALID_INTERACTIONS}
 
@@ -325,9 +323,7 @@ class PostEngagementService:
         try:
             self.db.begin()
             # Get save interaction type
-            save_type = self.db.query(InteractionType).filter(
-                InteractionType.interaction_type_name == "save"
-            ).first()
+            save_type = get_interaction_types().by_name.get("save")
 
             if not save_type:
                 return
@@ -353,7 +349,7 @@ class PostEngagementService:
             if existing_interaction and not is_saved:
                 # Add to saved_posts
                 user.saved_posts.append(post)
-                logger.info(f"Reconciled: Added post {post_id} to user {user_id}'s saved_posts")
+                logger.debug("Reconciled: Added post %s to user %s's saved_posts", post_id, user_id)
                 self.db.commit()
             elif is_saved and not existing_interaction:
                 # Add interaction
@@ -364,19 +360,13 @@ class PostEngagementService:
                     target_type="POST"
                 )
                 self.db.add(new_interaction)
-                logger.info(f"Reconciled: Added save interaction for post {post_id}, user {user_id}")
+                logger.debug("Reconciled: Added save interaction for post %s, user %s", post_id, user_id)
                 self.db.commit()
+                await self.state_store.apply(user_id, post_id, added=["save"])
         except Exception as e:
             logger.error(f"Error in reconcile_saved_post: {str(e)}")
             self.db.rollback()
 
-    # TODO OPTIMIZE toggle_interaction BY USING get_or_create
-    # existing = db.query(PostInteraction).filter(
-    #    PostInteraction.post_id == post_id,
-    #    PostInteraction.user_id == user_id,
-    #    PostInteraction.interaction_type_id == interaction_type_record.interaction_type_id
-    # ).first()
-
     # Enhanced toggle_interaction method with detailed logging
     # TODO CREATE A SEPARETE METHOD FOR COMMENTS
     async def toggle_interaction(
@@ -387,295 +377,146 @@ class PostEngagementService:
             background_tasks: BackgroundTasks,
             metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Toggle a post interaction with improved persistence"""
-        try:
-            logger.info(f"🔍 Starting interaction toggle - Type: {interaction_type}, Post: {post_id}, User: {user_id}")
-
-            # Get interaction type record without locking
-            interaction_type_record = await self._get_interaction_type(interaction_type)
-            count_field = f"{interaction_type}_count"
-
-            # Special handling for save operations which are more prone to transaction conflicts
-            if interaction_type == "save":
-                # Use a completely fresh session for save operations
-                new_db = SessionLocal()
-                try:
-                    # Create a new service instance with the fresh session
-                    cache = get_cache()
-                    fresh_service = PostEngagementService(new_db, cache)
-
-                    # Use special _toggle_save_interaction method that doesn't rely on existing transactions
-                    return await fresh_service._toggle_save_interaction(
-                        post_id=post_id,
-                        user_id=user_id,
-                        interaction_type_record=interaction_type_record,
-                        count_field=count_field,
-                        background_tasks=background_tasks,
-                        metadata=metadata
-                    )
-                finally:
-                    # Always close the fresh session
-                    new_db.close()
-
-            # For non-save interactions, use the original code
-            # Check if there's an active transaction and roll it back if so
-            if self.db.in_transaction():
-                logger.info(f"Rolling back existing transaction before starting new one")
-                self.db.rollback()
-
-            # Start a new transaction explicitly
-            self.db.begin()
-
-            try:
-                # Get post with short-term lock
-                post = (
-                    self.db.query(Post)
-                    .filter(Post.post_id == post_id)
-                    .with_for_update(skip_locked=True)
-                    .first()
-                )
-
-                if not post:
-                    self.db.rollback()
-                    raise PostNotFoundError(post_id)
-
-                # No need to get user for non-save interactions
-                user = None
-
-                # Check for existing interaction
-                existing = (
-                    self.db.query(PostInteraction)
-                    .filter(
-                        PostInteraction.post_id == post_id,
-                        PostInteraction.user_id == user_id,
-                        PostInteraction.interaction_type_id == interaction_type_record.interaction_type_id
-                    )
-                    .first()
-                )
-
-                current_count = getattr(post, count_field, 0) or 0
-
-                if existing:
-                    # Remove interaction
-                    self.db.delete(existing)
-                    new_count = max(0, current_count - 1)
-                    setattr(post, count_field, new_count)
-                    action = "removed"
-                    is_active = False
-                else:
-                    # Add interaction
-                    new_interaction = PostInteraction(
-                        post_id=post_id,
-                        user_id=user_id,
-                        interaction_type_id=interaction_type_record.interaction_type_id,
-                        target_type="POST",
-                        interaction_metadata=metadata
-                    )
-                    self.db.add(new_interaction)
-
-                    new_count = current_count + 1
-                    setattr(post, count_field, new_count)
-                    action = "added"
-                    is_active = True
-
-                # Handle mutual exclusivity
-                if interaction_type == "like" and action == "added":
-                    dislike = (
-                        self.db.query(PostInteraction)
-                        .join(InteractionType)
-                        .filter(
-                            PostInteraction.post_id == post_id,
-                            PostInteraction.user_id == user_id,
-                            InteractionType.interaction_type_name == "dislike"
-                        )
-                        .first()
-                    )
-                    if dislike:
-                        self.db.delete(dislike)
-                        post.dislike_count = max(0, post.dislike_count - 1)
-
-                elif interaction_type == "dislike" and action == "added":
-                    like = (
-                        self.db.query(PostInteraction)
-                        .join(InteractionType)
-                        .filter(
-                            PostInteraction.post_id == post_id,
-                            PostInteraction.user_id == user_id,
-                            InteractionType.interaction_type_name == "like"
-                        )
-                        .first()
-                    )
-                    if like:
-                        self.db.delete(like)
-                        post.like_count = max(0, post.like_count - 1)
-
-                # Commit changes
-                self.db.commit()
-
-                # Invalidate and update cache
-                cache_key = f"post:{post_id}:counts"
-                await self.cache.delete(cache_key)
-
-                # Get fresh counts after commit
-                fresh_counts = await self._get_interaction_counts(post_id)
-
-                # Update cache with verified counts
-                await self.cache.set(
-                    cache_key,
-                    fresh_counts,
-                    expire=self.cache_expiry
-                )
-
-                # Record metric in background
-                background_tasks.add_task(
-                    self.metrics.record_interaction,
-                    post_id,
-                    user_id,
-                    interaction_type,
-                    action,
-                    metadata
-                )
+        """
+        Toggle a post interaction.
 
-                result = {
-                    "message": f"{interaction_type} {action} successfully",
-                    f"{interaction_type}_count": new_count,
-                    interaction_type: is_active,  # Return boolean value for frontend
-                    "metrics": fresh_counts  # Always include complete metrics
-                }
+        Saves go through toggle_save. Everything else is handed to the per-post
+        InteractionBatcher, which applies concurrent toggles on the same post as
+        one transaction and records metrics/trending once it has committed.
+        """
+        if (interaction_type not in self.VALID_INTERACTIONS
+                or not get_interaction_types().allows(interaction_type, "POST")):
+            raise InvalidInteractionTypeError(interaction_type)
 
-                return result
+        log_sampled(logger, "Interaction toggle %s on post %s by user %s", interaction_type, post_id, user_id)
 
-            except SQLAlchemyError as e:
-                if self.db.in_transaction():
-                    self.db.rollback()
-                logger.error(f"Database error in toggle_interaction: {str(e)}")
-                raise DatabaseError(f"Error processing {interaction_type}: {str(e)}")
-            except Exception as e:
-                if self.db.in_transaction():
-                    self.db.rollback()
-                logger.error(f"Unexpected error in toggle_interaction: {str(e)}")
-                raise DatabaseError(f"Error processing {interaction_type}: {str(e)}")
+        # Saves touch saved_posts as well; handled set-based in toggle_save
+        if interaction_type == "save":
+            return await self.toggle_save(post_id, user_id, background_tasks, metadata)
 
+        try:
+            return await get_interaction_batcher(self.cache).submit(
+                post_id, user_id, interaction_type, metadata
+            )
+        except (PostNotFoundError, DatabaseError, InvalidInteractionTypeError):
+            raise
         except Exception as e:
             logger.error(f"❌ Error in toggle_interaction: {str(e)}")
             raise DatabaseError(f"Error processing {interaction_type}: {str(e)}")
 
-    async def _toggle_save_interaction(
+    async def toggle_save(
             self,
             post_id: int,
             user_id: int,
-            interaction_type_record: InteractionType,
-            count_field: str,
             background_tasks: BackgroundTasks,
             metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Special handler for save interactions to prevent transaction conflicts"""
-        logger.info(f"Using special save handler for post {post_id}, user {user_id}")
+        """
+        Save or unsave a post in one short transaction on the shared session.
+
+        DELETE ... RETURNING on post_interactions and saved_posts decides the
+        direction: if anything was deleted the post was saved. Otherwise both
+        rows are inserted with ON CONFLICT DO NOTHING RETURNING, so double
+        clicks stay idempotent. save_count moves by the number of
+        post_interactions rows actually changed.
+        """
+        save_type = await self._get_interaction_type("save")
+        params = {
+            "post_id": post_id,
+            "user_id": user_id,
+            "type_id": save_type.interaction_type_id,
+            "metadata": json.dumps(metadata) if metadata else None
+        }
 
-        # Make sure we're not already in a transaction
         if self.db.in_transaction():
-            logger.info(f"Rolling back existing transaction before save operation")
             self.db.rollback()
 
         try:
-            # Get post without locking first to verify it exists
-            post = self.db.query(Post).filter(Post.post_id == post_id).first()
-            if not post:
-                raise PostNotFoundError(post_id)
-
-            # Get user
-            user = self.db.query(User).filter(User.user_id == user_id).first()
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
-
-            # Start transaction
-            self.db.begin()
-
-            # Now get with lock
-            post = self.db.query(Post).filter(Post.post_id == post_id).with_for_update().first()
-
-            # Check for existing interaction
-            existing = self.db.query(PostInteraction).filter(
-                PostInteraction.post_id == post_id,
-                PostInteraction.user_id == user_id,
-                PostInteraction.interaction_type_id == interaction_type_record.interaction_type_id
-            ).first()
-
-            # Check if post is in saved_posts
-            is_in_saved_posts = False
-            for saved_post in user.saved_posts:
-                if saved_post.post_id == post_id:
-                    is_in_saved_posts = True
-                    break
-
-            logger.info(f"Save state: existing={existing is not None}, in_saved_posts={is_in_saved_posts}")
-
-            # Get current count
-            current_count = getattr(post, count_field, 0) or 0
-
-            if existing or is_in_saved_posts:
-                # REMOVE save
-                if existing:
-                    self.db.delete(existing)
-
-                if is_in_saved_posts:
-                    for saved_post in list(user.saved_posts):
-                        if saved_post.post_id == post_id:
-                            user.saved_posts.remove(saved_post)
-                            break
-
-                # Update count
-                new_count = max(0, current_count - 1)
-                setattr(post, count_field, new_count)
+            removed_interactions, removed_saved = self.db.execute(text("""
+                WITH del_pi AS (
+                    DELETE FROM post_interactions
+                    WHERE post_id = :post_id AND user_id = :user_id AND interaction_type_id = :type_id
+                    RETURNING 1
+                ), del_sp AS (
+                    DELETE FROM saved_posts
+                    WHERE post_id = :post_id AND user_id = :user_id
+                    RETURNING 1
+                )
+                SELECT (SELECT COUNT(*) FROM del_pi), (SELECT COUNT(*) FROM del_sp)
+            """), params).one()
 
+            if removed_interactions or removed_saved:
                 action = "removed"
                 is_active = False
+                delta = -removed_interactions
             else:
-                # ADD save
-                new_interaction = PostInteraction(
-                    post_id=post_id,
-                    user_id=user_id,
-                    interaction_type_id=interaction_type_record.interaction_type_id,
-                    target_type="POST",
-                    interaction_metadata=metadata
-                )
-                self.db.add(new_interaction)
-
-                user.saved_posts.append(post)
-
-                # Update count
-                new_count = current_count + 1
-                setattr(post, count_field, new_count)
-
+                added_interactions, added_saved = self.db.execute(text("""
+                    WITH target AS (
+                        SELECT post_id FROM posts WHERE post_id = :post_id
+                    ), ins_pi AS (
+                        INSERT INTO post_interactions
+                            (post_id, user_id, interaction_type_id, target_type, interaction_metadata)
+                        SELECT post_id, :user_id, :type_id, 'POST', CAST(:metadata AS JSON) FROM target
+                        ON CONFLICT (post_id, user_id, interaction_type_id) DO NOTHING
+                        RETURNING 1
+                    ), ins_sp AS (
+                        INSERT INTO saved_posts (user_id, post_id)
+                        SELECT :user_id, post_id FROM target
+                        ON CONFLICT (user_id, post_id) DO NOTHING
+                        RETURNING 1
+                    )
+                    SELECT (SELECT COUNT(*) FROM ins_pi), (SELECT COUNT(*) FROM ins_sp)
+                """), params).one()
                 action = "added"
                 is_active = True
+                delta = added_interactions
+
+            if delta:
+                row = self.db.execute(text("""
+                    UPDATE posts SET save_count = GREATEST(0, COALESCE(save_count, 0) + :delta)
+                    WHERE post_id = :post_id
+                    RETURNING category_id, like_count, dislike_count, save_count,
+                              share_count, comment_count, report_count
+                """), {"post_id": post_id, "delta": delta}).first()
+            else:
+                row = self.db.execute(text("""
+                    SELECT category_id, like_count, dislike_count, save_count,
+                           share_count, comment_count, report_count
+                    FROM posts WHERE post_id = :post_id
+                """), {"post_id": post_id}).first()
 
-            # Commit changes
-            self.db.commit()
-            logger.info(f"Save {action} successful")
+            if row is None:
+                self.db.rollback()
+                raise PostNotFoundError(post_id)
 
-            # Update cache
-            cache_key = f"post:{post_id}:counts"
-            await self.cache.delete(cache_key)
+            self.db.commit()
 
-            # Get fresh counts (using the new session)
-            fresh_counts = {}
-            for interaction_name in self.VALID_INTERACTIONS:
-                count_key = f"{interaction_name}_count"
-                actual_count = self.db.query(PostInteraction).join(InteractionType).filter(
-                    PostInteraction.post_id == post_id,
-                    InteractionType.interaction_type_name == interaction_name
-                ).count()
-                fresh_counts[count_key] = actual_count
-
-            # Update cache with verified counts
-            await self.cache.set(
-                cache_key,
-                fresh_counts,
-                expire=self.cache_expiry
-            )
+        except PostNotFoundError:
+            raise
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("Database error in toggle_save: %s", e)
+            raise DatabaseError(f"Error processing save: {str(e)}")
 
-            # Record metric in background
+        category_id = row[0]
+        fresh_counts = {
+            "like_count": row[1] or 0,
+            "dislike_count": row[2] or 0,
+            "save_count": row[3] or 0,
+            "share_count": row[4] or 0,
+            "comment_count": row[5] or 0,
+            "report_count": row[6] or 0
+        }
+        logger.debug("Save %s for post %s, user %s, new count: %s", action, post_id, user_id, fresh_counts["save_count"])
+
+        # Overwrite rather than delete so the next read doesn't recount
+        await self.cache.set(f"post:{post_id}:counts", fresh_counts, expire=self.cache_expiry)
+        if is_active:
+            await self.state_store.apply(user_id, post_id, added=["save"])
+        else:
+            await self.state_store.apply(user_id, post_id, removed=["save"])
+
+        if delta:
             background_tasks.add_task(
                 self.metrics.record_interaction,
                 post_id,
@@ -684,233 +525,25 @@ class PostEngagementService:
                 action,
                 metadata
             )
-
-            result = {
-                "message": f"save {action} successfully",
-                "save_count": new_count,
-                "save": is_active,
-                "metrics": fresh_counts
-            }
-
-            return result
-
-        except Exception as e:
-            if self.db.in_transaction():
-                self.db.rollback()
-            logger.error(f"Error in toggle_save: {str(e)}")
-            raise DatabaseError(f"Error processing save: {str(e)}")
-
-
-
-    '''async def toggle_save(
-            self,
-            post_id: int,
-            user_id: int,
-            background_tasks: BackgroundTasks,
-    ) -> Dict[str, Any]:
-        """
-        Specialized version of toggle_interaction just for save operations
-        with better transaction handling
-        """
-        logger.info(f"🔍 Starting save toggle for post {post_id}, user {user_id}")
-
-        # Create a new session specifically for this operation
-        # This avoids conflicts with other ongoing transactions
-        db_session = SessionLocal()
-
-        try:
-            # Get save interaction type record
-            save_type = db_session.query(InteractionType).filter(
-                InteractionType.interaction_type_name == "save"
-            ).first()
-
-            if not save_type:
-                raise ValueError("Save interaction type not found")
-
-            logger.info(f"Found save type ID: {save_type.interaction_type_id}")
-
-            # Begin the transaction
-            db_session.begin()
-
-            # Get post with for_update to ensure consistency
-            post = db_session.query(Post).filter(Post.post_id == post_id).with_for_update().first()
-
-            if not post:
-                db_session.rollback()
-                raise PostNotFoundError(post_id)
-
-            logger.info(f"Got post {post_id} with current save_count: {post.save_count}")
-
-            # Get user
-            user = db_session.query(User).filter(User.user_id == user_id).first()
-            if not user:
-                db_session.rollback()
-                raise HTTPException(status_code=404, detail="User not found")
-
-            logger.info(f"Got user {user_id}")
-
-            # Check for existing interaction
-            existing = db_session.query(PostInteraction).filter(
-                PostInteraction.post_id == post_id,
-                PostInteraction.user_id == user_id,
-                PostInteraction.interaction_type_id == save_type.interaction_type_id
-            ).first()
-
-            # Check if post is in user's saved_posts
-            saved_posts_ids = [p.post_id for p in user.saved_posts]
-            is_in_saved_posts = post_id in saved_posts_ids
-
-            logger.info(f"Existing interaction: {existing is not None}, In saved_posts: {is_in_saved_posts}")
-
-            # Get current save count (with null check)
-            current_save_count = post.save_count or 0
-
-            if existing or is_in_saved_posts:
-                # REMOVE the save
-                logger.info(f"Removing save for post {post_id}, user {user_id}")
-
-                # Try to remove the interaction record if it exists
-                if existing:
-                    try:
-                        db_session.delete(existing)
-                        logger.info(f"Deleted existing interaction record")
-                    except Exception as e:
-                        logger.error(f"Error deleting interaction: {str(e)}")
-                        db_session.rollback()
-                        raise DatabaseError(f"Error removing save interaction: {str(e)}")
-
-                # Try to remove from saved_posts if it exists
-                if is_in_saved_posts:
-                    try:
-                        for saved_post in list(user.saved_posts):
-                            if saved_post.post_id == post_id:
-                                user.saved_posts.remove(saved_post)
-                                break
-                        logger.info(f"Removed post from user's saved_posts")
-                    except Exception as e:
-                        logger.error(f"Error removing from saved_posts: {str(e)}")
-                        db_session.rollback()
-                        raise DatabaseError(f"Error removing from saved_posts: {str(e)}")
-
-                # Update the save count
-                new_save_count = max(0, current_save_count - 1)
-                post.save_count = new_save_count
-                logger.info(f"Updated save_count: {current_save_count} -> {new_save_count}")
-
-                action = "removed"
-                is_active = False
-
-            else:
-                # ADD the save
-                logger.info(f"Adding save for post {post_id}, user {user_id}")
-
-                # Add a new interaction record
-                try:
-                    new_interaction = PostInteraction(
-                        post_id=post_id,
-                        user_id=user_id,
-                        interaction_type_id=save_type.interaction_type_id,
-                        target_type="POST"
-                    )
-                    db_session.add(new_interaction)
-                    logger.info(f"Added new interaction record")
-                except Exception as e:
-                    logger.error(f"Error adding interaction: {str(e)}")
-                    db_session.rollback()
-                    raise DatabaseError(f"Error adding save interaction: {str(e)}")
-
-                # Add to saved_posts
-                try:
-                    user.saved_posts.append(post)
-                    logger.info(f"Added post to user's saved_posts")
-                except Exception as e:
-                    logger.error(f"Error adding to saved_posts: {str(e)}")
-                    db_session.rollback()
-                    raise DatabaseError(f"Error adding to saved_posts: {str(e)}")
-
-                # Update the save count
-                new_save_count = current_save_count + 1
-                post.save_count = new_save_count
-                logger.info(f"Updated save_count: {current_save_count} -> {new_save_count}")
-
-                action = "added"
-                is_active = True
-
-            # Try to commit the changes
-            try:
-                db_session.commit()
-                logger.info(f"Successfully committed save {action} transaction")
-            except Exception as e:
-                logger.error(f"Error committing changes: {str(e)}")
-                db_session.rollback()
-                raise DatabaseError(f"Error saving changes: {str(e)}")
-
-            # For the cache operations, use the original self.cache
-            # Update cache
-            cache_key = f"post:{post_id}:counts"
-            await self.cache.delete(cache_key)
-            logger.info(f"Deleted cache key: {cache_key}")
-
-            # Get fresh counts
-            fresh_counts = {}
-            for interaction_type in self.VALID_INTERACTIONS:
-                count = db_session.query(PostInteraction).join(InteractionType).filter(
-                    PostInteraction.post_id == post_id,
-                    InteractionType.interaction_type_name == interaction_type
-                ).count()
-                fresh_counts[f"{interaction_type}_count"] = count
-
-            logger.info(f"Fresh counts from DB: {fresh_counts}")
-
-            # Update cache
-            await self.cache.set(
-                cache_key,
-                fresh_counts,
-                expire=self.cache_expiry
-            )
-            logger.info(f"Updated cache with fresh counts")
-
-            # Record metric in background
             background_tasks.add_task(
-                self.metrics.record_interaction,
+                self.trending.record_interaction,
                 post_id,
-                user_id,
                 "save",
                 action,
-                None
+                category_id
             )
 
-            # Build result
-            result = {
-                "message": f"save {action} successfully",
-                "save_count": new_save_count,
-                "save": is_active,
-                "metrics": fresh_counts
-            }
-
-            logger.info(f"Returning result: {result}")
-            return result
-
-        except (PostNotFoundError, DatabaseError) as e:
-            # Known errors are already handled
-            logger.error(f"Known error: {str(e)}")
-            raise e
-        except Exception as e:
-            # Catch any other errors
-            logger.error(f"Unexpected error in toggle_save: {str(e)}")
-            if db_session.in_transaction():
-                db_session.rollback()
-            raise DatabaseError(f"Error processing save: {str(e)}")
-        finally:
-            # Always close the session
-            db_session.close()'''
+        return {
+            "message": f"save {action} successfully",
+            "save_count": fresh_counts["save_count"],
+            "save": is_active,
+            "metrics": fresh_counts
+        }
 
     # Helper method for handling like/dislike exclusivity
     def _handle_like_dislike_exclusivity(self, post, user_id, opposite_type):
         """Helper to handle mutual exclusivity between like and dislike"""
-        opposite_type_record = self.db.query(InteractionType).filter(
-            InteractionType.interaction_type_name == opposite_type
-        ).first()
+        opposite_type_record = get_interaction_types().by_name.get(opposite_type)
 
         if opposite_type_record:
             existing_opposite = self.db.query(PostInteraction).filter(
@@ -1023,42 +656,25 @@ class PostEngagementService:
             post_id: int,
             user_id: Optional[int]
     ) -> Dict[str, bool]:
-        """Get user's interaction state for a post"""
-        if not user_id:
-            return {
-                "like": False,
-                "dislike": False,
-                "save": False,
-                "share": False,
-                "report": False
-            }
-
+        """Get user's interaction state for a post (Redis bitmask, backfilled from the DB)"""
         try:
-            # Fetch actual interaction records instead of just names
-            interactions = (
-                self.db.query(PostInteraction)
-                .join(InteractionType)
-                .filter(
-                    PostInteraction.post_id == post_id,
-                    PostInteraction.user_id == user_id
-                )
-                .all()
-            )
-
-            # Create dictionary mapping interaction types to existence
-            interaction_types = [i.interaction_type.interaction_type_name for i in interactions]
-
-            return {
-                "like": "like" in interaction_types,
-                "dislike": "dislike" in interaction_types,
-                "save": "save" in interaction_types,
-                "share": "share" in interaction_types,
-                "report": "report" in interaction_types
-            }
+            return await self.state_store.get_state(self.db, user_id, post_id)
         except SQLAlchemyError as e:
             logger.error(f"Error getting interaction state: {str(e)}")
             raise DatabaseError("Error retrieving interaction state")
 
+    async def get_user_interaction_states(
+            self,
+            post_ids: List[int],
+            user_id: Optional[int]
+    ) -> Dict[int, Dict[str, bool]]:
+        """Interaction state for a page of posts with one HMGET"""
+        try:
+            return await self.state_store.get_states(self.db, user_id, post_ids)
+        except SQLAlchemyError as e:
+            logger.error("Error getting interaction states: %s", e)
+            raise DatabaseError("Error retrieving interaction state")
+
     async def update_post_metrics(
             self,
             db: Session,
@@ -1159,7 +775,7 @@ class PostEngagementService:
         This method creates a new transaction to fix any inconsistencies between the
         two different ways of tracking saved posts.
         """
-        logger.info(f"Starting reconciliation for post {post_id}, user {user_id}")
+        logger.debug("Starting reconciliation for post %s, user %s", post_id, user_id)
 
         # Use a fresh database session to avoid transaction conflicts
         if self.db.in_transaction():
@@ -1170,9 +786,7 @@ class PostEngagementService:
             self.db.begin()
 
             # Get save interaction type
-            save_type = self.db.query(InteractionType).filter(
-                InteractionType.interaction_type_name == "save"
-            ).first()
+            save_type = get_interaction_types().by_name.get("save")
 
             if not save_type:
                 logger.error("Save interaction type not found")
@@ -1202,14 +816,17 @@ class PostEngagementService:
                     is_in_saved_posts = True
                     break
 
-            logger.info(
-                f"Reconciliation state: interaction_exists={existing_interaction is not None}, is_in_saved_posts={is_in_saved_posts}")
+            logger.debug(
+                "Reconciliation state: interaction_exists=%s, is_in_saved_posts=%s",
+                existing_interaction is not None, is_in_saved_posts
+            )
 
             # Reconcile differences
+            added_interaction = False
             if existing_interaction and not is_in_saved_posts:
                 # Add to saved_posts
                 user.saved_posts.append(post)
-                logger.info(f"Reconciled: Added post {post_id} to user {user_id}'s saved_posts")
+                logger.debug("Reconciled: Added post %s to user %s's saved_posts", post_id, user_id)
             elif is_in_saved_posts and not existing_interaction:
                 # Add interaction
                 new_interaction = PostInteraction(
@@ -1219,7 +836,8 @@ class PostEngagementService:
                     target_type="POST"
                 )
                 self.db.add(new_interaction)
-                logger.info(f"Reconciled: Added save interaction for post {post_id}, user {user_id}")
+                added_interaction = True
+                logger.debug("Reconciled: Added save interaction for post %s, user %s", post_id, user_id)
 
             # Update post.save_count to reflect the correct state
             actual_count = self.db.query(PostInteraction).filter(
@@ -1228,12 +846,14 @@ class PostEngagementService:
             ).count()
 
             if post.save_count != actual_count:
-                logger.info(f"Reconciled: Updating post.save_count from {post.save_count} to {actual_count}")
+                logger.debug("Reconciled: Updating post.save_count from %s to %s", post.save_count, actual_count)
                 post.save_count = actual_count
 
             # Commit the changes
             self.db.commit()
-            logger.info("Reconciliation completed successfully")
+            logger.debug("Reconciliation completed successfully")
+            if added_interaction:
+                await self.state_store.apply(user_id, post_id, added=["save"])
 
             # Also update the cache
             cache_key = f"post:{post_id}:counts"
@@ -1258,9 +878,9 @@ async def verify_all_post_counts(): # TODO DELETE THIS/ IT IS THE SAME AS REPAIR
         cache = get_cache()
         service = PostEngagementService(db, cache)
         await service.repair_all_post_counts()
-        print("✅ All post counts verified and updated")
+        logger.info("All post counts verified and updated")
     except Exception as e:
-        print(f"❌ Error verifying post counts: {str(e)}")
+        logger.error("Error verifying post counts: %s", e)
     finally:
         db.close()
 
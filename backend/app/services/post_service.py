@@ -5,21 +5,32 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import desc, func
+from sqlalchemy import func
 from app.datamodels.user_datamodels import User
-from app.datamodels.post_datamodels import Post, PostType, PostAnalysis, PostEngagement
+from app.datamodels.post_datamodels import Post, PostAnalysis, PostEngagement, Tag, post_tags
+from app.core.catalog import get_catalog
+from app.services.author_cache import AuthorCard, get_author_card_cache
+from app.services.listing_queries import FeedCard, feed_card_query, rows_as, user_post_rows
+from app.services.upload_service import upload_extension
+from app.services.media_store import post_media_urls, record_references, store_media
 from app.schemas.post_schemas import PostCreate, PostInteractionCreate
-from app.datamodels.interaction_datamodels import PostInteraction, InteractionType
+from app.datamodels.interaction_datamodels import PostInteraction
+from app.core.interaction_types import get_interaction_types
 from app.utils.response_utils import create_response, Response
-import os
-from datetime import datetime, timedelta
-from typing import Optional, List
-from werkzeug.utils import secure_filename
+from datetime import datetime
+from typing import Optional, List, Tuple, Dict
 from app.services.post_engagement_service import PostEngagementService
+from app.services.trending_service import get_trending_service
+from app.services.recommendation_service import get_recommendation_service
+from app.services.interaction_state import get_interaction_state_store, empty_state
+from app.services.post_body_cache import get_post_body_cache, post_version, dump_json, splice_json
 from app.RedisCache import get_cache
 from app.core.logger import get_logger
+from app.core.instrumentation import timed
+from app.utils.http_cache import make_etag, get_version, get_versions
 import datetime
 import json
+import orjson
 
 logger = get_logger(__name__)
 
@@ -32,11 +43,9 @@ class DateTimeEncoder(json.JSONEncoder):
 # Post Services
 async def create_post(db: Session, user_id: int, post: PostCreate, files: Optional[list[UploadFile]] = None) -> dict:
     """Create a new post"""
-    print(f"✅ Creating post for user {user_id}")
-    print(f"Post data received: {post.dict()}")
+    logger.info("Creating post for user %s", user_id)
 
     if not user_id:
-        print("❌ Error: User ID is missing!")
         raise HTTPException(status_code=400, detail="User ID is required")
 
     try:
@@ -45,17 +54,13 @@ async def create_post(db: Session, user_id: int, post: PostCreate, files: Option
             joinedload(User.profile)
         ).filter(User.user_id == user_id).first()
 
-        print(f"✅ Found user: {user.user_id if user else 'None'}")
-        print(f"User profile: {user.profile.__dict__ if user and user.profile else 'No profile'}")
-
         if not user:
-            print(f"❌ User not found for ID: {user_id}")
+            logger.info("User not found for ID: %s", user_id)
             raise HTTPException(status_code=404, detail="User not found")
 
         # Validate post type
-        post_type = db.query(PostType).filter_by(post_type_id=post.post_type_id).first()
-        if not post_type:
-            print(f"❌ Invalid post type: {post.post_type_id}")
+        if post.post_type_id not in get_catalog().post_types:
+            logger.info("Invalid post type: %s", post.post_type_id)
             raise HTTPException(status_code=400, detail="Invalid post type")
 
         # Create post with all validated fields
@@ -84,44 +89,39 @@ async def create_post(db: Session, user_id: int, post: PostCreate, files: Option
             status='active'
         )
 
-        # Handle files
+        # Handle files: stored in the content-addressed media store, with
+        # card/detail variants rendered in the image process pool
+        stored_images = []
         if files:
             try:
-                media_dir = "./media/posts"
-                os.makedirs(media_dir, exist_ok=True)
                 image_urls = []
+                image_variants = {}
 
                 for file in files:
-                    if not file.filename:
-                        continue
-
-                    file_extension = file.filename.split(".")[-1].lower()
-                    if file_extension not in {"png", "jpg", "jpeg", "gif", "webp"}:
+                    if not upload_extension(file):
                         continue
 
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    safe_filename = f"{timestamp}_{secure_filename(file.filename)}"
-                    file_path = os.path.join(media_dir, safe_filename)
-
-                    contents = await file.read()
-                    with open(file_path, "wb") as buffer:
-                        buffer.write(contents)
-
-                    image_url = f"/media/posts/{safe_filename}"
-                    image_urls.append(image_url)
-                    print(f"✅ Saved image to: {file_path}")
-                    print(f"Image URL: {image_url}")
+                    stored, variants = await store_media(file, "post")
+                    if stored.url not in image_urls:
+                        image_urls.append(stored.url)
+                        image_variants[stored.url] = variants
+                        stored_images.append(stored)
+                    logger.debug("Saved image to: %s", stored.path)
 
                 if image_urls:
                     db_post.image_url = image_urls[0]
                     db_post.images = image_urls
+                    db_post.image_variants = image_variants
 
+            except HTTPException:
+                raise
             except Exception as e:
-                print(f"❌ Error processing files: {str(e)}")
+                logger.error("Error processing files: %s", e)
                 raise HTTPException(status_code=500, detail="Error processing image files")
 
-        # Add post to database
+        # Add post to database, referencing its blobs in the same transaction
         db.add(db_post)
+        record_references(db, "post", added=stored_images)
         db.commit()
         db.refresh(db_post)
 
@@ -147,9 +147,14 @@ async def create_post(db: Session, user_id: int, post: PostCreate, files: Option
             db.commit()
 
         except SQLAlchemyError as e:
-            print(f"❌ Error creating associated records: {str(e)}")
+            logger.error("Error creating associated records: %s", e)
             # Continue even if associated records fail - they're not critical
 
+        # Seed the post into the trending sets so new posts can surface
+        await get_trending_service(get_cache()).record_interaction(
+            db_post.post_id, "post", "added", db_post.category_id
+        )
+
         # Get complete post data with user profile information
         try:
             response_data = await get_post(db, db_post.post_id, user_id)
@@ -163,11 +168,10 @@ async def create_post(db: Session, user_id: int, post: PostCreate, files: Option
                     "expertise_area": user.profile.expertise_area if user.profile else "",
                     "worldview_ai": user.profile.worldview_ai if user.profile else "",
                 })
-            print(f"✅ Created post response data: {response_data}")
             return response_data
 
         except Exception as e:
-            print(f"❌ Error getting post data: {str(e)}")
+            logger.error("Error getting post data: %s", e)
             # Return minimal successful response if get_post fails
             return {
                 "status": "success",
@@ -182,457 +186,311 @@ async def create_post(db: Session, user_id: int, post: PostCreate, files: Option
                 }
             }
 
+    except HTTPException:
+        db.rollback()
+        raise
     except SQLAlchemyError as e:
         db.rollback()
-        print(f"❌ Database error: {str(e)}")
+        logger.error("Database error creating post: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
     except Exception as e:
         db.rollback()
-        print(f"❌ Unexpected error: {str(e)}")
+        logger.error("Unexpected error creating post: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def get_post(db: Session, post_id: int, user_id: Optional[int] = None) -> dict:
-    """
-    Get a single post with engagement data, using similar logic to get_all_posts
-    but for a single post.
+def _post_tags(db: Session, post_ids: List[int]) -> Dict[int, List[str]]:
+    """Tag names per post from post_tags, resolved through the catalog"""
+    if not post_ids:
+        return {}
+    catalog = get_catalog()
+    rows = db.query(post_tags.c.post_id, post_tags.c.tag_id).filter(post_tags.c.post_id.in_(post_ids)).all()
 
-    Args:
-        db: SQLAlchemy session
-        post_id: ID of the post
-        user_id: (Optional) ID of the current user for personalized interaction_state
+    # Tags added after the catalog was loaded are looked up directly
+    unknown = {tag_id for _, tag_id in rows if tag_id not in catalog.tags}
+    extra = dict(db.query(Tag.tag_id, Tag.tag_name).filter(Tag.tag_id.in_(unknown)).all()) if unknown else {}
 
-    Returns:
-        Dictionary with post data including metrics and interaction_state at top level
-    """
-    logger.info(f"Fetching post {post_id} for user {user_id if user_id else 'anonymous'}")
+    tags: Dict[int, List[str]] = {}
+    for post_id, tag_id in rows:
+        name = catalog.tags.get(tag_id) or extra.get(tag_id)
+        if name:
+            tags.setdefault(post_id, []).append(name)
+    return tags
 
-    try:
-        # Query post with all relations in a single go
-        post = db.query(Post).options(
-            joinedload(Post.user).joinedload(User.profile),
-            joinedload(Post.post_type),
-            joinedload(Post.tags)
-        ).filter(Post.post_id == post_id).first()
-
-        if not post:
-            logger.error(f"❌ Post not found: {post_id}")
-            raise HTTPException(status_code=404, detail="Post not found")
 
-        # Initialize the engagement service
-        cache = get_cache()
-        engagement_service = PostEngagementService(db, cache)
-
-        # Get verified counts
-        try:
-            counts = await engagement_service.verify_interaction_counts(post_id)
-            logger.info(f"Verified counts from service for post {post_id}: {counts}")
-        except Exception as e:
-            logger.error(f"Error getting verified counts: {str(e)}")
-            # Fallback to direct DB values
-            counts = {
-                "like_count": post.like_count or 0,
-                "dislike_count": post.dislike_count or 0,
-                "save_count": post.save_count or 0,
-                "share_count": post.share_count or 0,
-                "comment_count": post.comment_count or 0,
-                "report_count": post.report_count or 0
-            }
-
-        # Get interaction state if user is authenticated
-        interaction_state = {
-            "like": False,
-            "dislike": False,
-            "save": False,
-            "share": False,
-            "report": False
-        }
-
-        if user_id:
-            try:
-                interaction_state = await engagement_service.get_user_interaction_state(post_id, user_id)
-                logger.info(f"Interaction state for post {post_id}, user {user_id}: {interaction_state}")
-            except Exception as e:
-                logger.error(f"Error getting interaction state: {str(e)}")
-
-        # Fetch any engagement data
-        engagement = db.query(PostEngagement).filter_by(post_id=post_id).first()
-
-        # Prepare post data similar to get_all_posts format
-        post_data = {
-            "post_id": post.post_id,
-            "user_id": post.user_id,
-            "username": post.user.profile.username if post.user and post.user.profile else None,
-            "avatar_img": post.user.profile.avatar_img if post.user and post.user.profile else None,
-            "reputation_score": post.user.profile.reputation_score if post.user and post.user.profile else None,
-            "reputation_cat": post.user.profile.reputation_cat if post.user and post.user.profile else None,
-            "expertise_area": post.user.profile.expertise_area if post.user and post.user.profile else None,
-            "worldview_ai": post.user.profile.worldview_ai if post.user and post.user.profile else None,
-
-            "title": post.title or "",
-            "subtitle": post.subtitle or "",
-            "content": post.content,
-            "summary": post.summary or "",
+def _author_fields(author: Optional[AuthorCard]) -> dict:
+    """Author fields embedded in post responses"""
+    profile = author if author and author.has_profile else None
+    return {
+        "username": profile.username if profile else None,
+        "avatar_img": profile.avatar_img if profile else None,
+        "avatar_variants": (profile.avatar_variants or {}) if profile else {},
+        "reputation_score": profile.reputation_score if profile else None,
+        "reputation_cat": profile.reputation_cat if profile else None,
+        "expertise_area": profile.expertise_area if profile else None,
+        "worldview_ai": profile.worldview_ai if profile else None,
+    }
 
-            "image_url": post.image_url or "",
-            "images": post.images or [],
-            "video_url": post.video_url or "",
-            "video_metadata": post.video_metadata or {},
-            "audio_url": post.audio_url or "",
-            "document_url": post.document_url or "",
-            "embedded_content": post.embedded_content or {},
-            "link_preview": post.link_preview or {},
 
-            "post_type_id": post.post_type_id,
-            "post_type": post.post_type.post_type_name if post.post_type else None,
-            "category_id": post.category_id,
-            "subcategory_id": post.subcategory_id,
-            "custom_subcategory": post.custom_subcategory or "",
-
-            "visibility": post.visibility,
-            "is_pinned": post.is_pinned or False,
-            "is_draft": post.is_draft or False,
-            "parent_post_id": post.parent_post_id,
-            "edit_history": post.edit_history or {},
-            "tags": [tag.tag_name for tag in post.tags] if post.tags else [],
-            "status": post.status,
+def _engagement_fields(engagement: Optional[PostEngagement]) -> dict:
+    """View and score metrics from a post's engagement row"""
+    return {
+        "view_count": engagement.view_time_total if engagement and engagement.view_time_total else 0,
+        "unique_viewers": engagement.unique_viewers if engagement and engagement.unique_viewers else 0,
+        "avg_view_duration": engagement.avg_view_duration if engagement and engagement.avg_view_duration else 0.0,
+        "engagement_score": engagement.engagement_score if engagement and engagement.engagement_score else 0.0,
+        "quality_score": getattr(engagement, "quality_score", None) or 0.0,
+    }
 
-            "created_at": post.created_at,
-            "updated_at": post.updated_at,
 
-            # IMPORTANT: Add counts at top level just like get_all_posts
-            "like_count": counts.get("like_count", 0),
-            "dislike_count": counts.get("dislike_count", 0),
-            "save_count": counts.get("save_count", 0),
-            "share_count": counts.get("share_count", 0),
-            "comment_count": counts.get("comment_count", 0),
-            "report_count": counts.get("report_count", 0),
-
-            # IMPORTANT: Add interaction state booleans at top level
-            "like": interaction_state.get("like", False),
-            "dislike": interaction_state.get("dislike", False),
-            "save": interaction_state.get("save", False),
-            "share": interaction_state.get("share", False),
-            "report": interaction_state.get("report", False),
-
-            # Engagement metrics
-            "view_count": engagement.view_time_total if engagement and engagement.view_time_total else 0,
-            "unique_viewers": engagement.unique_viewers if engagement and engagement.unique_viewers else 0,
-            "avg_view_duration": engagement.avg_view_duration if engagement and engagement.avg_view_duration else 0.0,
-            "engagement_score": engagement.engagement_score if engagement and engagement.engagement_score else 0.0,
-            "quality_score": engagement.quality_score if engagement and engagement.quality_score else 0.0,
-
-            # Keep the nested structure for backwards compatibility
-            "metrics": counts,
-            "interaction_state": interaction_state
-        }
+def _serialize_post_body(
+        post: Post,
+        tags: List[str],
+        author: Optional[AuthorCard]
+) -> dict:
+    """Viewer-independent content fields of a post response"""
+    return {
+        "post_id": post.post_id,
+        "user_id": post.user_id,
+        **_author_fields(author),
+
+        "title": post.title or "",
+        "subtitle": post.subtitle or "",
+        "content": post.content,
+        "summary": post.summary or "",
+
+        "image_url": post.image_url or "",
+        "images": post.images or [],
+        "image_variants": post.image_variants or {},
+        "video_url": post.video_url or "",
+        "video_metadata": post.video_metadata or {},
+        "audio_url": post.audio_url or "",
+        "document_url": post.document_url or "",
+        "embedded_content": post.embedded_content or {},
+        "link_preview": post.link_preview or {},
+
+        "post_type_id": post.post_type_id,
+        "post_type": get_catalog().post_type_name(post.post_type_id),
+        "category_id": post.category_id,
+        "subcategory_id": post.subcategory_id,
+        "custom_subcategory": post.custom_subcategory or "",
+
+        "visibility": post.visibility,
+        "is_pinned": post.is_pinned or False,
+        "is_draft": post.is_draft or False,
+        "parent_post_id": post.parent_post_id,
+        "edit_history": post.edit_history or {},
+        "tags": tags,
+        "status": post.status,
+
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+    }
 
-        logger.info(f"✅ Successfully retrieved and verified post {post_id}")
 
-        return {
-            "status": "success",
-            "message": "Post retrieved successfully",
-            "data": {
-                "post": post_data
-            }
-        }
+def _dynamic_post_fields(counts: dict, interaction_state: dict) -> dict:
+    """Counts and viewer state, at top level and nested for backwards compatibility"""
+    return {
+        "like_count": counts.get("like_count", 0),
+        "dislike_count": counts.get("dislike_count", 0),
+        "save_count": counts.get("save_count", 0),
+        "share_count": counts.get("share_count", 0),
+        "comment_count": counts.get("comment_count", 0),
+        "report_count": counts.get("report_count", 0),
+
+        "like": interaction_state.get("like", False),
+        "dislike": interaction_state.get("dislike", False),
+        "save": interaction_state.get("save", False),
+        "share": interaction_state.get("share", False),
+        "report": interaction_state.get("report", False),
+
+        "metrics": counts,
+        "interaction_state": interaction_state
+    }
 
-    except SQLAlchemyError as e:
-        logger.error(f"❌ Database error in get_post: {str(e)}")
-        raise HTTPException(status_code=500, detail="Database error")
-    except Exception as e:
-        logger.error(f"❌ Unexpected error in get_post: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error retrieving post")
 
-'''async def get_post(db: Session, post_id: int, user_id: Optional[int] = None) -> dict:
+async def _get_post_body(db: Session, post_id: int) -> Tuple[str, bytes, dict]:
     """
-    Get a single post with all required fields. Fetches verified interaction
-    counts from PostEngagementService, fixes any mismatch in DB columns,
-    and returns consistent metrics.
+    (version, serialized content body, engagement fields) for a post.
 
-    Args:
-        db: SQLAlchemy session
-        post_id: ID of the post
-        user_id: (Optional) ID of the current user for personalized interaction_state
-
-    Returns:
-        Dictionary with post data, including verified `metrics` and `interaction_state`.
+    One primary-key lookup reads the post's current version and its engagement
+    row on every call. The body embeds the author card, so its version also
+    carries the author's profile version; the cached body is only used if its
+    stored version matches. Engagement metrics change on views, so they are
+    never cached.
     """
+    row = (
+        db.query(Post.updated_at, Post.created_at, Post.user_id, PostEngagement)
+        .outerjoin(PostEngagement, PostEngagement.post_id == Post.post_id)
+        .filter(Post.post_id == post_id)
+        .first()
+    )
+    if not row:
+        logger.error("❌ Post not found: %s", post_id)
+        raise HTTPException(status_code=404, detail="Post not found")
 
-    logger.info(f"Fetching post {post_id} for user {user_id if user_id else 'anonymous'}")
+    # Read before the author card, so a profile change after this point
+    # leaves a body that no later reader accepts
+    profile_version = await get_version(f"profile:{row.user_id}")
+    engagement = _engagement_fields(row[3])
+    body_cache = get_post_body_cache(get_cache())
+    if profile_version is not None:
+        version = f"{post_version(row)}:{profile_version}"
+        cached = await body_cache.get(post_id)
+        if cached is not None and cached[0] == version:
+            return version, cached[1], engagement
 
-    try:
-        # First, lock just the post row (so we can fix DB columns if needed)
-        post = (
-            db.query(Post)
-            .filter(Post.post_id == post_id)
-            .with_for_update()
-            .first()
-        )
+    post = db.query(Post).filter(Post.post_id == post_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
 
-        if not post:
-            logger.error(f"❌ Post not found: {post_id}")
-            raise HTTPException(status_code=404, detail="Post not found")
-
-        # For debugging, log current DB values
-        logger.info(
-            f"DB values for post {post_id}: "
-            f"like_count={post.like_count}, "
-            f"dislike_count={post.dislike_count}, "
-            f"save_count={post.save_count}, "
-            f"share_count={post.share_count}, "
-            f"comment_count={post.comment_count}, "
-            f"report_count={post.report_count}"
-        )
+    tags = _post_tags(db, [post_id]).get(post_id, [])
+    author = await get_author_card_cache(get_cache()).get(db, post.user_id)
+    body = dump_json(_serialize_post_body(post, tags, author))
+    if profile_version is None:
+        # Redis is unavailable; nothing to cache into or compare against
+        return post_version(post), body, engagement
+    version = f"{post_version(post)}:{profile_version}"
+    await body_cache.set(post_id, post.user_id, version, body)
+    return version, body, engagement
 
-        # Then get a "post_with_relations" WITHOUT locking (joinedload for user, profile, etc.)
-        post_with_relations = (
-            db.query(Post)
-            .options(
-                joinedload(Post.user).joinedload(User.profile),
-                joinedload(Post.post_type),
-                joinedload(Post.tags)
-            )
-            .filter(Post.post_id == post_id)
-            .first()
-        )
 
-        # Initialize the engagement service
-        cache = get_cache()
-        engagement_service = PostEngagementService(db, cache)
+async def _get_post_dynamic(db: Session, post_id: int, user_id: Optional[int]) -> dict:
+    """Per-request counts (cached) and viewer interaction state (Redis bitmask)"""
+    engagement_service = PostEngagementService(db, get_cache())
 
-        # 1) Retrieve verified counts from the service
+    try:
         counts = await engagement_service.verify_interaction_counts(post_id)
-        logger.info(f"Verified counts from service for post {post_id}: {counts}")
-
-        # 2) Fix DB columns if they differ from the verified counts
-        corrected = False
-        for key in ["like", "dislike", "save", "share", "comment", "report"]:
-            db_val = getattr(post, f"{key}_count", 0) or 0
-            svc_val = counts.get(f"{key}_count", 0)
-            if db_val != svc_val:
-                logger.info(
-                    f"Fixing {key}_count mismatch for post {post_id}: "
-                    f"DB={db_val} -> Service={svc_val}"
-                )
-                setattr(post, f"{key}_count", svc_val)
-                corrected = True
-
-        if corrected:
-            db.commit()
-            logger.info(f"✅ Mismatched counts updated in database for post {post_id}")
-
-        # 3) Determine the user's interaction state for this post
-        interaction_state = await engagement_service.get_user_interaction_state(post_id, user_id)
-        logger.info(f"Interaction state for user {user_id}: {interaction_state}")
-
-        # 4) Fetch any engagement record (optional debug info)
-        engagement = db.query(PostEngagement).filter_by(post_id=post_id).first()
-        engagement_dict = {
-            "view_count": engagement.view_time_total if engagement and engagement.view_time_total else 0,
-            "unique_viewers": engagement.unique_viewers if engagement and engagement.unique_viewers else 0,
-            "avg_view_duration": engagement.avg_view_duration if engagement and engagement.avg_view_duration else 0.0,
-            "engagement_score": engagement.engagement_score if engagement and engagement.engagement_score else 0.0,
-            "quality_score": engagement.quality_score if engagement and engagement.quality_score else 0.0
+    except Exception as e:
+        logger.error("Error getting verified counts: %s", e)
+        # Fallback to direct DB values
+        row = db.query(
+            Post.like_count, Post.dislike_count, Post.save_count,
+            Post.share_count, Post.comment_count, Post.report_count
+        ).filter(Post.post_id == post_id).first()
+        counts = {
+            field: (value or 0) for field, value in zip(
+                ("like_count", "dislike_count", "save_count", "share_count", "comment_count", "report_count"),
+                row or (0,) * 6
+            )
         }
 
-        # 5) Build user/profile data
-        user_data = {
-            "username": "Anonymous",
-            "avatar_img": None,
-            "reputation_score": 0,
-            "reputation_cat": "",
-            "expertise_area": "",
-            "worldview_ai": ""
-        }
-        if post_with_relations.user:
-            profile = post_with_relations.user.profile
-            if profile:
-                user_data.update({
-                    "username": profile.username or f"user_{post_with_relations.user.user_id}",
-                    "avatar_img": profile.avatar_img,
-                    "reputation_score": profile.reputation_score or 0,
-                    "reputation_cat": profile.reputation_cat or "Newbie",
-                    "expertise_area": profile.expertise_area or "",
-                    "worldview_ai": profile.worldview_ai or ""
-                })
-            else:
-                logger.warning(f"⚠️ No profile found for user {post_with_relations.user.user_id}")
-                user_data["username"] = f"user_{post_with_relations.user.user_id}"
+    interaction_state = empty_state()
+    if user_id:
+        try:
+            interaction_state = await engagement_service.get_user_interaction_state(post_id, user_id)
+        except Exception as e:
+            logger.error("Error getting interaction state: %s", e)
 
-        # 6) Prepare final post data object, always using the verified counts
-        #metrics_data = {
-            #"like_count": counts.get("like_count", 0),
-            #"dislike_count": counts.get("dislike_count", 0),
-            #"save_count": counts.get("save_count", 0),
-            #"share_count": counts.get("share_count", 0),
-            #"comment_count": counts.get("comment_count", 0),
-            #"report_count": counts.get("report_count", 0),
-        #}
+    return _dynamic_post_fields(counts, interaction_state)
 
 
-        post_data = {
-            # Base fields
-            "post_id": post_with_relations.post_id,
-            "user_id": post_with_relations.user_id,
-
-            # User fields
-            **user_data,
-
-            # Content fields
-            "title": post_with_relations.title or "",
-            "subtitle": post_with_relations.subtitle or "",
-            "content": post_with_relations.content,
-            "summary": post_with_relations.summary or "",
-
-            # Media
-            "image_url": post_with_relations.image_url or "",
-            "images": post_with_relations.images or [],
-            "video_url": post_with_relations.video_url or "",
-            "video_metadata": post_with_relations.video_metadata or {},
-            "audio_url": post_with_relations.audio_url or "",
-            "document_url": post_with_relations.document_url or "",
-            "embedded_content": post_with_relations.embedded_content or {},
-            "link_preview": post_with_relations.link_preview or {},
-
-            # Post classification
-            "post_type_id": post_with_relations.post_type_id,
-            "post_type": post_with_relations.post_type.post_type_name
-                if post_with_relations.post_type else None,
-            "category_id": post_with_relations.category_id,
-            "subcategory_id": post_with_relations.subcategory_id,
-            "custom_subcategory": post_with_relations.custom_subcategory or "",
-
-            # Status
-            "visibility": post_with_relations.visibility,
-            "is_pinned": post_with_relations.is_pinned or False,
-            "is_draft": post_with_relations.is_draft or False,
-            "parent_post_id": post_with_relations.parent_post_id,
-            "edit_history": post_with_relations.edit_history or {},
-            "tags": [tag.tag_name for tag in post_with_relations.tags] if post_with_relations.tags else [],
-            "status": post_with_relations.status,
-
-            # Timestamps
-            "created_at": post_with_relations.created_at,
-            "updated_at": post_with_relations.updated_at,
-
-            # DIRECTLY include like_count, dislike_count, etc. at top level
-            "like_count": counts.get("like_count", 0),
-            "dislike_count": counts.get("dislike_count", 0),
-            "save_count": counts.get("save_count", 0),
-            "share_count": counts.get("share_count", 0),
-            "comment_count": counts.get("comment_count", 0),
-            "report_count": counts.get("report_count", 0),
-
-            # Directly include interaction state flags at top level
-            "like": interaction_state.get("like", False),
-            "dislike": interaction_state.get("dislike", False),
-            "save": interaction_state.get("save", False),
-            "share": interaction_state.get("share", False),
-            "report": interaction_state.get("report", False),
-
-            # Verified metrics (like_count, etc.)
-            "metrics": {
-                "like_count": post.like_count or 0,
-                "dislike_count": post.dislike_count or 0,
-                "save_count": post.save_count or 0,
-                "share_count": post.share_count or 0,
-                "comment_count": post.comment_count or 0,
-                "report_count": post.report_count or 0
-            },
-            "interaction_state": {
-                "like": False,
-                "dislike": False,
-                "save": False,
-                "share": False,
-                "report": False
-            },
-            #"interaction_state": {
-                #"like": interaction_state.get("like", False),
-                #"dislike": interaction_state.get("dislike", False),
-                #"save": interaction_state.get("save", False),
-                #"share": interaction_state.get("share", False),
-                #"report": interaction_state.get("report", False)
-            #},
-
-
-            # User's interaction state
-            #"interaction_state": interaction_state,
-
-            # Engagement (view, etc.)
-            **engagement_dict
-        }
+async def get_post(db: Session, post_id: int, user_id: Optional[int] = None) -> dict:
+    """
+    Get a single post with engagement data, using similar logic to get_all_posts
+    but for a single post.
 
-        logger.info(f"✅ Successfully retrieved and verified post {post_id}")
-        # logger.debug(f"Post data being returned: {post_data}")
+    Args:
+        db: SQLAlchemy session
+        post_id: ID of the post
+        user_id: (Optional) ID of the current user for personalized interaction_state
 
-        final_response = {
+    Returns:
+        Dictionary with post data including metrics and interaction_state at top level
+    """
+    try:
+        _, body, engagement = await _get_post_body(db, post_id)
+        post_data = {**orjson.loads(body), **engagement, **await _get_post_dynamic(db, post_id, user_id)}
+        return {
             "status": "success",
             "message": "Post retrieved successfully",
             "data": {
                 "post": post_data
             }
         }
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error("❌ Database error in get_post: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+    except Exception as e:
+        logger.error("❌ Unexpected error in get_post: %s", e)
+        raise HTTPException(status_code=500, detail="Error retrieving post")
+
+
+async def get_post_image_url(db: Session, post_id: int) -> Optional[str]:
+    """A post's image URL from the cached post body (no counts or viewer state)"""
+    _, body, _ = await _get_post_body(db, post_id)
+    return orjson.loads(body).get("image_url") or None
 
-        logger.info("Final JSON: %s", json.dumps(final_response, cls=DateTimeEncoder))
-        return final_response
 
+@timed()
+async def get_post_json(db: Session, post_id: int, user_id: Optional[int] = None) -> Tuple[bytes, str]:
+    """
+    get_post as ready-to-send JSON bytes plus an ETag.
+
+    The cached body is never decoded: counts and viewer state are serialized
+    on their own and spliced into it, then wrapped in the response envelope.
+    The ETag is derived from the body version and the dynamic fields, so it
+    is known before the bytes are assembled.
+    """
+    try:
+        version, body, engagement = await _get_post_body(db, post_id)
+        dynamic = {**engagement, **await _get_post_dynamic(db, post_id, user_id)}
+        etag = make_etag("post", post_id, version, user_id, sorted(engagement.items()),
+                         sorted(dynamic["metrics"].items()), sorted(dynamic["interaction_state"].items()))
+        post_json = splice_json(body, dynamic)
+        return (
+            b'{"status":"success","message":"Post retrieved successfully","data":{"post":'
+            + post_json
+            + b"}}"
+        ), etag
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         logger.error(f"❌ Database error in get_post: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error")
     except Exception as e:
         logger.error(f"❌ Unexpected error in get_post: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error retrieving post")'''
+        raise HTTPException(status_code=500, detail="Error retrieving post")
 
 
 async def get_user_posts(db: Session, user_id: int, skip: int = 0, limit: int = 20) -> dict:
     """Get all posts for a specific user"""
     try:
-        posts = db.query(Post) \
-            .filter(Post.user_id == user_id) \
-            .filter(Post.status == 'active') \
-            .order_by(Post.created_at.desc()) \
-            .offset(skip) \
-            .limit(limit) \
-            .all()
+        posts = user_post_rows(db, user_id, skip, limit)
 
         serialized_posts = []
 
-        for post in posts:
-            # Get interaction state for this post and user
-            interaction_state = {}
-            if user_id:
-                try:
-                    interaction_state = await PostEngagementService.get_user_interaction_state(post.post_id, user_id)
-                except Exception as e:
-                    logger.error(f"Error getting interaction state for post {post.post_id}: {e}")
-                    interaction_state = {
-                        "like": False,
-                        "dislike": False,
-                        "save": False,
-                        "share": False,
-                        "report": False
-                    }
+        # Interaction state for the whole page in one HMGET
+        try:
+            states = await get_interaction_state_store(get_cache()).get_states(
+                db, user_id, [post.post_id for post in posts]
+            )
+        except Exception as e:
+            logger.error("Error getting interaction state for user %s: %s", user_id, e)
+            states = {}
 
-                    post_data = {
-                        "post_id": post.post_id,
-                        "title": post.title or "",
-                        "content": post.content,
-                        "created_at": post.created_at,
-                        "updated_at": post.updated_at or post.created_at,
-                        "status": post.status,
-                        "metrics": {
-                            "like_count": post.like_count,
-                            "dislike_count": post.dislike_count,
-                            "comment_count": post.comment_count,
-                            "save_count": post.save_count,
-                            "share_count": post.share_count,
-                            "report_count": post.report_count
-                            # "views": 0
-                        },
-                        "interaction_state": interaction_state
-                    }
-                    serialized_posts.append(post_data)
+        for post in posts:
+            post_data = {
+                "post_id": post.post_id,
+                "title": post.title or "",
+                "content": post.content,
+                "created_at": post.created_at,
+                "updated_at": post.updated_at or post.created_at,
+                "status": post.status,
+                "metrics": {
+                    "like_count": post.like_count,
+                    "dislike_count": post.dislike_count,
+                    "comment_count": post.comment_count,
+                    "save_count": post.save_count,
+                    "share_count": post.share_count,
+                    "report_count": post.report_count
+                    # "views": 0
+                },
+                "interaction_state": states.get(post.post_id) or empty_state()
+            }
+            serialized_posts.append(post_data)
 
         return {
             "status": "success",
@@ -648,14 +506,9 @@ async def get_user_posts(db: Session, user_id: int, skip: int = 0, limit: int =
         )
 
 
-async def get_all_posts(db: Session, skip: int = 0, limit: int = 20, category_id: Optional[int] = None,
-                        tab: Optional[str] = None, user_id: Optional[int] = None):
-    """Get all posts with optional filtering and user-specific interaction state"""
-    query = db.query(Post).options(
-        joinedload(Post.user).joinedload(User.profile),
-        joinedload(Post.post_type),
-        joinedload(Post.tags)
-    ).filter(Post.status == 'active')
+def _feed_query(query, category_id: Optional[int] = None, tab: Optional[str] = None):
+    """Filtering and ordering shared by the feed and its ETag"""
+    query = query.filter(Post.status == 'active')
 
     if category_id:
         query = query.filter(Post.category_id == category_id)
@@ -669,29 +522,77 @@ async def get_all_posts(db: Session, skip: int = 0, limit: int = 20, category_id
     else:
         query = query.order_by(Post.created_at.desc())
 
-    posts = query.offset(skip).limit(limit).all()
+    return query
+
+
+async def get_feed_etag(db: Session, skip: int = 0, limit: int = 20, category_id: Optional[int] = None,
+                        tab: Optional[str] = None, user_id: Optional[int] = None,
+                        content_chars: Optional[int] = None, prefer_summary: bool = False) -> Optional[str]:
+    """
+    ETag for a feed page without hydrating it.
+
+    Built from the page's post ids, their created/updated timestamps and
+    count columns, the authors' profile versions and the viewer's interaction
+    state, i.e. everything get_all_posts renders.
+    """
+    rows = _feed_query(
+        db.query(
+            Post.post_id, Post.user_id, Post.created_at, Post.updated_at,
+            Post.like_count, Post.dislike_count, Post.save_count,
+            Post.share_count, Post.comment_count, Post.report_count
+        ),
+        category_id, tab
+    ).offset(skip).limit(limit).all()
+
+    author_versions = await get_versions(sorted({f"profile:{row.user_id}" for row in rows}))
+    if author_versions is None:
+        return None
+
+    states = await get_interaction_state_store(get_cache()).get_states(db, user_id, [row.post_id for row in rows])
+    max_created = max((row.created_at for row in rows if row.created_at), default=None)
+    return make_etag(
+        "feed", skip, limit, category_id, tab, user_id, content_chars, prefer_summary, max_created,
+        [tuple(row) for row in rows],
+        author_versions,
+        [sorted(states[row.post_id].items()) for row in rows]
+    )
+
+
+@timed()
+async def get_all_posts(db: Session, skip: int = 0, limit: int = 20, category_id: Optional[int] = None,
+                        tab: Optional[str] = None, user_id: Optional[int] = None,
+                        content_chars: Optional[int] = None, prefer_summary: bool = False):
+    """
+    Get all posts with optional filtering and user-specific interaction state.
 
-    # Initialize cache and engagement service
+    Only the columns a feed card renders are selected. content_chars truncates
+    post content in SQL (content_truncated tells the client there is more);
+    prefer_summary shows the summary instead of the content where one exists.
+    """
+    posts = rows_as(FeedCard, _feed_query(
+        feed_card_query(db, content_chars, prefer_summary), category_id, tab
+    ).offset(skip).limit(limit).all())
+
+    # Post type names come from the catalog, tags from one post_tags query and
+    # authors from the author card cache
+    catalog = get_catalog()
+    tags = _post_tags(db, [post.post_id for post in posts])
     cache = get_cache()
+    authors = await get_author_card_cache(cache).get_many(db, [post.user_id for post in posts])
+
+    # Initialize engagement service
     engagement_service = PostEngagementService(db, cache)
 
+    # Interaction state for the whole page in one HMGET
+    try:
+        states = await engagement_service.get_user_interaction_states([post.post_id for post in posts], user_id)
+    except Exception as e:
+        logger.error("Error getting interaction state: %s", e)
+        states = {}
+
     serialized_posts = []
     for post in posts:
-        # Get interaction state if user is authenticated
-        interaction_state = {
-            "like": False,
-            "dislike": False,
-            "save": False,
-            "share": False,
-            "report": False
-        }
-
-        if user_id:
-            try:
-                interaction_state = await engagement_service.get_user_interaction_state(post.post_id, user_id)
-                logger.info(f"Interaction state for post {post.post_id}, user {user_id}: {interaction_state}")
-            except Exception as e:
-                logger.error(f"Error getting interaction state: {str(e)}")
+        interaction_state = states.get(post.post_id) or empty_state()
 
         # Get verified counts
         try:
@@ -699,34 +600,25 @@ async def get_all_posts(db: Session, skip: int = 0, limit: int = 20, category_id
         except Exception as e:
             logger.error(f"Error getting verified counts: {str(e)}")
             # Fallback to direct DB values
-            counts = {
-                "like_count": post.like_count or 0,
-                "dislike_count": post.dislike_count or 0,
-                "save_count": post.save_count or 0,
-                "share_count": post.share_count or 0,
-                "comment_count": post.comment_count or 0,
-                "report_count": post.report_count or 0
-            }
+            counts = post.counts()
 
         post_data = {
             "post_id": post.post_id,
             "user_id": post.user_id,
-            "username": post.user.profile.username if post.user and post.user.profile else None,
-            "avatar_img": post.user.profile.avatar_img if post.user and post.user.profile else None,
-            "reputation_score": post.user.profile.reputation_score if post.user and post.user.profile else None,
-            "reputation_cat": post.user.profile.reputation_cat if post.user and post.user.profile else None,
-            "expertise_area": post.user.profile.expertise_area if post.user and post.user.profile else None,
+            **_author_fields(authors.get(post.user_id)),
             "title": post.title,
             "content": post.content,
+            "content_truncated": post.content_truncated,
             "image_url": post.image_url,
             "images": post.images,
+            "image_variants": post.image_variants or {},
             "video_url": post.video_url,
             "post_type_id": post.post_type_id,
-            "post_type": post.post_type.post_type_name if post.post_type else None,
+            "post_type": catalog.post_type_name(post.post_type_id),
             "category_id": post.category_id,
             "subcategory_id": post.subcategory_id,
             "custom_subcategory": post.custom_subcategory,
-            "tags": [tag.tag_name for tag in post.tags] if post.tags else [],
+            "tags": tags.get(post.post_id, []),
             "status": post.status,
             "created_at": post.created_at,
             "updated_at": post.updated_at,
@@ -749,6 +641,61 @@ async def get_all_posts(db: Session, skip: int = 0, limit: int = 20, category_id
         }
     }
 
+@timed()
+async def get_posts_by_ids(db: Session, post_ids: List[int], user_id: Optional[int] = None) -> List[dict]:
+    """
+    Hydrate many posts at once, preserving the order of post_ids.
+
+    Uses one query for posts, one for their tags, one for engagement rows, one
+    HMGET for the user's interaction state and the author card cache, instead
+    of a get_post call per id. Post type names come from the catalog and
+    counts from the denormalized post columns. Deleted or missing posts are
+    skipped.
+    """
+    if not post_ids:
+        return []
+
+    posts = db.query(Post).filter(Post.post_id.in_(post_ids), Post.status == 'active').all()
+    posts_by_id = {post.post_id: post for post in posts}
+    tags = _post_tags(db, list(posts_by_id))
+    authors = await get_author_card_cache(get_cache()).get_many(db, {post.user_id for post in posts})
+
+    engagements = {
+        engagement.post_id: engagement
+        for engagement in db.query(PostEngagement).filter(PostEngagement.post_id.in_(post_ids)).all()
+    }
+
+    states = await get_interaction_state_store(get_cache()).get_states(
+        db, user_id, [post_id for post_id in post_ids if post_id in posts_by_id]
+    )
+
+    results = []
+    for post_id in post_ids:
+        post = posts_by_id.get(post_id)
+        if not post:
+            continue
+
+        counts = {
+            "like_count": post.like_count or 0,
+            "dislike_count": post.dislike_count or 0,
+            "save_count": post.save_count or 0,
+            "share_count": post.share_count or 0,
+            "comment_count": post.comment_count or 0,
+            "report_count": post.report_count or 0
+        }
+        interaction_state = states[post_id]
+
+        results.append({
+            **_serialize_post_body(post, tags.get(post_id, []), authors.get(post.user_id)),
+            **counts,
+            **interaction_state,
+            **_engagement_fields(engagements.get(post_id)),
+            "metrics": counts,
+            "interaction_state": interaction_state
+        })
+
+    return results
+
 async def delete_post(db: Session, post_id: int, user_id: int) -> Response:
     post = db.query(Post)\
         .filter(Post.post_id == post_id)\
@@ -761,39 +708,40 @@ async def delete_post(db: Session, post_id: int, user_id: int) -> Response:
     try:
         post.status = 'deleted'
         db.commit()
+        await get_trending_service(get_cache()).remove_post(post_id, post.category_id)
+        await get_post_body_cache(get_cache()).invalidate(post_id)
         return create_response("Post deleted successfully", {})
     except SQLAlchemyError:
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to delete post")
 
 async def upload_post_image(file: UploadFile, post_id: int, db: Session):
-    ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
-    file_extension = file.filename.split(".")[-1].lower()
-
-    if file_extension not in ALLOWED_EXTENSIONS:
-        raise HTTPException(status_code=400, detail="Unsupported file type")
-
-    # Save the file locally
-    save_path = f"./media/posts/{post_id}.{file_extension}"
-    with open(save_path, "wb") as buffer:
-        buffer.write(await file.read())
-
-    # Update the post in the database
     post = db.query(Post).filter(Post.post_id == post_id).first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    post.image_url = save_path
+    # Stored in the content-addressed media store, plus its variants
+    stored, variants = await store_media(file, "post")
+
+    old_urls = set(post_media_urls(post.image_url, post.images))
+    post.image_url = stored.url
+    post.image_variants = {**(post.image_variants or {}), stored.url: variants}
+    new_urls = set(post_media_urls(post.image_url, post.images))
+    record_references(
+        db, "post",
+        added=[stored] if stored.url not in old_urls else [],
+        removed_urls=old_urls - new_urls
+    )
     db.commit()
     db.refresh(post)
+    await get_post_body_cache(get_cache()).invalidate(post_id)
 
-    return {"message": "Image uploaded successfully", "image_url": save_path}
+    return {"message": "Image uploaded successfully", "image_url": stored.url}
 
 
 # Interaction Services
 async def create_post_interaction(db: Session, interaction: PostInteractionCreate) -> Response:
-    interaction_type = db.query(InteractionType).filter_by(interaction_type_id=interaction.interaction_type_id).first()
-    if not interaction_type:
+    if interaction.interaction_type_id not in get_interaction_types().by_id:
         raise HTTPException(status_code=400, detail="Invalid interaction type")
 
     post_interaction = PostInteraction(
@@ -816,6 +764,10 @@ async def create_post_interaction(db: Session, interaction: PostInteractionCreat
 
     try:
         db.commit()
+        await get_interaction_state_store(get_cache()).apply(
+            interaction.user_id, interaction.post_id,
+            added=[get_interaction_types().name(interaction.interaction_type_id)]
+        )
         return create_response("Post interaction created successfully", {})
     except SQLAlchemyError:
         db.rollback()
@@ -863,9 +815,7 @@ async def get_saved_posts(db: Session, user_id: int):
         post_ids_from_relationship = [post.post_id for post in user.saved_posts]
 
         # Also get post IDs from save interactions
-        save_interaction_type = db.query(InteractionType).filter(
-            InteractionType.interaction_type_name == "save"
-        ).first()
+        save_interaction_type = get_interaction_types().by_name.get("save")
 
         if save_interaction_type:
             saved_interactions = db.query(PostInteraction).filter(
@@ -880,7 +830,7 @@ async def get_saved_posts(db: Session, user_id: int):
         else:
             all_post_ids = post_ids_from_relationship
 
-        logger.info(f"Found {len(all_post_ids)} saved posts for user {user_id}")
+        logger.debug("Found %d saved posts for user %s", len(all_post_ids), user_id)
         # Return directly as a list to avoid response validation errors
         return all_post_ids
     except Exception as e:
@@ -918,49 +868,26 @@ async def calculate_post_engagement(post_id: int, db: Session) -> None:
     db.commit()
 
 
-async def get_trending_posts(timeframe: str, db: Session, limit: int = 20) -> List[dict]:
-    """Get trending posts based on engagement and interaction metrics"""
-    # Calculate time window
-    now = datetime.utcnow()
-    if timeframe == "day":
-        start_time = now - timedelta(days=1)
-    elif timeframe == "week":
-        start_time = now - timedelta(weeks=1)
-    elif timeframe == "month":
-        start_time = now - timedelta(days=30)
-    else:
-        start_time = now - timedelta(days=7)  # Default to week
+@timed()
+async def get_trending_posts(timeframe: str, db: Session, limit: int = 20,
+                             category_id: Optional[int] = None, user_id: Optional[int] = None) -> List[dict]:
+    """Get trending posts from the precomputed decay-scored sorted sets"""
+    trending = get_trending_service(get_cache())
 
-    trending_posts = db.query(Post).join(
-        PostEngagement
-    ).filter(
-        Post.created_at >= start_time,
-        Post.status == 'active'
-    ).order_by(
-        desc(PostEngagement.engagement_score)
-    ).limit(limit).all()
+    post_ids = await trending.get_trending_post_ids(timeframe, category_id, limit=limit)
+    if not post_ids and await trending.rebuild_if_empty(db, timeframe):
+        # Cold start or Redis was flushed; one request per cluster rebuilds
+        post_ids = await trending.get_trending_post_ids(timeframe, category_id, limit=limit)
 
-    return [await get_post(db, post.post_id) for post in trending_posts]
+    return await get_posts_by_ids(db, post_ids, user_id)
 
 
+@timed()
 async def get_recommended_posts(user_id: int, db: Session, limit: int = 20) -> List[dict]:
-    """Get personalized post recommendations for a user"""
-    # Get user's interests and interaction history
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Get posts from categories the user has interacted with
-    recommended_posts = db.query(Post).join(
-        PostInteraction,
-        PostInteraction.post_id == Post.post_id
-    ).filter(
-        PostInteraction.user_id == user_id
-    ).order_by(
-        desc(Post.created_at)
-    ).limit(limit).all()
-
-    return [await get_post(db, post.post_id) for post in recommended_posts]
+    """Get personalized post recommendations from the precomputed candidate lists"""
+    recommendations = get_recommendation_service(get_cache())
+    post_ids = await recommendations.get_recommended_post_ids(user_id, limit)
+    return await get_posts_by_ids(db, post_ids, user_id)
 
 
 async def mark_post_as_read(user_id: int, post_id: int, db: Session) -> dict:
@@ -973,6 +900,9 @@ async def mark_post_as_read(user_id: int, post_id: int, db: Session) -> dict:
     )
     db.add(interaction)
     db.commit()
+    await get_interaction_state_store(get_cache()).apply(
+        user_id, post_id, added=[get_interaction_types().name(interaction.interaction_type_id)]
+    )
     return {"status": "success", "message": "Post marked as read"}
 
 
@@ -1,14 +1,16 @@
 # app/services/profile_service.py
 import os
-import uuid
-import aiofiles
-from PIL import Image
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
-#from app.services.file_service import save_avatar_image
+from app.services.file_service import save_avatar_image
+from app.services.media_store import record_references
 from app.datamodels.user_datamodels import UserProfile, User
 from app.schemas.user_schemas import ProfileUpdate
 from app.core.cache import get_redis
+from app.RedisCache import get_cache
+from app.services.post_body_cache import get_post_body_cache
+from app.services.author_cache import get_author_card_cache
+from app.utils.http_cache import bump_version
 import json
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
@@ -63,6 +65,7 @@ async def get_or_create_profile(db: Session, user: User) -> UserProfile:
         db.add(profile)
         db.commit()
         db.refresh(profile)
+        await bump_version(f"profile:{user.user_id}")
 
     return profile
 
@@ -73,6 +76,7 @@ def profile_to_dict(profile: UserProfile) -> Dict[str, Any]:
         "user_id": profile.user_id,
         "username": profile.username,
         "avatar_img": profile.avatar_img or settings.DEFAULT_AVATAR_URL,
+        "avatar_variants": profile.avatar_variants or {},
         "about": profile.about,
         "post_cnt": profile.post_cnt,
         "comment_cnt": profile.comment_cnt,
@@ -113,7 +117,7 @@ async def get_profile_from_cache(user_id: int) -> Optional[Dict[str, Any]]:
         cached_data = await redis.get(cache_key)
         return json.loads(cached_data) if cached_data else None
     except Exception as e:
-        print(f"Redis cache error: {str(e)}")
+        logger.error("Redis cache error: %s", e)
         return None
 
 
@@ -131,21 +135,25 @@ async def set_profile_to_cache(user_id: int, profile_data: Dict[str, Any]) -> No
             ex=3600  # 1 hour expiration
         )
     except Exception as e:
-        print(f"Redis cache error: {str(e)}")
+        logger.error("Redis cache error: %s", e)
 
 
 async def update_avatar(db: Session, user_id: int, file: UploadFile) -> str:
     """Update user's avatar image."""
     try:
-        # Save the image and get the URL path
-        avatar_path = await save_avatar_image(file)
+        # Save the image and its size variants
+        stored, avatar_variants = await save_avatar_image(file)
+        avatar_path = avatar_variants["200"]["jpg"]
 
         # Update profile with new avatar path
         profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
         if not profile:
             raise ValueError("Profile not found")
 
+        # Reference the new blob and release the previous avatar's
+        record_references(db, "avatar", added=[stored], removed_urls=[profile.avatar_img])
         profile.avatar_img = avatar_path
+        profile.avatar_variants = avatar_variants
         profile.last_active = datetime.now()
         db.commit()
         db.refresh(profile)
@@ -155,7 +163,7 @@ async def update_avatar(db: Session, user_id: int, file: UploadFile) -> str:
 
         return avatar_path
     except Exception as e:
-        print(f"Error updating avatar: {str(e)}")
+        logger.error("Error updating avatar: %s", e)
         raise
 
 
@@ -187,8 +195,13 @@ async def invalidate_profile_cache(user_id: int) -> None:
         if redis:
             cache_key = f"profile:{user_id}"
             await redis.delete(cache_key)
+        # Author cards, cached post bodies and feed/profile ETags embed the
+        # author's username/avatar. Invalidating the card also bumps
+        # version:profile:{user_id}, which the bodies and ETags are keyed by.
+        await get_author_card_cache(get_cache()).invalidate(user_id)
+        await get_post_body_cache(get_cache()).invalidate_author(user_id)
     except Exception as e:
-        print(f"Redis cache error: {str(e)}")
+        logger.error("Redis cache error: %s", e)
 
 async def create_default_profile(db: Session, user_id: int, email: str) -> UserProfile:
     """
@@ -207,31 +220,5 @@ async def create_default_profile(db: Session, user_id: int, email: str) -> UserP
     db.add(profile)
     db.commit()
     db.refresh(profile)
+    await bump_version(f"profile:{user_id}")
     return profile
-
-async def save_avatar_image(file: UploadFile) -> str:
-    """Save an avatar image and return the file path."""
-    try:
-        # Generate unique filename
-        file_extension = file.filename.split(".")[-1].lower() if file.filename else "jpg"
-        filename = f"{uuid.uuid4()}.{file_extension}"
-        filepath = os.path.join(settings.AVATAR_DIR, filename)
-
-        logger.info(f"Saving avatar to {filepath}")
-
-        # Save the file
-        async with aiofiles.open(filepath, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
-
-        # Process image (resize if needed)
-        with Image.open(filepath) as img:
-            # Resize image to standard size for avatars
-            img.thumbnail((200, 200))
-            img.save(filepath)
-
-        # Return the URL path (not filesystem path)
-        return f"/avatars/{filename}"
-    except Exception as e:
-        logger.error(f"Error saving avatar: {str(e)}")
-        raise
\ No newline at end of file
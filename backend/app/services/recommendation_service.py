@@ -0,0 +1,367 @@
+# app/services/recommendation_service.py
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.RedisCache import RedisCache, get_cache
+from app.core.interaction_types import get_interaction_types
+from app.core.logger import get_logger
+from app.datamodels.comment_datamodels import Comment
+from app.datamodels.interaction_datamodels import PostInteraction
+from app.datamodels.post_datamodels import Post, post_tags
+from app.services.trending_service import get_trending_service
+from database.database import SessionLocal
+
+logger = get_logger(__name__)
+
+# Implicit feedback strength per interaction; negative signals only exclude
+INTERACTION_WEIGHTS: Dict[str, float] = {
+    "like": 1.0,
+    "save": 2.0,
+    "share": 2.0,
+    "comment": 1.5,
+}
+NEGATIVE_INTERACTIONS = {"dislike", "report"}
+
+# Interactions older than this are ignored when building affinities
+HISTORY_WINDOW = timedelta(days=90)
+# Only posts newer than this are recommended
+CANDIDATE_WINDOW = timedelta(days=30)
+# Candidates stored per user
+CANDIDATES_PER_USER = 200
+# Users scored per block, bounds the dense users x candidates matrix
+USER_BLOCK_SIZE = 512
+
+# Blend of the offline signals
+CO_OCCURRENCE_WEIGHT = 0.5
+CATEGORY_WEIGHT = 0.3
+TAG_WEIGHT = 0.2
+
+# Precomputed lists are trusted less as they age; at this age they count
+# for half and trending fills the rest
+FRESHNESS_HALF_LIFE = timedelta(hours=12)
+RECS_TTL = 7 * 86400
+BUILD_INTERVAL = 3600
+
+
+def _to_ts(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def build_candidates(db: Session) -> Dict[int, List[Tuple[int, float]]]:
+    """
+    Offline step: score recent posts for every active user.
+
+    Builds a sparse users x posts feedback matrix R from post_interactions and
+    comments, then combines
+      - item co-occurrence: R_bin @ (R_bin.T @ R_bin[:, candidates])
+      - category affinity:  norm(R @ P_cat) @ P_cat[candidates].T
+      - tag affinity:       norm(R @ P_tag) @ P_tag[candidates].T
+    Posts the user authored or already interacted with are excluded.
+
+    Returns:
+        Dict of user_id -> [(post_id, score)] sorted by score descending
+    """
+    import numpy as np
+    from scipy import sparse
+
+    now = datetime.now(timezone.utc)
+    history_since = now - HISTORY_WINDOW
+    candidate_since = now - CANDIDATE_WINDOW
+
+    posts = (
+        db.query(Post.post_id, Post.user_id, Post.category_id, Post.created_at)
+        .filter(Post.status == "active", Post.created_at >= history_since)
+        .all()
+    )
+    if not posts:
+        return {}
+
+    post_index = {post_id: i for i, (post_id, _, _, _) in enumerate(posts)}
+    post_ids = np.array([p[0] for p in posts])
+
+    events: List[Tuple[int, int, float]] = []
+    negatives: List[Tuple[int, int]] = []
+    types = get_interaction_types()
+    interaction_rows = (
+        db.query(PostInteraction.user_id, PostInteraction.post_id, PostInteraction.interaction_type_id)
+        .filter(PostInteraction.created_at >= history_since)
+        .all()
+    )
+    for user_id, post_id, type_id in interaction_rows:
+        if post_id not in post_index:
+            continue
+        name = types.name(type_id)
+        if name in NEGATIVE_INTERACTIONS:
+            negatives.append((user_id, post_id))
+        elif name in INTERACTION_WEIGHTS:
+            events.append((user_id, post_id, INTERACTION_WEIGHTS[name]))
+
+    comment_rows = (
+        db.query(Comment.user_id, Comment.post_id)
+        .filter(Comment.created_at >= history_since, Comment.is_deleted.isnot(True))
+        .all()
+    )
+    for user_id, post_id in comment_rows:
+        if post_id in post_index:
+            events.append((user_id, post_id, INTERACTION_WEIGHTS["comment"]))
+
+    if not events:
+        return {}
+
+    user_ids = sorted({user_id for user_id, _, _ in events})
+    user_index = {user_id: i for i, user_id in enumerate(user_ids)}
+    n_users, n_posts = len(user_ids), len(posts)
+
+    rows = np.array([user_index[u] for u, _, _ in events])
+    cols = np.array([post_index[p] for _, p, _ in events])
+    vals = np.array([w for _, _, w in events], dtype=np.float32)
+    # Duplicates (e.g. several comments) are summed by the CSR conversion
+    feedback = sparse.csr_matrix((vals, (rows, cols)), shape=(n_users, n_posts))
+    binary = feedback.copy()
+    binary.data[:] = 1.0
+
+    # Post -> category and post -> tag incidence matrices
+    category_ids = sorted({c for _, _, c, _ in posts if c is not None})
+    category_index = {c: i for i, c in enumerate(category_ids)}
+    cat_rows = [post_index[p] for p, _, c, _ in posts if c is not None]
+    cat_cols = [category_index[c] for _, _, c, _ in posts if c is not None]
+    post_category = sparse.csr_matrix(
+        (np.ones(len(cat_rows), dtype=np.float32), (cat_rows, cat_cols)),
+        shape=(n_posts, max(len(category_ids), 1))
+    )
+
+    tag_rows = (
+        db.query(post_tags.c.post_id, post_tags.c.tag_id)
+        .filter(post_tags.c.post_id.in_([int(p) for p in post_ids]))
+        .all()
+    )
+    tag_ids = sorted({tag_id for _, tag_id in tag_rows})
+    tag_index = {t: i for i, t in enumerate(tag_ids)}
+    post_tag = sparse.csr_matrix(
+        (np.ones(len(tag_rows), dtype=np.float32),
+         ([post_index[p] for p, _ in tag_rows], [tag_index[t] for _, t in tag_rows])),
+        shape=(n_posts, max(len(tag_ids), 1))
+    )
+
+    def _row_normalize(matrix):
+        totals = np.asarray(matrix.sum(axis=1)).ravel()
+        totals[totals == 0] = 1.0
+        return sparse.diags(1.0 / totals) @ matrix
+
+    user_category = _row_normalize(feedback @ post_category)
+    user_tag = _row_normalize(feedback @ post_tag)
+
+    # Candidate posts: recent enough to recommend
+    candidates = np.array([
+        i for i, (_, _, _, created_at) in enumerate(posts)
+        if created_at is not None and _to_ts(created_at) >= candidate_since.timestamp()
+    ])
+    if candidates.size == 0:
+        return {}
+
+    co_occurrence = (binary.T @ binary[:, candidates]).tocoo()
+    # An item shouldn't recommend itself
+    keep = co_occurrence.row != candidates[co_occurrence.col]
+    co_occurrence = sparse.csr_matrix(
+        (co_occurrence.data[keep], (co_occurrence.row[keep], co_occurrence.col[keep])),
+        shape=co_occurrence.shape
+    )
+
+    candidate_category = post_category[candidates].T.tocsr()
+    candidate_tag = post_tag[candidates].T.tocsr()
+
+    # Users never get their own posts or posts they already acted on
+    authored = sparse.csr_matrix(
+        (np.ones(n_posts, dtype=np.float32),
+         ([user_index.get(p[1], n_users) for p in posts], np.arange(n_posts))),
+        shape=(n_users + 1, n_posts)
+    )[:n_users]
+    seen_rows = [user_index[u] for u, p in negatives if u in user_index]
+    seen_cols = [post_index[p] for u, p in negatives if u in user_index]
+    seen = binary + authored + sparse.csr_matrix(
+        (np.ones(len(seen_rows), dtype=np.float32), (seen_rows, seen_cols)),
+        shape=(n_users, n_posts)
+    )
+    seen = seen[:, candidates]
+
+    def _scale_rows(block):
+        peak = block.max(axis=1, keepdims=True)
+        peak[peak == 0] = 1.0
+        return block / peak
+
+    results: Dict[int, List[Tuple[int, float]]] = {}
+    top_k = min(CANDIDATES_PER_USER, candidates.size)
+    for start in range(0, n_users, USER_BLOCK_SIZE):
+        stop = min(start + USER_BLOCK_SIZE, n_users)
+        co_scores = _scale_rows((binary[start:stop] @ co_occurrence).toarray())
+        cat_scores = _scale_rows((user_category[start:stop] @ candidate_category).toarray())
+        tag_scores = _scale_rows((user_tag[start:stop] @ candidate_tag).toarray())
+
+        scores = (
+            CO_OCCURRENCE_WEIGHT * co_scores
+            + CATEGORY_WEIGHT * cat_scores
+            + TAG_WEIGHT * tag_scores
+        )
+        scores[seen[start:stop].toarray() > 0] = 0.0
+
+        top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        for offset, user_row in enumerate(top):
+            user_scores = scores[offset, user_row]
+            order = np.argsort(-user_scores)
+            picks = [
+                (int(post_ids[candidates[user_row[i]]]), float(user_scores[i]))
+                for i in order if user_scores[i] > 0
+            ]
+            if picks:
+                results[user_ids[start + offset]] = picks
+
+    return results
+
+
+class RecommendationService:
+    """Serves precomputed per-user candidate lists, blended with trending"""
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.prefix = "recs:"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.prefix}user:{user_id}"
+
+    def _built_at_key(self, user_id: int) -> str:
+        return f"{self.prefix}user:{user_id}:built_at"
+
+    async def store_candidates(self, candidates: Dict[int, List[Tuple[int, float]]], chunk_size: int = 500) -> None:
+        """
+        Replace every user's candidate list, chunked into pipelines. Users
+        from the previous build that have no candidates now lose their list
+        rather than keep being served it.
+        """
+        built_at = time.time()
+        user_ids = list(candidates)
+        users_key = f"{self.prefix}users"
+        previous = {int(user_id) for user_id in await self.cache.redis.smembers(users_key)}
+
+        for start in range(0, len(user_ids), chunk_size):
+            pipe = self.cache.redis.pipeline(transaction=False)
+            for user_id in user_ids[start:start + chunk_size]:
+                key = self._user_key(user_id)
+                pipe.delete(key)
+                pipe.zadd(key, {str(post_id): score for post_id, score in candidates[user_id]})
+                pipe.expire(key, RECS_TTL)
+                pipe.set(self._built_at_key(user_id), built_at, ex=RECS_TTL)
+            await pipe.execute()
+
+        dropped = list(previous - set(user_ids))
+        for start in range(0, len(dropped), chunk_size):
+            chunk = dropped[start:start + chunk_size]
+            await self.cache.redis.delete(
+                *[self._user_key(user_id) for user_id in chunk],
+                *[self._built_at_key(user_id) for user_id in chunk]
+            )
+
+        pipe = self.cache.redis.pipeline(transaction=True)
+        pipe.delete(users_key)
+        if user_ids:
+            pipe.sadd(users_key, *user_ids)
+        pipe.set(f"{self.prefix}built_at", built_at)
+        await pipe.execute()
+        if dropped:
+            logger.info("Cleared recommendations for %d users dropped from the build", len(dropped))
+
+    async def get_recommended_post_ids(self, user_id: int, limit: int = 20) -> List[int]:
+        """
+        The user's candidates and their age in one Redis round trip, alongside
+        the daily trending scores. The candidates' weight decays with age so a
+        stale list gradually gives way to what's trending now.
+        """
+        fetch = limit * 3
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            pipe.zrevrange(self._user_key(user_id), 0, fetch - 1, withscores=True)
+            pipe.get(self._built_at_key(user_id))
+            (recs, built_at), trending = await asyncio.gather(
+                pipe.execute(),
+                get_trending_service(self.cache).get_trending_scores("day", limit=fetch)
+            )
+        except Exception as e:
+            logger.error("Error reading recommendations for user %s: %s", user_id, e)
+            return []
+
+        freshness = 0.0
+        if recs and built_at:
+            age = max(0.0, time.time() - float(built_at))
+            freshness = math.pow(0.5, age / FRESHNESS_HALF_LIFE.total_seconds())
+
+        def _normalized(pairs):
+            peak = max((score for _, score in pairs), default=0.0)
+            if peak <= 0:
+                return {}
+            return {int(post_id): score / peak for post_id, score in pairs}
+
+        blended: Dict[int, float] = {}
+        for post_id, score in _normalized(recs).items():
+            blended[post_id] = blended.get(post_id, 0.0) + freshness * score
+        for post_id, score in _normalized(trending).items():
+            blended[post_id] = blended.get(post_id, 0.0) + (1.0 - freshness) * score
+
+        ranked = sorted(blended.items(), key=lambda item: item[1], reverse=True)
+        return [post_id for post_id, _ in ranked[:limit]]
+
+
+async def rebuild_recommendations() -> int:
+    """Run the offline build in a worker thread and publish the results"""
+    def _build():
+        db = SessionLocal()
+        try:
+            return build_candidates(db)
+        finally:
+            db.close()
+
+    started = time.time()
+    candidates = await asyncio.to_thread(_build)
+    await get_recommendation_service(get_cache()).store_candidates(candidates)
+    logger.info("Built recommendations for %s users in %.1fs", len(candidates), time.time() - started)
+    return len(candidates)
+
+
+async def periodic_build_recommendations():
+    """Periodic task to rebuild per-user recommendation candidates"""
+    lock_key = "recs_build_running"
+    cache = get_cache()
+
+    try:
+        lock_acquired = await cache.redis.set(lock_key, "1", nx=True, ex=BUILD_INTERVAL * 2)
+        if not lock_acquired:
+            logger.info("Recommendation build already running, skipping this instance")
+            return
+
+        while True:
+            try:
+                await rebuild_recommendations()
+                await cache.redis.expire(lock_key, BUILD_INTERVAL * 2)
+                await asyncio.sleep(BUILD_INTERVAL)
+            except Exception as e:
+                logger.error("Error building recommendations: %s", e)
+                await asyncio.sleep(300)
+    finally:
+        await cache.redis.delete(lock_key)
+
+
+# Singleton instance
+_recommendation_service: Optional[RecommendationService] = None
+
+
+def get_recommendation_service(cache: RedisCache) -> RecommendationService:
+    """Get or create RecommendationService instance"""
+    global _recommendation_service
+    if _recommendation_service is None:
+        _recommendation_service = RecommendationService(cache)
+    return _recommendation_service
@@ -0,0 +1,368 @@
+# app/services/trending_service.py
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.RedisCache import RedisCache
+from app.core.interaction_types import get_interaction_types
+from app.core.logger import get_logger
+from app.datamodels.post_datamodels import Post
+from app.datamodels.interaction_datamodels import PostInteraction
+
+logger = get_logger(__name__)
+
+# Half-life of a single interaction's contribution, per timeframe
+TIMEFRAMES: Dict[str, timedelta] = {
+    "day": timedelta(hours=6),
+    "week": timedelta(hours=36),
+    "month": timedelta(days=5),
+}
+DEFAULT_TIMEFRAME = "week"
+
+# How much one interaction moves a post's score
+INTERACTION_WEIGHTS: Dict[str, float] = {
+    "post": 1.0,
+    "view": 0.1,
+    "like": 1.0,
+    "dislike": -0.5,
+    "save": 2.0,
+    "share": 3.0,
+    "comment": 2.0,
+    "report": -2.0,
+}
+
+# Scores grow as 2^(age/half_life) from the landmark; rescale well before
+# they lose float precision
+RESCALE_AFTER_HALF_LIVES = 30
+# Members kept per sorted set after a rescale
+MAX_MEMBERS = 5000
+# Anything below this after a rescale has decayed out of contention
+MIN_SCORE = 0.01
+
+# Read each timeframe's landmark and add the decayed weight in one step, so an
+# increment is never computed against a landmark a rescale has since moved.
+# KEYS: categories set, then per timeframe its landmark, global set and (with a
+#       category) category set
+# ARGV: post_id, now, event time, weight, category_id or '', then the half-life
+#       in seconds per timeframe
+# Returns the landmark per timeframe
+_RECORD_SCRIPT = """
+local post_id, category_id = ARGV[1], ARGV[5]
+local ts, weight = tonumber(ARGV[3]), tonumber(ARGV[4])
+local step = 2
+if category_id ~= '' then
+    step = 3
+end
+local landmarks = {}
+for i = 6, #ARGV do
+    local base = 2 + (i - 6) * step
+    local landmark = redis.call('GET', KEYS[base])
+    if not landmark then
+        landmark = ARGV[2]
+        redis.call('SET', KEYS[base], landmark)
+    end
+    local increment = string.format('%.17g', weight * math.pow(2, (ts - tonumber(landmark)) / tonumber(ARGV[i])))
+    redis.call('ZINCRBY', KEYS[base + 1], increment, post_id)
+    if step == 3 then
+        redis.call('ZINCRBY', KEYS[base + 2], increment, post_id)
+    end
+    landmarks[#landmarks + 1] = landmark
+end
+if category_id ~= '' then
+    redis.call('SADD', KEYS[1], category_id)
+end
+return landmarks
+"""
+
+# Scale a timeframe's sets down to a new landmark and move the landmark, as
+# one step with respect to _RECORD_SCRIPT. Re-checks the age so only the
+# first of several concurrent callers rescales.
+# KEYS: landmark, categories set
+# ARGV: now, half-life in seconds, RESCALE_AFTER_HALF_LIVES, MIN_SCORE,
+#       MAX_MEMBERS, global set key, category set key prefix
+# Returns the number of sets rescaled
+_RESCALE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local landmark = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+local half_lives = (now - landmark) / tonumber(ARGV[2])
+if half_lives < tonumber(ARGV[3]) then
+    return 0
+end
+local factor = string.format('%.17g', math.pow(2, -half_lives))
+local keys = {ARGV[6]}
+for _, category_id in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    keys[#keys + 1] = ARGV[7] .. category_id
+end
+for _, key in ipairs(keys) do
+    redis.call('ZUNIONSTORE', key, 1, key, 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', ARGV[4])
+    redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[5]) + 1))
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return #keys
+"""
+
+
+class TrendingService:
+    """
+    Forward-decayed trending scores kept in Redis sorted sets.
+
+    Each interaction adds weight * 2^((t - landmark) / half_life) to the post's
+    score, so older interactions are worth exponentially less relative to new
+    ones without ever rewriting existing scores. When the landmark gets old the
+    whole set is rescaled with a single ZUNIONSTORE. Both run as Lua scripts
+    so an increment always uses the landmark its set is currently scaled to.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self.prefix = "trending:"
+        self.categories_key = f"{self.prefix}categories"
+        self._record_script = None
+        self._rescale_script = None
+
+    @staticmethod
+    def normalize_timeframe(timeframe: Optional[str]) -> str:
+        return timeframe if timeframe in TIMEFRAMES else DEFAULT_TIMEFRAME
+
+    def _key(self, timeframe: str, category_id: Optional[int] = None) -> str:
+        if category_id is None:
+            return f"{self.prefix}{timeframe}"
+        return f"{self.prefix}{timeframe}:category:{category_id}"
+
+    def _landmark_key(self, timeframe: str) -> str:
+        return f"{self.prefix}{timeframe}:landmark"
+
+    @staticmethod
+    def _decay(ts: float, landmark: float, half_life: timedelta) -> float:
+        return math.pow(2.0, (ts - landmark) / half_life.total_seconds())
+
+    async def record_interaction(
+            self,
+            post_id: int,
+            interaction_type: str,
+            action: str = "added",
+            category_id: Optional[int] = None,
+            at: Optional[datetime] = None
+    ) -> None:
+        """
+        Apply one interaction to every timeframe's global and category sets
+
+        Args:
+            post_id: ID of the post
+            interaction_type: Key of INTERACTION_WEIGHTS
+            action: "added"/"add" adds the weight, "removed"/"remove" subtracts it
+            category_id: Category of the post, if known
+            at: Event time (default: now)
+        """
+        weight = INTERACTION_WEIGHTS.get(interaction_type)
+        if not weight:
+            return
+        if action in ("removed", "remove"):
+            weight = -weight
+
+        try:
+            now = time.time()
+            ts = at.replace(tzinfo=at.tzinfo or timezone.utc).timestamp() if at else now
+            keys = [self.categories_key]
+            for tf in TIMEFRAMES:
+                keys.extend((self._landmark_key(tf), self._key(tf)))
+                if category_id is not None:
+                    keys.append(self._key(tf, category_id))
+            args = [post_id, repr(now), repr(ts), repr(weight), "" if category_id is None else category_id]
+            args.extend(half_life.total_seconds() for half_life in TIMEFRAMES.values())
+
+            if self._record_script is None:
+                self._record_script = self.cache.redis.register_script(_RECORD_SCRIPT)
+            landmarks = await self._record_script(keys=keys, args=args)
+
+            await self._maybe_rescale(dict(zip(TIMEFRAMES, (float(value) for value in landmarks))))
+        except Exception as e:
+            logger.error("Error updating trending score for post %s: %s", post_id, e)
+            # Don't raise - trending should not block main functionality
+
+    async def remove_post(self, post_id: int, category_id: Optional[int] = None) -> None:
+        """Drop a post from every trending set (e.g. after deletion)"""
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            for tf in TIMEFRAMES:
+                pipe.zrem(self._key(tf), str(post_id))
+                if category_id is not None:
+                    pipe.zrem(self._key(tf, category_id), str(post_id))
+            await pipe.execute()
+        except Exception as e:
+            logger.error("Error removing post %s from trending: %s", post_id, e)
+
+    async def _maybe_rescale(self, landmarks: Dict[str, float]) -> None:
+        """Move a timeframe's landmark forward once its scores grow too large"""
+        now = time.time()
+        for tf, half_life in TIMEFRAMES.items():
+            if (now - landmarks[tf]) / half_life.total_seconds() < RESCALE_AFTER_HALF_LIVES:
+                continue
+
+            if self._rescale_script is None:
+                self._rescale_script = self.cache.redis.register_script(_RESCALE_SCRIPT)
+            rescaled = await self._rescale_script(
+                keys=[self._landmark_key(tf), self.categories_key],
+                args=[repr(now), half_life.total_seconds(), RESCALE_AFTER_HALF_LIVES, MIN_SCORE,
+                      MAX_MEMBERS, self._key(tf), f"{self._key(tf)}:category:"]
+            )
+            if rescaled:
+                logger.info("Rescaled trending:%s (%s sets) to landmark %.0f", tf, rescaled, now)
+
+    async def get_trending_scores(
+            self,
+            timeframe: str = DEFAULT_TIMEFRAME,
+            category_id: Optional[int] = None,
+            offset: int = 0,
+            limit: int = 20
+    ) -> List[Tuple[int, float]]:
+        """(post_id, score) for the highest scoring posts, best first"""
+        timeframe = self.normalize_timeframe(timeframe)
+        try:
+            rows = await self.cache.redis.zrevrangebyscore(
+                self._key(timeframe, category_id), "+inf", 0,
+                start=offset, num=limit, withscores=True
+            )
+            return [(int(post_id), score) for post_id, score in rows]
+        except Exception as e:
+            logger.error("Error reading trending:%s: %s", timeframe, e)
+            return []
+
+    async def get_trending_post_ids(
+            self,
+            timeframe: str = DEFAULT_TIMEFRAME,
+            category_id: Optional[int] = None,
+            offset: int = 0,
+            limit: int = 20
+    ) -> List[int]:
+        """Highest scoring post ids for a timeframe, optionally within a category"""
+        scores = await self.get_trending_scores(timeframe, category_id, offset, limit)
+        return [post_id for post_id, _ in scores]
+
+    async def is_empty(self, timeframe: str = DEFAULT_TIMEFRAME) -> bool:
+        try:
+            return await self.cache.redis.zcard(self._key(self.normalize_timeframe(timeframe))) == 0
+        except Exception as e:
+            logger.error("Error checking trending:%s: %s", timeframe, e)
+            return False
+
+    async def rebuild_if_empty(self, db: Session, timeframe: str = DEFAULT_TIMEFRAME) -> bool:
+        """
+        Rebuild from the database when the sets are empty (cold start / Redis
+        flush). Single-flight across workers: only the holder of the rebuild
+        lock scans; concurrent callers return False and serve what is there.
+        """
+        if not await self.is_empty(timeframe):
+            return False
+        lock_key = f"{self.prefix}rebuild_lock"
+        try:
+            if not await self.cache.redis.set(lock_key, "1", nx=True, ex=300):
+                return False
+        except Exception as e:
+            logger.error("Error taking trending rebuild lock: %s", e)
+            return False
+        try:
+            # Another worker may have finished between the check and the lock
+            if not await self.is_empty(timeframe):
+                return False
+            await self.rebuild_from_db(db)
+            return True
+        finally:
+            await self.cache.redis.delete(lock_key)
+
+    async def rebuild_from_db(self, db: Session, timeframe: Optional[str] = None) -> int:
+        """
+        Recompute trending sets from post_interactions (cold start / Redis flush)
+
+        Interactions are aggregated per post, type and hour in SQL so the rebuild
+        reads a bounded number of rows regardless of interaction volume.
+
+        Returns:
+            Number of posts scored
+        """
+        timeframes = [self.normalize_timeframe(timeframe)] if timeframe else list(TIMEFRAMES)
+        now = time.time()
+        # Anything older than ~20 half-lives contributes nothing measurable
+        horizon = max(TIMEFRAMES[tf] for tf in timeframes) * 20
+        since = datetime.now(timezone.utc) - horizon
+
+        hour = func.date_trunc("hour", PostInteraction.created_at)
+        interaction_rows = (
+            db.query(
+                PostInteraction.post_id,
+                Post.category_id,
+                PostInteraction.interaction_type_id,
+                hour.label("hour"),
+                func.count(PostInteraction.interaction_id)
+            )
+            .join(Post, Post.post_id == PostInteraction.post_id)
+            .filter(PostInteraction.created_at >= since, Post.status == "active")
+            .group_by(PostInteraction.post_id, Post.category_id,
+                      PostInteraction.interaction_type_id, hour)
+            .all()
+        )
+        post_rows = (
+            db.query(Post.post_id, Post.category_id, Post.created_at, Post.comment_count)
+            .filter(Post.created_at >= since, Post.status == "active")
+            .all()
+        )
+
+        types = get_interaction_types()
+        events = [
+            (post_id, category_id, types.name(type_id), bucket, count)
+            for post_id, category_id, type_id, bucket, count in interaction_rows
+        ]
+        # Comments aren't stored as post interactions; attribute them to creation time
+        for post_id, category_id, created_at, comment_count in post_rows:
+            events.append((post_id, category_id, "post", created_at, 1))
+            if comment_count:
+                events.append((post_id, category_id, "comment", created_at, comment_count))
+
+        scored = set()
+        for tf in timeframes:
+            half_life = TIMEFRAMES[tf]
+            scores: Dict[Optional[int], Dict[str, float]] = {}
+            for post_id, category_id, name, at, count in events:
+                weight = INTERACTION_WEIGHTS.get(name, 0.0)
+                if not weight or at is None:
+                    continue
+                ts = at.replace(tzinfo=at.tzinfo or timezone.utc).timestamp()
+                value = weight * count * self._decay(ts, now, half_life)
+                for key in (None, category_id):
+                    bucket = scores.setdefault(key, {})
+                    bucket[str(post_id)] = bucket.get(str(post_id), 0.0) + value
+                scored.add(post_id)
+
+            pipe = self.cache.redis.pipeline(transaction=True)
+            pipe.delete(self._key(tf))
+            for category_id in await self.cache.redis.smembers(self.categories_key):
+                pipe.delete(self._key(tf, int(category_id)))
+            for category_id, members in scores.items():
+                members = {k: v for k, v in members.items() if v > 0}
+                if not members:
+                    continue
+                pipe.zadd(self._key(tf, category_id), members)
+                if category_id is not None:
+                    pipe.sadd(self.categories_key, category_id)
+            pipe.set(self._landmark_key(tf), now)
+            await pipe.execute()
+
+        logger.info("Rebuilt trending sets %s for %s posts", timeframes, len(scored))
+        return len(scored)
+
+
+# Singleton instance
+_trending_service: Optional[TrendingService] = None
+
+
+def get_trending_service(cache: RedisCache) -> TrendingService:
+    """Get or create TrendingService instance"""
+    global _trending_service
+    if _trending_service is None:
+        _trending_service = TrendingService(cache)
+    return _trending_service
@@ -0,0 +1,140 @@
+# app/services/upload_service.py
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+IMAGE_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "gif", "webp"})
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_upload_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running loop
+    global _upload_semaphore
+    if _upload_semaphore is None:
+        _upload_semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+    return _upload_semaphore
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    url: str
+    path: str
+    sha256: str
+    size: int
+    extension: str
+    deduplicated: bool
+
+
+def upload_extension(file: UploadFile, allowed: Iterable[str] = IMAGE_EXTENSIONS) -> Optional[str]:
+    """Lower-cased extension if the upload has an allowed one"""
+    if not file.filename or "." not in file.filename:
+        return None
+    extension = file.filename.rsplit(".", 1)[-1].lower()
+    return extension if extension in allowed else None
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _reuse(path: str) -> bool:
+    """Refresh the mtime of an identical stored file; False if there is none"""
+    try:
+        # A fresh mtime keeps the media GC's orphan sweep off a file that is
+        # about to get a media_blobs row
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+async def store_upload(
+        file: UploadFile,
+        directory: str,
+        url_prefix: str,
+        allowed_extensions: Iterable[str] = IMAGE_EXTENSIONS,
+        max_bytes: Optional[int] = None,
+        shard: bool = False
+) -> StoredUpload:
+    """
+    Stream an upload to `directory` under its content hash.
+
+    Chunks go to a temp file in the target directory (so the final rename is
+    atomic) while the size limit is enforced and the SHA-256 computed; an
+    identical file that is already stored is reused. With shard=True the file
+    lands in `ab/cd/<sha256>.<ext>` below directory (and url_prefix). At most
+    UPLOAD_CONCURRENCY uploads are written at once per process.
+    """
+    extension = upload_extension(file, allowed_extensions)
+    if extension is None:
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    declared_size = getattr(file, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds {max_bytes} bytes")
+
+    async with _get_semaphore():
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+        os.close(fd)
+
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(temp_path, "wb") as out_file:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(status_code=413, detail=f"File exceeds {max_bytes} bytes")
+                    hasher.update(chunk)
+                    await out_file.write(chunk)
+
+            if size == 0:
+                raise HTTPException(status_code=400, detail="Empty file")
+
+            digest = hasher.hexdigest()
+            filename = f"{digest}.{extension}"
+            if shard:
+                filename = f"{digest[:2]}/{digest[2:4]}/{filename}"
+                await asyncio.to_thread(
+                    os.makedirs, os.path.join(directory, digest[:2], digest[2:4]), exist_ok=True
+                )
+            final_path = os.path.join(directory, *filename.split("/"))
+            deduplicated = await asyncio.to_thread(_reuse, final_path)
+            if deduplicated:
+                await asyncio.to_thread(_discard, temp_path)
+            else:
+                await asyncio.to_thread(os.replace, temp_path, final_path)
+        except BaseException:
+            await asyncio.to_thread(_discard, temp_path)
+            raise
+
+    logger.debug("Stored upload %s (%s bytes%s)", filename, size, ', deduplicated' if deduplicated else '')
+    return StoredUpload(
+        url=f"{url_prefix.rstrip('/')}/{filename}",
+        path=final_path,
+        sha256=digest,
+        size=size,
+        extension=extension,
+        deduplicated=deduplicated
+    )
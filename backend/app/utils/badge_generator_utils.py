@@ -2,6 +2,9 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
 from pathlib import Path
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 def generate_badge_icon(category_name, threshold, is_merit, output_dir="static/badges"):
@@ -141,4 +144,4 @@ if __name__ == "__main__":
     for category in demerit_categories:
         generate_all_badge_icons([(category, False)])
 
-    print("✅ All badge icons generated successfully")
\ No newline at end of file
+    logger.info("All badge icons generated successfully")
\ No newline at end of file
@@ -152,12 +152,10 @@ async def init_badges(generate_icons=True, output_dir="static/badges"):
 
         db.commit()
         logger.info("✅ Badges initialized successfully")
-        print("✅ Badges initialized successfully")
 
     except Exception as e:
         db.rollback()
         logger.error(f"❌ Error initializing badges: {str(e)}")
-        print(f"❌ Error initializing badges: {str(e)}")
     finally:
         db.close()
 
@@ -203,7 +201,7 @@ async def _process_badge_categories(db, categories, is_merit, generate_icons, ou
                             output_dir
                         )
                     except Exception as e:
-                        logger.warning(f"Could not generate icon for {badge_data['badge_name']}: {str(e)}")
+                        logger.warning("Could not generate icon for %s: %s", badge_data['badge_name'], e)
 
                 # Create badge in database
                 badge = Badge(
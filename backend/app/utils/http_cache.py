@@ -0,0 +1,131 @@
+# utils/http_cache.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, Optional
+
+from fastapi import Request, Response
+
+from app.core.cache import get_redis
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Personalized responses: the browser keeps a copy but revalidates every time
+PRIVATE_REVALIDATE = "private, no-cache"
+# Shared reference data (categories etc.)
+PUBLIC_SHORT = "public, max-age=300, stale-while-revalidate=60"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from the content versions that make up a representation"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x"
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime] = None) -> bool:
+    """RFC 9110 evaluation: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return bool(etag) and _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def set_validators(
+        response: Response,
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        cache_control: str = PRIVATE_REVALIDATE
+) -> Response:
+    if etag:
+        response.headers["ETag"] = etag
+    if last_modified:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        response.headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    response.headers["Cache-Control"] = cache_control
+    if cache_control.startswith("private"):
+        response.headers["Vary"] = "Authorization"
+    return response
+
+
+def not_modified_response(
+        request: Request,
+        etag: Optional[str],
+        last_modified: Optional[datetime] = None,
+        cache_control: str = PRIVATE_REVALIDATE
+) -> Optional[Response]:
+    """A 304 carrying the validators if the client's copy is current, else None"""
+    if not is_not_modified(request, etag, last_modified):
+        return None
+    return set_validators(Response(status_code=304), etag, last_modified, cache_control)
+
+
+def version_key(name: str) -> str:
+    """Redis key of a content version counter"""
+    return f"version:{name}"
+
+
+async def get_version(name: str) -> Optional[int]:
+    """
+    Current value of a content version counter (0 if never bumped).
+
+    None when Redis is unavailable: bumps can't be seen then, so callers must
+    not emit an ETag derived from it.
+    """
+    try:
+        redis = await get_redis()
+        if not redis:
+            return None
+        return int(await redis.get(version_key(name)) or 0)
+    except Exception as e:
+        logger.error("Error reading version %s: %s", name, e)
+        return None
+
+
+async def get_versions(names: List[str]) -> Optional[List[int]]:
+    """Several version counters with one MGET; None when Redis is unavailable"""
+    if not names:
+        return []
+    try:
+        redis = await get_redis()
+        if not redis:
+            return None
+        return [int(value or 0) for value in await redis.mget([version_key(name) for name in names])]
+    except Exception as e:
+        logger.error("Error reading versions: %s", e)
+        return None
+
+
+async def bump_version(name: str) -> None:
+    """Invalidate every ETag derived from this counter"""
+    try:
+        redis = await get_redis()
+        if redis:
+            await redis.incr(version_key(name))
+    except Exception as e:
+        logger.error("Error bumping version %s: %s", name, e)
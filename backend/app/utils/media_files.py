@@ -0,0 +1,193 @@
+# utils/media_files.py
+"""
+File responses for /media: Range requests, conditional GET and optional
+X-Accel-Redirect / X-Sendfile hand-off to a front proxy.
+
+Content-addressed files (named by their SHA-256) never change, so their
+path lookup and stat are cached for the life of the process and they are
+sent with `Cache-Control: immutable`.
+"""
+import mimetypes
+import os
+import re
+import stat as stat_module
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, NamedTuple, Optional, Tuple
+
+import aiofiles
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.utils.http_cache import is_not_modified, set_validators
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# <sha256>.<ext> or <sha256>-<variant>.<ext>
+_HASHED_NAME = re.compile(r"^([0-9a-f]{64}(?:-\w+)?)\.\w+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class MediaFile(NamedTuple):
+    path: str
+    relative_path: str
+    size: int
+    mtime: float
+    etag: str
+    immutable: bool
+
+
+@lru_cache(maxsize=8192)
+def _resolve(url_path: str) -> Optional[Tuple[str, str]]:
+    """(absolute, root-relative) path for a URL path, None if it escapes MEDIA_ROOT"""
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(root, url_path))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path, os.path.relpath(path, root)
+
+
+def _stat_file(path: str) -> Optional[Tuple[int, float]]:
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    if not stat_module.S_ISREG(stat.st_mode):
+        return None
+    return stat.st_size, stat.st_mtime
+
+
+@lru_cache(maxsize=8192)
+def _stat_immutable(path: str) -> Tuple[int, float]:
+    result = _stat_file(path)
+    if result is None:
+        raise FileNotFoundError(path)
+    return result
+
+
+def lookup_media(url_path: str) -> Optional[MediaFile]:
+    """Resolve and stat the file behind /media/<url_path>; None if it doesn't exist"""
+    resolved = _resolve(url_path.lstrip("/"))
+    if resolved is None:
+        return None
+    path, relative_path = resolved
+
+    match = _HASHED_NAME.match(os.path.basename(path))
+    if match:
+        try:
+            size, mtime = _stat_immutable(path)
+        except FileNotFoundError:
+            return None
+    else:
+        result = _stat_file(path)
+        if result is None:
+            return None
+        size, mtime = result
+
+    if match:
+        etag = f'"{match.group(1)}"'
+    else:
+        etag = f'"{int(mtime * 1000):x}-{size:x}"'
+    return MediaFile(path, relative_path, size, mtime, etag, bool(match))
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single byte range.
+
+    Returns None for headers we answer with the full body (multiple ranges,
+    other units); raises 416 for unsatisfiable ranges.
+    """
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+async def _read_range(file, start: int, length: int) -> AsyncIterator[bytes]:
+    try:
+        await file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await file.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await file.close()
+
+
+async def media_response(request: Request, media: MediaFile) -> Response:
+    """200, 206, 304 or a proxy hand-off for a resolved media file"""
+    last_modified = datetime.fromtimestamp(media.mtime, tz=timezone.utc)
+    cache_control = IMMUTABLE if media.immutable else f"public, max-age={settings.MEDIA_CACHE_SECONDS}"
+    content_type = mimetypes.guess_type(media.path)[0] or "application/octet-stream"
+
+    if is_not_modified(request, media.etag, last_modified):
+        return set_validators(Response(status_code=304), media.etag, last_modified, cache_control)
+
+    mode = settings.MEDIA_SENDFILE_MODE.lower()
+    if mode in ("x-accel-redirect", "x-sendfile"):
+        # The proxy streams the file (and answers Range) itself
+        response = Response(media_type=content_type)
+        if mode == "x-accel-redirect":
+            response.headers["X-Accel-Redirect"] = f"{settings.MEDIA_ACCEL_PREFIX.rstrip('/')}/{media.relative_path}"
+        else:
+            response.headers["X-Sendfile"] = media.path
+        return set_validators(response, media.etag, last_modified, cache_control)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.method == "GET":
+        # If-Range: only honour the range if the client's copy is current
+        if_range = request.headers.get("if-range")
+        if not if_range or if_range.strip() == media.etag:
+            byte_range = _parse_range(range_header, media.size)
+
+    headers = {"Accept-Ranges": "bytes"}
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{media.size}"
+        status_code = 206
+    else:
+        start, length = 0, media.size
+        status_code = 200
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        response = Response(status_code=status_code, media_type=content_type, headers=headers)
+    else:
+        try:
+            # Opened before the status line goes out so a vanished file is a 404
+            file = await aiofiles.open(media.path, "rb")
+        except FileNotFoundError:
+            # Deleted since its stat was cached (media-gc)
+            _stat_immutable.cache_clear()
+            raise HTTPException(status_code=404, detail="File not found")
+        response = StreamingResponse(
+            _read_range(file, start, length),
+            status_code=status_code,
+            media_type=content_type,
+            headers=headers
+        )
+    return set_validators(response, media.etag, last_modified, cache_control)
@@ -5,6 +5,7 @@ import json
 import asyncio
 from datetime import datetime
 from asyncio import Queue, CancelledError
+from app.core.instrumentation import WEBSOCKET_CONNECTIONS
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +21,15 @@ class PubSub:
             if channel not in self._subscribers:
                 self._subscribers[channel] = set()
             self._subscribers[channel].add(queue)
+        WEBSOCKET_CONNECTIONS.labels("subscription").inc()
         return queue
 
     async def unsubscribe(self, channel: str, queue: Queue) -> None:
         async with self._lock:
-            if channel in self._subscribers:
+            if queue in self._subscribers.get(channel, ()):
                 self._subscribers[channel].discard(queue)
+                WEBSOCKET_CONNECTIONS.labels("subscription").dec()
+            if channel in self._subscribers:
                 if not self._subscribers[channel]:
                     del self._subscribers[channel]
 
@@ -64,13 +68,15 @@ class WebSocketManager:
             if post_id not in self.active_users:
                 self.active_users[post_id] = set()
 
-            self.active_connections[post_id].add(websocket)
+            if websocket not in self.active_connections[post_id]:
+                self.active_connections[post_id].add(websocket)
+                WEBSOCKET_CONNECTIONS.labels("post").inc()
 
             if user_id:
                 self.active_users[post_id].add(user_id)
                 await self._broadcast_user_count(post_id)
 
-            logger.info(f"Client connected to post {post_id}")
+            logger.debug("Client connected to post %s", post_id)
 
         except Exception as e:
             logger.error(f"Error in connect: {str(e)}")
@@ -86,7 +92,9 @@ class WebSocketManager:
     ) -> None:
         try:
             if post_id in self.active_connections:
-                self.active_connections[post_id].discard(websocket)
+                if websocket in self.active_connections[post_id]:
+                    self.active_connections[post_id].discard(websocket)
+                    WEBSOCKET_CONNECTIONS.labels("post").dec()
 
                 if user_id:
                     self.active_users[post_id].discard(user_id)
@@ -97,7 +105,7 @@ class WebSocketManager:
                     if post_id in self.active_users:
                         del self.active_users[post_id]
 
-            logger.info(f"Client disconnected from post {post_id}")
+            logger.debug("Client disconnected from post %s", post_id)
 
         except Exception as e:
             logger.error(f"Error in disconnect: {str(e)}")
@@ -136,6 +144,7 @@ class WebSocketManager:
         # Clean up failed connections
         for conn in disconnected:
             self.active_connections[post_id].discard(conn)
+            WEBSOCKET_CONNECTIONS.labels("post").dec()
 
     async def subscribe(
             self,
@@ -152,7 +161,7 @@ class WebSocketManager:
                 queue.task_done()
         except CancelledError:
             await self.pubsub.unsubscribe(channel, queue)
-            logger.info(f"Subscription cancelled for {channel}")
+            logger.debug("Subscription cancelled for %s", channel)
             raise
         except Exception as e:
             await self.pubsub.unsubscribe(channel, queue)
@@ -36,7 +36,7 @@ class WebSocketManager:
                 self.active_users[post_id].add(user_id)
                 await self._broadcast_user_count(post_id)
 
-            logger.info(f"Client connected to post {post_id}")
+            logger.debug("Client connected to post %s", post_id)
 
         except Exception as e:
             logger.error(f"Error in connect: {str(e)}")
@@ -63,7 +63,7 @@ class WebSocketManager:
                     if post_id in self.active_users:
                         del self.active_users[post_id]
 
-            logger.info(f"Client disconnected from post {post_id}")
+            logger.debug("Client disconnected from post %s", post_id)
 
         except Exception as e:
             logger.error(f"Error in disconnect: {str(e)}")
@@ -113,7 +113,7 @@ class WebSocketManager:
                 async for message in subscriber:
                     yield message
             except asyncio.CancelledError:
-                logger.info(f"Subscription cancelled for {post_id}:{event}")
+                logger.debug("Subscription cancelled for %s:%s", post_id, event)
                 raise
 
     async def publish(
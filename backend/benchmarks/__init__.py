@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Microbenchmarks and load tests; see benchmarks/README.md"""
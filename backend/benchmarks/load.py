@@ -0,0 +1,257 @@
+# benchmarks/load.py
+"""
+Async HTTP/WebSocket load driver for a running backend.
+
+Closed-loop workers, each logged in as a different synthetic user, pick a
+scenario per request (weighted by --mix) for --duration seconds:
+
+    feed      GET  /posts/?limit=20
+    post      GET  /posts/{post_id}
+    like      POST /posts/engagement/{post_id}/like
+    save      POST /posts/engagement/{post_id}/save
+    comments  POST /graphql  { comments(postId: ...) }
+
+`--websocket-listeners N` additionally opens N sockets on /ws/post/{id}
+while one sender publishes --websocket-rate messages per second, and
+reports delivery (fan-out) latency.
+
+    python -m benchmarks.load --base-url http://localhost:8000 --concurrency 32 \\
+        --duration 60 --mix feed=5,post=3,like=1,save=1,comments=2 --output load.json
+    python -m benchmarks.load ... --compare load.json
+
+Needs `pip install -r benchmarks/requirements.txt` and a dataset from
+`python -m app.cli seed-synthetic`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.stats import Recorder, build_report, load_baseline, print_table, write_report
+
+SYNTHETIC_PASSWORD = "bench-password"
+SYNTHETIC_EMAIL = "bench_user_{}@example.test"
+
+COMMENTS_QUERY = """
+query BenchComments($postId: Int!) {
+  comments(postId: $postId, pageSize: 20) {
+    commentId content username depth
+    metrics { likeCount dislikeCount replyCount }
+  }
+}
+"""
+
+
+def parse_mix(raw: str) -> Dict[str, int]:
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return mix
+
+
+async def _feed(client: httpx.AsyncClient, rng: random.Random, post_ids: List[int]) -> httpx.Response:
+    return await client.get("/posts/", params={"limit": 20, "skip": 20 * rng.randint(0, 4)})
+
+
+async def _post(client: httpx.AsyncClient, rng: random.Random, post_ids: List[int]) -> httpx.Response:
+    return await client.get(f"/posts/{rng.choice(post_ids)}")
+
+
+async def _like(client: httpx.AsyncClient, rng: random.Random, post_ids: List[int]) -> httpx.Response:
+    return await client.post(f"/posts/engagement/{rng.choice(post_ids)}/like")
+
+
+async def _save(client: httpx.AsyncClient, rng: random.Random, post_ids: List[int]) -> httpx.Response:
+    return await client.post(f"/posts/engagement/{rng.choice(post_ids)}/save")
+
+
+async def _comments(client: httpx.AsyncClient, rng: random.Random, post_ids: List[int]) -> httpx.Response:
+    response = await client.post("/graphql", json={
+        "query": COMMENTS_QUERY,
+        "variables": {"postId": rng.choice(post_ids)},
+    })
+    if response.status_code == 200 and response.json().get("errors"):
+        # GraphQL reports resolver failures with a 200
+        response.status_code = 500
+    return response
+
+
+SCENARIOS = {
+    "feed": _feed,
+    "post": _post,
+    "like": _like,
+    "save": _save,
+    "comments": _comments,
+}
+
+
+async def login(client: httpx.AsyncClient, index: int) -> Optional[str]:
+    response = await client.post("/auth/login", json={
+        "email": SYNTHETIC_EMAIL.format(index),
+        "password": SYNTHETIC_PASSWORD,
+    })
+    if response.status_code != 200:
+        return None
+    return response.json()["access_token"]
+
+
+async def fetch_post_ids(client: httpx.AsyncClient, pages: int = 10) -> List[int]:
+    post_ids = []
+    for page in range(pages):
+        response = await client.get("/posts/", params={"limit": 50, "skip": page * 50})
+        response.raise_for_status()
+        posts = response.json().get("data", {}).get("posts", [])
+        if not posts:
+            break
+        post_ids.extend(post["post_id"] for post in posts)
+    return post_ids
+
+
+async def http_worker(
+        client: httpx.AsyncClient,
+        rng: random.Random,
+        mix: Dict[str, int],
+        post_ids: List[int],
+        recorders: Dict[str, Recorder],
+        deadline: float
+) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await SCENARIOS[name](client, rng, post_ids)
+            if response.status_code >= 400:
+                recorders[name].errors += 1
+            else:
+                recorders[name].add(time.perf_counter() - start)
+        except httpx.HTTPError:
+            recorders[name].errors += 1
+
+
+async def websocket_fanout(
+        ws_url: str,
+        post_id: int,
+        listeners: int,
+        rate: float,
+        duration: float,
+        recorder: Recorder
+) -> None:
+    import websockets
+
+    url = f"{ws_url}/ws/post/{post_id}"
+    sockets = [await websockets.connect(url) for _ in range(listeners)]
+    sender = await websockets.connect(url)
+    expected = 0
+
+    async def listen(socket) -> None:
+        try:
+            async for raw in socket:
+                message = json.loads(raw)
+                if message.get("type") == "bench":
+                    recorder.add(time.time() - message["sent_at"])
+        except websockets.ConnectionClosed:
+            pass
+
+    tasks = [asyncio.create_task(listen(socket)) for socket in sockets + [sender]]
+    deadline = time.perf_counter() + duration
+    seq = 0
+    while time.perf_counter() < deadline:
+        await sender.send(json.dumps({"type": "bench", "seq": seq, "sent_at": time.time()}))
+        seq += 1
+        expected += listeners + 1
+        await asyncio.sleep(1 / rate)
+
+    await asyncio.sleep(1)  # let in-flight deliveries land
+    for socket in sockets + [sender]:
+        await socket.close()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    recorder.errors = max(expected - len(recorder.samples), 0)
+    recorder.extra["messages_sent"] = seq
+
+
+async def run(args) -> Dict[str, dict]:
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as anonymous:
+        post_ids = await fetch_post_ids(anonymous)
+        if not post_ids:
+            raise SystemExit("No posts; run `python -m app.cli seed-synthetic` first")
+        tokens = await asyncio.gather(*(login(anonymous, i) for i in range(args.concurrency)))
+
+    clients = [
+        httpx.AsyncClient(
+            base_url=args.base_url,
+            timeout=args.timeout,
+            limits=limits,
+            headers={"Authorization": f"Bearer {token}"} if token else {},
+        )
+        for token in tokens
+    ]
+    recorders = {name: Recorder(name) for name in mix}
+    rng = random.Random(args.seed)
+    tasks = []
+    try:
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(http_worker(
+                client, random.Random(rng.random()), mix, post_ids, recorders, deadline
+            ))
+            for client in clients
+        ]
+        ws_recorder = None
+        if args.websocket_listeners:
+            ws_recorder = Recorder("websocket_fanout")
+            ws_url = args.base_url.replace("http", "ws", 1)
+            tasks.append(asyncio.create_task(websocket_fanout(
+                ws_url, post_ids[0], args.websocket_listeners, args.websocket_rate, args.duration, ws_recorder
+            )))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    finally:
+        for client in clients:
+            await client.aclose()
+
+    results = {name: recorder.summary(elapsed) for name, recorder in recorders.items()}
+    all_requests = Recorder("total", [s for r in recorders.values() for s in r.samples],
+                            sum(r.errors for r in recorders.values()))
+    results["total"] = all_requests.summary(elapsed)
+    if ws_recorder is not None:
+        results["websocket_fanout"] = ws_recorder.summary(elapsed)
+    results["total"]["logged_in_workers"] = sum(1 for token in tokens if token)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--mix", default="feed=5,post=3,like=1,save=1,comments=2")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--websocket-listeners", type=int, default=0)
+    parser.add_argument("--websocket-rate", type=float, default=20.0, help="Messages per second")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --output")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print_table(results, load_baseline(args.compare))
+    if args.output:
+        write_report(args.output, build_report("load", results, vars(args)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+# benchmarks/micro.py
+"""
+Service-level microbenchmarks: call the functions behind the hot endpoints
+directly (no HTTP) against the configured Postgres/Redis, and report latency
+percentiles plus SQL statements per call.
+
+    python -m benchmarks.micro --iterations 200 --output micro.json
+    python -m benchmarks.micro --compare micro.json
+
+Run from the backend directory after `python -m app.cli seed-synthetic`.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import func
+
+from benchmarks.stats import Recorder, build_report, load_baseline, print_table, write_report
+
+
+def _scenarios(db, post_ids: List[int], user_ids: List[int], rng: random.Random) -> Dict[str, Callable[[], Awaitable]]:
+    from app.RedisCache import get_cache
+    from app.services import post_service
+    from app.services.author_cache import get_author_card_cache
+    from app.services.comment_service import CommentService
+
+    comments = CommentService(db)
+    authors = get_author_card_cache(get_cache())
+
+    return {
+        "get_all_posts": lambda: post_service.get_all_posts(db, limit=20, user_id=rng.choice(user_ids)),
+        "get_all_posts_anon": lambda: post_service.get_all_posts(db, limit=20),
+        "get_post_json": lambda: post_service.get_post_json(db, rng.choice(post_ids), rng.choice(user_ids)),
+        "get_posts_by_ids": lambda: post_service.get_posts_by_ids(
+            db, rng.sample(post_ids, min(20, len(post_ids))), rng.choice(user_ids)
+        ),
+        "get_user_posts": lambda: post_service.get_user_posts(db, rng.choice(user_ids)),
+        "get_comment_thread": lambda: comments.get_comment_thread(
+            rng.choice(post_ids), user_id=rng.choice(user_ids)
+        ),
+        "get_user_comments": lambda: comments.get_user_comments(rng.choice(user_ids)),
+        "author_cards": lambda: authors.get_many(db, rng.sample(user_ids, min(20, len(user_ids)))),
+    }
+
+
+async def run(iterations: int, warmup: int, selected: List[str], seed: int) -> Dict[str, dict]:
+    from database.database import SessionLocal
+    from app.core.cache import close_redis, init_redis
+    from app.core.catalog import reload_catalog
+    from app.core.interaction_types import reload_interaction_types
+    from app.core.query_budget import count_queries
+    from app.datamodels.comment_datamodels import Comment
+    from app.datamodels.post_datamodels import Post
+    from app.datamodels.user_datamodels import User
+
+    await init_redis()
+    await reload_interaction_types()
+    await reload_catalog()
+    db = SessionLocal()
+    rng = random.Random(seed)
+    results: Dict[str, dict] = {}
+    try:
+        # Posts that have comments, so thread benchmarks do real work
+        post_ids = [row[0] for row in db.query(Comment.post_id).group_by(Comment.post_id)
+                    .order_by(func.count().desc()).limit(500)]
+        post_ids = post_ids or [row[0] for row in db.query(Post.post_id).limit(500)]
+        user_ids = [row[0] for row in db.query(User.user_id).limit(500)]
+        if not post_ids or not user_ids:
+            raise SystemExit("No data; run `python -m app.cli seed-synthetic` first")
+
+        scenarios = _scenarios(db, post_ids, user_ids, rng)
+        for name in selected or list(scenarios):
+            call = scenarios[name]
+            for _ in range(warmup):
+                await call()
+            recorder = Recorder(name)
+            queries = 0
+            started = time.perf_counter()
+            for _ in range(iterations):
+                with count_queries() as counter:
+                    start = time.perf_counter()
+                    try:
+                        await call()
+                        recorder.add(time.perf_counter() - start)
+                    except Exception:
+                        recorder.errors += 1
+                        db.rollback()
+                queries += counter.count
+            recorder.extra["queries_per_call"] = round(queries / iterations, 2)
+            results[name] = recorder.summary(time.perf_counter() - started)
+    finally:
+        db.close()
+        await close_redis()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--scenario", action="append", default=[], help="Run only these (repeatable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --output")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.iterations, args.warmup, args.scenario, args.seed))
+    print_table(results, load_baseline(args.compare))
+    if args.output:
+        write_report(args.output, build_report("micro", results, vars(args)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
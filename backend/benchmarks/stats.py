@@ -0,0 +1,91 @@
+# benchmarks/stats.py
+"""Latency summaries shared by the micro and load benchmarks"""
+import json
+import math
+import platform
+import subprocess
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)) - 1, 0)
+    return sorted_samples[rank]
+
+
+@dataclass
+class Recorder:
+    """Latencies (seconds) and error count for one scenario"""
+    name: str
+    samples: List[float] = field(default_factory=list)
+    errors: int = 0
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.samples)
+        count = len(ordered)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+            **self.extra,
+        }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(kind: str, results: Dict[str, dict], params: dict) -> dict:
+    return {
+        "kind": kind,
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "params": params,
+        "results": results,
+    }
+
+
+def print_table(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    columns = ["count", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+    print(f"{'scenario':<24}" + "".join(f"{column:>16}" for column in columns))
+    for name, summary in results.items():
+        print(f"{name:<24}" + "".join(f"{summary.get(column, ''):>16}" for column in columns))
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for column in columns[2:]:
+                before, after = previous.get(column), summary.get(column)
+                if before:
+                    deltas.append(f"{(after - before) / before * 100:+.1f}%")
+                else:
+                    deltas.append("")
+            print(f"{'  vs baseline':<24}{'':>16}{'':>16}" + "".join(f"{delta:>16}" for delta in deltas))
+
+
+def write_report(path: str, report: dict) -> None:
+    with open(path, "w") as out_file:
+        json.dump(report, out_file, indent=2)
+
+
+def load_baseline(path: Optional[str]) -> Optional[Dict[str, dict]]:
+    if not path:
+        return None
+    with open(path) as in_file:
+        return json.load(in_file)["results"]
@@ -0,0 +1,65 @@
+# tests/test_author_cache.py
+import json
+
+import pytest
+
+from app.services.author_cache import AuthorCard, AuthorCardCache
+
+
+def _card(user_id: int, username: str) -> AuthorCard:
+    return AuthorCard(
+        user_id=user_id, username=username, avatar_img=None, reputation_score=5,
+        reputation_cat=None, expertise_area=None, worldview_ai=None, credentials=None,
+        created_at=None, updated_at=None
+    )
+
+
+@pytest.fixture
+def authors(fake_cache, monkeypatch):
+    cache = AuthorCardCache(fake_cache)
+    rows = {1: _card(1, "old")}
+    monkeypatch.setattr(cache, "_load", lambda db, user_ids: {u: rows[u] for u in user_ids if u in rows})
+    return cache, rows
+
+
+def test_loaded_cards_are_cached_in_redis(run, authors):
+    cache, _ = authors
+
+    assert run(cache.get(None, 1)).username == "old"
+    assert json.loads(run(cache.cache.redis.get(cache._key(1))))["username"] == "old"
+
+
+def test_read_racing_a_profile_change_does_not_restore_the_old_card(run, authors):
+    cache, rows = authors
+    other_worker = AuthorCardCache(cache.cache)
+    other_worker._load = cache._load
+    store = cache._store
+
+    async def profile_changes_then_store(loaded, versions):
+        # Another worker commits a new username and invalidates after this
+        # read loaded the old row, but before it writes the card back
+        rows[1] = _card(1, "new")
+        await other_worker.invalidate(1)
+        await store(loaded, versions)
+
+    cache._store = profile_changes_then_store
+
+    assert run(cache.get(None, 1)).username == "old"
+    assert run(cache.cache.redis.get(cache._key(1))) is None
+    assert run(other_worker.get(None, 1)).username == "new"
+
+
+def test_invalidate_drops_local_and_redis_copies(run, authors):
+    cache, rows = authors
+    run(cache.get(None, 1))
+    rows[1] = _card(1, "new")
+
+    run(cache.invalidate(1))
+
+    assert run(cache.cache.redis.get(cache._key(1))) is None
+    assert run(cache.get(None, 1)).username == "new"
+
+
+def test_cards_from_older_layouts_are_read(run):
+    raw = json.dumps({**json.loads(_card(1, "old").to_json()), "email": "a@example.test"})
+    assert AuthorCard.from_json(raw).username == "old"
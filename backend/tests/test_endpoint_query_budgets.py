@@ -0,0 +1,119 @@
+# tests/test_endpoint_query_budgets.py
+"""
+Query budgets for the feed, comment-thread and single-comment paths.
+
+These run against the development database and Redis and are skipped when
+either is down or nothing is seeded (`python -m app.cli seed-synthetic`).
+Each path is called once first so the interaction type registry, author
+cards, counts and interaction state are cached; the budgets are for the
+steady state, and must not grow with the page size.
+"""
+import pytest
+from sqlalchemy import func
+
+from app.datamodels.comment_datamodels import Comment
+from app.datamodels.post_datamodels import Post
+from app.datamodels.user_datamodels import User
+from app.services import post_service
+from app.services.comment_service import CommentService
+
+FEED_BUDGET = 4
+COMMENT_THREAD_BUDGET = 5
+COMMENT_BUDGET = 3
+
+
+@pytest.fixture
+def viewer_id(db):
+    user_id = db.query(User.user_id).order_by(User.user_id).limit(1).scalar()
+    if user_id is None:
+        pytest.skip("No users; run `python -m app.cli seed-synthetic` first")
+    return user_id
+
+
+@pytest.fixture
+def threaded_post_id(db):
+    """The post with the most replies"""
+    post_id = (
+        db.query(Comment.post_id)
+        .filter(Comment.parent_comment_id.isnot(None))
+        .group_by(Comment.post_id)
+        .order_by(func.count().desc())
+        .limit(1)
+        .scalar()
+    )
+    if post_id is None:
+        pytest.skip("No comment replies; run `python -m app.cli seed-synthetic` first")
+    return post_id
+
+
+@pytest.fixture
+def deepest_root_id(db):
+    """The top-level comment with the most replies below it"""
+    root_id = (
+        db.query(Comment.root_comment_id)
+        .filter(Comment.root_comment_id.isnot(None))
+        .group_by(Comment.root_comment_id)
+        .order_by(func.count().desc())
+        .limit(1)
+        .scalar()
+    )
+    if root_id is None:
+        pytest.skip("No comment replies; run `python -m app.cli seed-synthetic` first")
+    return root_id
+
+
+def test_feed_query_budget(db, run, viewer_id, query_budget):
+    if not db.query(Post.post_id).limit(1).scalar():
+        pytest.skip("No posts; run `python -m app.cli seed-synthetic` first")
+
+    for limit in (5, 20):
+        run(post_service.get_all_posts(db, limit=limit, user_id=viewer_id))
+
+    with query_budget(FEED_BUDGET, "feed, 5 posts") as small:
+        run(post_service.get_all_posts(db, limit=5, user_id=viewer_id))
+    with query_budget(FEED_BUDGET, "feed, 20 posts") as large:
+        run(post_service.get_all_posts(db, limit=20, user_id=viewer_id))
+
+    assert large.count == small.count, large.report()
+
+
+def test_comment_thread_query_budget(db, run, viewer_id, threaded_post_id, query_budget):
+    def thread(page_size: int):
+        return CommentService(db).get_comment_thread(threaded_post_id, page_size=page_size, user_id=viewer_id)
+
+    for page_size in (1, 20):
+        run(thread(page_size))
+
+    with query_budget(COMMENT_THREAD_BUDGET, "comment thread, 1 comment") as small:
+        run(thread(1))
+    with query_budget(COMMENT_THREAD_BUDGET, "comment thread, 20 comments") as large:
+        responses = run(thread(20))
+
+    assert responses
+    assert large.count == small.count, large.report()
+
+
+def test_comment_with_replies_query_budget(db, run, viewer_id, deepest_root_id, query_budget):
+    leaf_id = (
+        db.query(Comment.comment_id)
+        .filter(Comment.reply_count == 0)
+        .order_by(Comment.comment_id)
+        .limit(1)
+        .scalar()
+    )
+    if leaf_id is None:
+        pytest.skip("No comments without replies")
+
+    def comment(comment_id: int):
+        return CommentService(db).get_comment(comment_id, viewer_id, include_replies=True)
+
+    for comment_id in (leaf_id, deepest_root_id):
+        run(comment(comment_id))
+
+    with query_budget(COMMENT_BUDGET, "comment without replies") as small:
+        run(comment(leaf_id))
+    with query_budget(COMMENT_BUDGET, "comment with replies") as large:
+        response = run(comment(deepest_root_id))
+
+    assert response.replies
+    assert large.count == small.count, large.report()
@@ -0,0 +1,96 @@
+# tests/test_http_cache.py
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import Request, Response
+
+from app.utils import http_cache
+from app.utils.http_cache import (
+    PRIVATE_REVALIDATE, PUBLIC_SHORT, _etag_matches, is_not_modified, make_etag, set_validators
+)
+
+ETAG = make_etag("post", 1, "2024-01-01T00:00:00")
+OPAQUE = ETAG[2:]
+
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_make_etag_is_weak_and_stable():
+    assert ETAG.startswith('W/"') and ETAG.endswith('"')
+    assert make_etag("post", 1, "2024-01-01T00:00:00") == ETAG
+    assert make_etag("post", 2, "2024-01-01T00:00:00") != ETAG
+
+
+@pytest.mark.parametrize("header", [ETAG, OPAQUE, f'"other", {ETAG}', f'W/"other" ,{OPAQUE}', "*", " * "])
+def test_etag_matches(header):
+    assert _etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", ['"other"', 'W/"other"', "", f"{OPAQUE}x"])
+def test_etag_does_not_match(header):
+    assert not _etag_matches(header, ETAG)
+
+
+def test_strong_etag_matches_weak_candidate():
+    assert _etag_matches('W/"abc"', '"abc"')
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    modified = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    later = format_datetime(modified + timedelta(days=1), usegmt=True)
+
+    assert is_not_modified(_request(if_none_match=ETAG), ETAG, modified)
+    assert not is_not_modified(_request(if_none_match='"other"', if_modified_since=later), ETAG, modified)
+
+
+def test_if_none_match_without_an_etag_is_modified():
+    assert not is_not_modified(_request(if_none_match="*"), None)
+
+
+def test_if_modified_since():
+    modified = datetime(2024, 1, 1, 12, 0, 0, 500000)
+    same_second = format_datetime(modified.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+    earlier = format_datetime(modified.replace(tzinfo=timezone.utc) - timedelta(seconds=1), usegmt=True)
+
+    assert is_not_modified(_request(if_modified_since=same_second), ETAG, modified)
+    assert not is_not_modified(_request(if_modified_since=earlier), ETAG, modified)
+    assert not is_not_modified(_request(if_modified_since="not a date"), ETAG, modified)
+    assert not is_not_modified(_request(), ETAG, modified)
+
+
+def test_set_validators():
+    private = set_validators(Response(), ETAG, datetime(2024, 1, 1), PRIVATE_REVALIDATE)
+    assert private.headers["ETag"] == ETAG
+    assert private.headers["Last-Modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert private.headers["Vary"] == "Authorization"
+
+    public = set_validators(Response(), ETAG, cache_control=PUBLIC_SHORT)
+    assert public.headers["Cache-Control"] == PUBLIC_SHORT
+    assert "vary" not in public.headers
+
+
+def test_versions(run, fake_cache, monkeypatch):
+    async def get_redis():
+        return fake_cache.redis
+
+    monkeypatch.setattr(http_cache, "get_redis", get_redis)
+    run(http_cache.bump_version("profile:1"))
+    run(http_cache.bump_version("profile:1"))
+
+    assert run(http_cache.get_version("profile:1")) == 2
+    assert run(http_cache.get_versions(["profile:1", "profile:2"])) == [2, 0]
+
+
+def test_versions_without_redis(run, monkeypatch):
+    async def get_redis():
+        return None
+
+    monkeypatch.setattr(http_cache, "get_redis", get_redis)
+    assert run(http_cache.get_version("profile:1")) is None
+    assert run(http_cache.get_versions(["profile:1"])) is None
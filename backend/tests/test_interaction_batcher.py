@@ -0,0 +1,206 @@
+# tests/test_interaction_batcher.py
+import asyncio
+
+import pytest
+
+from app.core.exceptions import DatabaseError, InvalidInteractionTypeError, PostNotFoundError
+from app.services.interaction_batcher import COUNT_COLUMNS, InteractionBatcher, _replay, _Toggle
+
+
+def _toggle(user_id: int, interaction_type: str, metadata=None) -> _Toggle:
+    return _Toggle(user_id, interaction_type, metadata, None)
+
+
+def test_replay_toggles_in_arrival_order():
+    results, state, _ = _replay({(1, "like")}, [_toggle(1, "like"), _toggle(2, "share"), _toggle(1, "like")])
+
+    assert results == [(False, "removed"), (True, "added"), (True, "added")]
+    assert state == {(1, "like"), (2, "share")}
+
+
+def test_replay_double_click_nets_out():
+    results, state, _ = _replay(set(), [_toggle(1, "like"), _toggle(1, "like")])
+
+    assert results == [(True, "added"), (False, "removed")]
+    assert state == set()
+
+
+def test_replay_keeps_like_and_dislike_exclusive():
+    results, state, _ = _replay({(1, "like")}, [_toggle(1, "dislike")])
+    assert results == [(True, "added")]
+    assert state == {(1, "dislike")}
+
+    _, state, _ = _replay(set(), [_toggle(1, "like"), _toggle(1, "report"), _toggle(1, "dislike")])
+    assert state == {(1, "report"), (1, "dislike")}
+
+
+def test_replay_keeps_metadata_of_the_adding_toggle():
+    _, _, metadata = _replay(set(), [_toggle(1, "share", {"to": "a"}), _toggle(2, "share")])
+    assert metadata == {(1, "share"): {"to": "a"}, (2, "share"): None}
+
+
+class _FakeDatabase:
+    """Stands in for InteractionBatcher._apply: replays against an in-memory set"""
+
+    def __init__(self):
+        self.pairs = {}
+        self.batches = []
+        self.error = None
+
+    def apply(self, post_id, toggles):
+        self.batches.append((post_id, [(t.user_id, t.interaction_type) for t in toggles]))
+        if self.error:
+            raise self.error
+        initial = self.pairs.get(post_id, set())
+        results, state, _ = _replay(initial, toggles)
+        self.pairs[post_id] = state
+        counts = {column: 0 for column in COUNT_COLUMNS}
+        for _, name in state:
+            counts[f"{name}_count"] += 1
+        changes = (
+            [(user_id, name, "added") for user_id, name in state - initial]
+            + [(user_id, name, "removed") for user_id, name in initial - state]
+        )
+        return results, counts, None, changes
+
+
+@pytest.fixture
+def batcher(fake_cache):
+    batcher = InteractionBatcher(fake_cache)
+    batcher.window = 0.01
+    batcher.max_batch = 50
+    database = _FakeDatabase()
+    batcher._apply = database.apply
+    batcher.committed = []
+
+    async def after_commit(post_id, counts, category_id, changes):
+        batcher.committed.append((post_id, sorted(changes)))
+
+    batcher._after_commit = after_commit
+    return batcher, database
+
+
+def test_concurrent_toggles_for_a_post_share_one_batch(run, batcher):
+    batcher, database = batcher
+
+    async def burst():
+        return await asyncio.gather(
+            batcher.submit(1, 10, "like"),
+            batcher.submit(1, 11, "like"),
+            batcher.submit(1, 10, "like"),
+            batcher.submit(2, 10, "share"),
+        )
+
+    first, second, third, other_post = run(burst())
+
+    assert sorted(database.batches) == [
+        (1, [(10, "like"), (11, "like"), (10, "like")]),
+        (2, [(10, "share")]),
+    ]
+    assert (first["like"], second["like"], third["like"]) == (True, True, False)
+    assert first["message"] == "like added successfully"
+    assert third["message"] == "like removed successfully"
+    assert first["like_count"] == third["like_count"] == 1
+    assert other_post["share"] is True
+    # Only the net change is applied after commit
+    assert sorted(batcher.committed) == [(1, [(11, "like", "added")]), (2, [(10, "share", "added")])]
+
+
+def test_full_batch_flushes_without_waiting_for_the_window(run, batcher):
+    batcher, database = batcher
+    batcher.window = 60
+    batcher.max_batch = 2
+
+    async def burst():
+        return await asyncio.wait_for(asyncio.gather(
+            batcher.submit(1, 10, "like"),
+            batcher.submit(1, 11, "like"),
+        ), timeout=5)
+
+    run(burst())
+    assert len(database.batches) == 1
+
+
+def test_batches_for_a_post_apply_in_order(run, batcher):
+    batcher, database = batcher
+
+    async def two_windows():
+        first = asyncio.ensure_future(batcher.submit(1, 10, "like"))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(batcher.submit(1, 10, "like"))
+        return await first, await second
+
+    first, second = run(two_windows())
+    assert (first["like"], second["like"]) == (True, False)
+    assert database.batches == [(1, [(10, "like")]), (1, [(10, "like")])]
+
+
+def test_missing_post_fails_every_toggle_in_the_batch(run, batcher):
+    batcher, database = batcher
+    database.error = PostNotFoundError(1)
+
+    async def burst():
+        return await asyncio.gather(
+            batcher.submit(1, 10, "like"), batcher.submit(1, 11, "share"), return_exceptions=True
+        )
+
+    assert all(isinstance(result, PostNotFoundError) for result in run(burst()))
+    assert batcher.committed == []
+
+
+def test_unexpected_errors_surface_as_database_errors(run, batcher):
+    batcher, database = batcher
+    database.error = RuntimeError("boom")
+
+    with pytest.raises(DatabaseError):
+        run(batcher.submit(1, 10, "like"))
+
+
+def test_save_is_not_batched(run, batcher):
+    batcher, _ = batcher
+    with pytest.raises(InvalidInteractionTypeError):
+        run(batcher.submit(1, 10, "save"))
+
+
+def test_set_based_writes_round_trip(run, db):
+    """Against Postgres: one batch inserts, the next deletes, counts return"""
+    from sqlalchemy import text
+    from app.RedisCache import get_cache
+
+    row = db.execute(text("""
+        SELECT p.post_id, u.user_id, p.like_count, p.share_count
+        FROM posts p CROSS JOIN users u
+        WHERE NOT EXISTS (
+            SELECT 1 FROM post_interactions i WHERE i.post_id = p.post_id AND i.user_id = u.user_id
+        )
+        LIMIT 1
+    """)).first()
+    if row is None:
+        pytest.skip("No post/user pair without interactions; run `python -m app.cli seed-synthetic` first")
+    post_id, user_id, like_count, share_count = row
+    db.rollback()
+
+    batcher = InteractionBatcher(get_cache())
+
+    async def toggle_both():
+        return await asyncio.gather(
+            batcher.submit(post_id, user_id, "like"), batcher.submit(post_id, user_id, "share", {"to": "test"})
+        )
+
+    def stored():
+        db.rollback()
+        return db.execute(text("""
+            SELECT t.interaction_type_name FROM post_interactions i
+            JOIN interaction_types t USING (interaction_type_id)
+            WHERE i.post_id = :post_id AND i.user_id = :user_id ORDER BY t.interaction_type_name
+        """), {"post_id": post_id, "user_id": user_id}).scalars().all()
+
+    like, share = run(toggle_both())
+    assert (like["like"], share["share"]) == (True, True)
+    assert like["metrics"]["like_count"] == (like_count or 0) + 1
+    assert stored() == ["like", "share"]
+
+    like, share = run(toggle_both())
+    assert (like["like"], share["share"]) == (False, False)
+    assert (like["metrics"]["like_count"], share["metrics"]["share_count"]) == (like_count or 0, share_count or 0)
+    assert stored() == []
@@ -0,0 +1,102 @@
+# tests/test_interaction_state.py
+import pytest
+
+from app.services.interaction_state import BITS, GENERATION_FIELD, InteractionStateStore, empty_state
+
+
+@pytest.fixture
+def store(fake_cache):
+    store = InteractionStateStore(fake_cache)
+    # Committed masks per post id, standing in for post_interactions
+    store.database = {}
+    store.loads = []
+
+    def load_masks(db, target, user_id, ids):
+        store.loads.append(list(ids))
+        return {target_id: store.database.get(target_id, 0) for target_id in ids}
+
+    store._load_masks = load_masks
+    return store
+
+
+def _fields(run, store, user_id=1):
+    return run(store.cache.redis.hgetall(store._key("post", user_id)))
+
+
+def test_misses_are_backfilled_once(run, store):
+    store.database = {10: BITS["like"] | BITS["save"]}
+
+    first = run(store.get_states(None, 1, [10, 11]))
+    second = run(store.get_states(None, 1, [10, 11]))
+
+    assert first == second
+    assert first[10] == {**empty_state(), "like": True, "save": True}
+    assert first[11] == empty_state()
+    assert store.loads == [[10, 11]]
+
+
+def test_apply_sets_and_clears_known_fields(run, store):
+    store.database = {10: BITS["like"]}
+    run(store.get_states(None, 1, [10]))
+
+    run(store.apply(1, 10, added=["dislike", "save"], removed=["like"]))
+
+    assert _fields(run, store)["10"] == str(BITS["dislike"] | BITS["save"])
+    assert run(store.get_state(None, 1, 10))["save"] is True
+    assert store.loads == [[10]]
+
+
+def test_apply_leaves_unknown_fields_for_the_database(run, store):
+    run(store.apply(1, 10, added=["like"]))
+    assert "10" not in _fields(run, store)
+
+    store.database = {10: BITS["like"]}
+    assert run(store.get_state(None, 1, 10))["like"] is True
+    assert store.loads == [[10]]
+
+
+def test_backfill_racing_a_write_is_discarded(run, store):
+    backfill = store._backfill
+
+    async def write_then_backfill(key, generation, loaded):
+        # The read loaded the pre-write row; the write commits and is applied
+        # before the backfill lands
+        store.database = {10: BITS["save"]}
+        await store.apply(1, 10, added=["save"])
+        await backfill(key, generation, loaded)
+
+    store._backfill = write_then_backfill
+    assert run(store.get_state(None, 1, 10))["save"] is False
+    assert "10" not in _fields(run, store)
+
+    store._backfill = backfill
+    assert run(store.get_state(None, 1, 10))["save"] is True
+
+
+def test_invalidate_forgets_the_field_and_bumps_the_generation(run, store):
+    store.database = {10: BITS["like"]}
+    run(store.get_states(None, 1, [10]))
+    generation = _fields(run, store).get(GENERATION_FIELD)
+
+    run(store.invalidate(1, 10))
+
+    fields = _fields(run, store)
+    assert "10" not in fields
+    assert fields[GENERATION_FIELD] != generation
+
+
+def test_anonymous_users_get_empty_state_without_lookups(run, store):
+    assert run(store.get_states(None, None, [10, 11], target="comment")) == {
+        10: empty_state("comment"), 11: empty_state("comment")
+    }
+    assert store.loads == []
+
+
+def test_comment_targets_use_their_own_hash(run, store):
+    store.database = {10: BITS["like"]}
+    run(store.get_states(None, 1, [10], target="comment"))
+
+    run(store.apply(1, 10, removed=["like"], target="comment"))
+
+    assert run(store.get_state(None, 1, 10, target="comment")) == empty_state("comment")
+    assert _fields(run, store) == {}
@@ -0,0 +1,105 @@
+# tests/test_media_files.py
+import os
+import uuid
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.utils.media_files import _parse_range, lookup_media, media_response
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=-100", (924, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    (" bytes=5-5 ", (5, 5)),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, len(CONTENT)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=-", "bytes=0-1,5-9", "items=0-1", "bytes=a-b", ""])
+def test_parse_range_falls_back_to_full_body(header):
+    assert _parse_range(header, len(CONTENT)) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=2000-3000", "bytes=10-5", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(HTTPException) as excinfo:
+        _parse_range(header, len(CONTENT))
+    assert excinfo.value.status_code == 416
+    assert excinfo.value.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+@pytest.fixture
+def media():
+    relative = os.path.join("tests", f"{uuid.uuid4().hex}.bin")
+    path = os.path.join(settings.MEDIA_ROOT, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(CONTENT)
+    yield lookup_media(relative)
+    os.remove(path)
+
+
+def _request(method: str = "GET", **headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+async def _send(request: Request, media):
+    response = await media_response(request, media)
+    body = b""
+    if hasattr(response, "body_iterator"):
+        async for chunk in response.body_iterator:
+            body += chunk
+    return response, body
+
+
+def test_full_body(run, media):
+    response, body = run(_send(_request(), media))
+    assert response.status_code == 200
+    assert body == CONTENT
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+def test_range(run, media):
+    response, body = run(_send(_request(range="bytes=10-19"), media))
+    assert response.status_code == 206
+    assert body == CONTENT[10:20]
+    assert response.headers["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.headers["Content-Length"] == "10"
+
+
+def test_if_range_only_honours_a_current_etag(run, media):
+    current, body = run(_send(_request(range="bytes=0-9", if_range=media.etag), media))
+    assert current.status_code == 206 and body == CONTENT[:10]
+
+    stale, body = run(_send(_request(range="bytes=0-9", if_range='"stale"'), media))
+    assert stale.status_code == 200 and body == CONTENT
+
+
+def test_conditional_get(run, media):
+    response, body = run(_send(_request(if_none_match=media.etag), media))
+    assert response.status_code == 304
+    assert body == b""
+
+
+def test_head_ignores_range(run, media):
+    response, body = run(_send(_request("HEAD", range="bytes=-4"), media))
+    assert response.status_code == 200
+    assert response.headers["Content-Length"] == str(len(CONTENT))
+    assert body == b""
+
+
+def test_lookup_rejects_paths_outside_media_root():
+    assert lookup_media("../../etc/passwd") is None
+    assert lookup_media("tests/missing.bin") is None
@@ -0,0 +1,79 @@
+# tests/test_query_budget.py
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.query_budget import QueryBudgetExceeded, count_queries, fingerprint
+from app.core.query_budget import query_budget as budget_block
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def _select(engine, times: int) -> None:
+    with engine.connect() as conn:
+        for i in range(times):
+            conn.execute(text("SELECT :value"), {"value": i})
+
+
+def test_fingerprint_normalises_literals_and_placeholders():
+    assert fingerprint(
+        "SELECT * FROM posts WHERE post_id = %(post_id_1)s AND title = 'it''s'"
+    ) == "SELECT * FROM posts WHERE post_id = ? AND title = ?"
+    assert fingerprint("SELECT * FROM posts\n  LIMIT 20 OFFSET 40") == "SELECT * FROM posts LIMIT ? OFFSET ?"
+    assert fingerprint("SELECT t1.a FROM t1 WHERE t1.b = 1.5") == "SELECT t1.a FROM t1 WHERE t1.b = ?"
+
+
+def test_fingerprint_collapses_in_lists():
+    expected = "SELECT posts.post_id FROM posts WHERE posts.post_id IN (?)"
+    assert fingerprint("SELECT posts.post_id FROM posts WHERE posts.post_id IN (%(id_1)s, %(id_2)s)") == expected
+    assert fingerprint("SELECT posts.post_id FROM posts WHERE posts.post_id IN (__[POSTCOMPILE_id_1])") == expected
+
+
+def test_count_queries_reports_repeated_statements(engine):
+    with count_queries() as counter:
+        _select(engine, 3)
+
+    assert counter.count == 3
+    assert counter.repeated() == [("SELECT ?", 3)]
+    assert counter.report().splitlines() == ["3 queries", "  3x SELECT ?"]
+
+
+def test_count_queries_nests(engine):
+    with count_queries() as outer:
+        _select(engine, 1)
+        with count_queries() as inner:
+            _select(engine, 2)
+
+    assert (outer.count, inner.count) == (3, 2)
+
+
+def test_query_budget_passes_within_budget(engine):
+    with budget_block(3) as counter:
+        _select(engine, 3)
+    assert counter.count == 3
+
+
+def test_query_budget_raises_when_exceeded(engine):
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with budget_block(2, "selects"):
+            _select(engine, 3)
+
+    assert isinstance(excinfo.value, AssertionError)
+    message = str(excinfo.value)
+    assert message.startswith("selects used 3 queries")
+    assert "3x SELECT ?" in message
+    assert message.endswith("(budget 2)")
+
+
+def test_query_budget_fixture_counts_other_threads(engine, query_budget):
+    worker = threading.Thread(target=_select, args=(engine, 2))
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            worker.start()
+            worker.join()
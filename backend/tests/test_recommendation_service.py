@@ -0,0 +1,40 @@
+# tests/test_recommendation_service.py
+import time
+
+import pytest
+
+from app.services import trending_service
+from app.services.recommendation_service import FRESHNESS_HALF_LIFE, RecommendationService
+
+
+@pytest.fixture
+def recommendations(fake_cache, monkeypatch):
+    monkeypatch.setattr(trending_service, "_trending_service", None)
+    redis = fake_cache.redis
+    trending = trending_service.get_trending_service(fake_cache)
+    return RecommendationService(fake_cache), trending, redis
+
+
+def test_fresh_candidates_outrank_trending(run, recommendations):
+    service, trending, redis = recommendations
+    run(redis.zadd(trending._key("day"), {"10": 5.0, "11": 1.0}))
+    run(redis.zadd(service._user_key(1), {"20": 3.0, "21": 2.0}))
+    run(redis.set(service._built_at_key(1), time.time()))
+
+    assert run(service.get_recommended_post_ids(1, limit=4)) == [20, 21, 10, 11]
+
+
+def test_stale_candidates_give_way_to_trending(run, recommendations):
+    service, trending, redis = recommendations
+    run(redis.zadd(trending._key("day"), {"10": 5.0, "11": 1.0}))
+    run(redis.zadd(service._user_key(1), {"20": 3.0}))
+    run(redis.set(service._built_at_key(1), time.time() - 4 * FRESHNESS_HALF_LIFE.total_seconds()))
+
+    assert run(service.get_recommended_post_ids(1, limit=3)) == [10, 11, 20]
+
+
+def test_without_candidates_serves_trending(run, recommendations):
+    service, trending, redis = recommendations
+    run(redis.zadd(trending._key("day"), {"10": 5.0, "11": 1.0, "12": -1.0}))
+
+    assert run(service.get_recommended_post_ids(2)) == [10, 11]
@@ -0,0 +1,57 @@
+# tests/test_rollups.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.rollups import GRANULARITIES, MAX_BUCKETS_PER_QUERY, InteractionRollups
+
+
+@pytest.fixture
+def rollups(fake_cache):
+    return InteractionRollups(fake_cache)
+
+
+def test_record_counts_into_every_granularity(run, rollups):
+    at = datetime.utcnow() - timedelta(minutes=1)
+    run(rollups.record(1, "like", 1, at))
+    run(rollups.record(1, "like", 1, at))
+    run(rollups.record(1, "save", 1, at))
+
+    for granularity in GRANULARITIES:
+        result = run(rollups.get_range(1, at - timedelta(minutes=1), granularity=granularity))
+        assert [bucket["counts"] for bucket in result["buckets"]] == [{"like": 2, "save": 1}]
+
+
+def test_removal_never_takes_a_bucket_below_zero(run, rollups):
+    # Liked in an old bucket, unliked now
+    run(rollups.record(1, "like", 1, datetime.utcnow() - timedelta(days=3)))
+    run(rollups.record(1, "like", -1))
+    run(rollups.record(1, "save", 1))
+    run(rollups.record(1, "save", -1))
+    run(rollups.record(1, "save", -1))
+
+    totals = run(rollups.get_window_totals(1, timedelta(hours=1)))
+    assert totals.get("like", 0) == 0
+    assert totals.get("save", 0) == 0
+
+
+def test_explicit_granularity_over_budget_is_rejected(run, rollups):
+    with pytest.raises(ValueError):
+        run(rollups.get_range(1, datetime.utcnow() - timedelta(days=30), granularity="5m"))
+
+
+def test_picked_granularity_reports_the_start_it_used(run, rollups):
+    end = datetime.utcnow()
+    start = end - timedelta(days=2 * MAX_BUCKETS_PER_QUERY)
+
+    result = run(rollups.get_range(1, start, end))
+
+    assert result["granularity"] == "1d"
+    used = datetime.fromisoformat(result["start"])
+    assert used > start
+    assert (end - used) <= timedelta(days=MAX_BUCKETS_PER_QUERY)
+
+
+def test_unknown_granularity_is_rejected(run, rollups):
+    with pytest.raises(ValueError):
+        run(rollups.get_range(1, datetime.utcnow() - timedelta(hours=1), granularity="1w"))
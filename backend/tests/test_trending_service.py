@@ -0,0 +1,61 @@
+# tests/test_trending_service.py
+import time
+
+import pytest
+
+from app.services.trending_service import RESCALE_AFTER_HALF_LIVES, TIMEFRAMES, TrendingService
+
+
+@pytest.fixture
+def trending(fake_cache):
+    return TrendingService(fake_cache)
+
+
+def _scores(run, trending, key):
+    return dict(run(trending.cache.redis.zrange(key, 0, -1, withscores=True)))
+
+
+def test_record_interaction_adds_weight_to_every_set(run, trending):
+    run(trending.record_interaction(1, "like", category_id=7))
+    run(trending.record_interaction(1, "save", category_id=7))
+    run(trending.record_interaction(1, "like", action="removed", category_id=7))
+
+    for tf in TIMEFRAMES:
+        for key in (trending._key(tf), trending._key(tf, 7)):
+            assert _scores(run, trending, key) == {"1": pytest.approx(2.0, rel=1e-3)}
+    assert run(trending.cache.redis.smembers(trending.categories_key)) == {"7"}
+
+
+def test_unknown_interaction_is_ignored(run, trending):
+    run(trending.record_interaction(1, "bookmark"))
+    assert run(trending.cache.redis.keys("trending:*")) == []
+
+
+def test_increment_never_uses_a_landmark_a_rescale_moved(run, trending):
+    half_life = TIMEFRAMES["day"].total_seconds()
+    stale = time.time() - (RESCALE_AFTER_HALF_LIVES + 1) * half_life
+    redis = trending.cache.redis
+    run(redis.set(trending._landmark_key("day"), repr(stale)))
+    # Worth 1.0 at the current time once scaled to a fresh landmark
+    run(redis.zadd(trending._key("day"), {"1": 2.0 ** (RESCALE_AFTER_HALF_LIVES + 1)}))
+
+    # Recorded against the stale landmark, then rescaled together with post 1
+    run(trending.record_interaction(2, "like"))
+    # Recorded against the new landmark
+    run(trending.record_interaction(2, "like"))
+
+    scores = _scores(run, trending, trending._key("day"))
+    assert scores["1"] == pytest.approx(1.0, rel=1e-3)
+    assert scores["2"] == pytest.approx(2.0, rel=1e-3)
+    assert float(run(redis.get(trending._landmark_key("day")))) == pytest.approx(time.time(), abs=60)
+
+
+def test_rescale_with_stale_landmarks_is_a_no_op(run, trending):
+    half_life = TIMEFRAMES["day"].total_seconds()
+    stale = time.time() - (RESCALE_AFTER_HALF_LIVES + 1) * half_life
+    run(trending.record_interaction(1, "like"))
+
+    # A caller that read the landmarks before another worker rescaled
+    run(trending._maybe_rescale({tf: stale for tf in TIMEFRAMES}))
+
+    assert _scores(run, trending, trending._key("day")) == {"1": pytest.approx(1.0, rel=1e-3)}
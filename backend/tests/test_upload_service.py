@@ -0,0 +1,90 @@
+# tests/test_upload_service.py
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services import upload_service
+from app.services.upload_service import store_upload
+
+CONTENT = b"\x89PNG" + bytes(range(256)) * 8
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Several reads per upload, so limits are checked mid-stream
+    monkeypatch.setattr(upload_service, "UPLOAD_CHUNK_SIZE", 256)
+
+
+def _upload(content: bytes = CONTENT, filename: str = "photo.PNG", size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=size)
+
+
+def _files(directory) -> list:
+    return sorted(
+        os.path.relpath(os.path.join(root, name), directory)
+        for root, _, names in os.walk(directory) for name in names
+    )
+
+
+def test_stores_under_the_content_hash(run, tmp_path):
+    stored = run(store_upload(_upload(), str(tmp_path), "/media/posts/"))
+
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    assert stored.sha256 == digest
+    assert stored.extension == "png"
+    assert stored.size == len(CONTENT)
+    assert stored.url == f"/media/posts/{digest}.png"
+    assert not stored.deduplicated
+    assert _files(tmp_path) == [f"{digest}.png"]
+    assert (tmp_path / f"{digest}.png").read_bytes() == CONTENT
+
+
+def test_sharded_layout(run, tmp_path):
+    stored = run(store_upload(_upload(), str(tmp_path), "/media/blobs", shard=True))
+
+    digest = stored.sha256
+    assert stored.url == f"/media/blobs/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert stored.path == os.path.join(str(tmp_path), digest[:2], digest[2:4], f"{digest}.png")
+
+
+def test_identical_uploads_are_deduplicated(run, tmp_path):
+    first = run(store_upload(_upload(), str(tmp_path), "/media"))
+    os.utime(first.path, (0, 0))
+
+    second = run(store_upload(_upload(filename="copy.png"), str(tmp_path), "/media"))
+
+    assert second.deduplicated
+    assert second.path == first.path
+    assert os.stat(first.path).st_mtime > 0
+    assert _files(tmp_path) == [os.path.basename(first.path)]
+
+
+def test_declared_size_over_the_limit_is_rejected_before_reading(run, tmp_path):
+    with pytest.raises(HTTPException) as excinfo:
+        run(store_upload(_upload(size=len(CONTENT)), str(tmp_path), "/media", max_bytes=100))
+    assert excinfo.value.status_code == 413
+    assert _files(tmp_path) == []
+
+
+def test_oversized_stream_is_rejected_and_cleaned_up(run, tmp_path):
+    with pytest.raises(HTTPException) as excinfo:
+        run(store_upload(_upload(), str(tmp_path), "/media", max_bytes=len(CONTENT) - 1))
+    assert excinfo.value.status_code == 413
+    assert _files(tmp_path) == []
+
+
+def test_empty_upload_is_rejected_and_cleaned_up(run, tmp_path):
+    with pytest.raises(HTTPException) as excinfo:
+        run(store_upload(_upload(b""), str(tmp_path), "/media"))
+    assert excinfo.value.status_code == 400
+    assert _files(tmp_path) == []
+
+
+@pytest.mark.parametrize("filename", ["photo.exe", "photo", "", None])
+def test_unsupported_extensions_are_rejected(run, tmp_path, filename):
+    with pytest.raises(HTTPException) as excinfo:
+        run(store_upload(_upload(filename=filename), str(tmp_path), "/media"))
+    assert excinfo.value.status_code == 400